@@ -1,9 +1,21 @@
 import ollama
 import json
 
+from telemetry_rules import RuleEngine
+
 class AIEngine:
-    def __init__(self, model="llama3"):
+    def __init__(self, model="llama3", rules=None):
         self.model = model
+        self.rules = RuleEngine(rules)  # cheap tier; the LLM runs only when a rule escalates
+
+    def check_rules(self, rover_id, records, objects=None):
+        """
+        Runs the rule engine on a rover's recent samples (newest last).
+        Returns (raised, cleared, escalate): new alerts, cleared rule ids, and
+        whether any new alert asks for an LLM assessment.
+        """
+        raised, cleared = self.rules.evaluate(rover_id, records, objects)
+        return raised, cleared, any(alert["escalate"] for alert in raised)
 
     def analyze_telemetry(self, data):
         """
@@ -24,11 +36,3 @@ class AIEngine:
             return response['message']['content']
         except Exception as e:
             return json.dumps({"status": "ERROR", "message": str(e), "action": "Check AI System"})
-
-    def detect_fire_risk(self, temp, gas):
-        """
-        Simple heuristic check before calling expensive LLM.
-        """
-        if temp > 70 or gas > 500:
-            return True
-        return False
@@ -0,0 +1,166 @@
+"""
+Project A.R.E.S. — Telemetry Analysis Jobs
+Runs the LLM telemetry analysis behind /api/analyze without tying up an HTTP
+worker per viewer.
+
+    service = AnalysisService(analyze)     # analyze(status) -> result dict
+    job = service.submit(current_status())  # returns immediately
+    job.wait(60); job.result
+
+Three layers, cheapest first:
+  * cache — finished results keyed by a quantized telemetry fingerprint, so
+    readings that differ only by sensor noise reuse the last answer for
+    CACHE_TTL seconds (LRU-bounded to CACHE_SIZE entries)
+  * single-flight — a request whose fingerprint is already being analysed
+    joins that job instead of starting another generation
+  * jobs — everything else queues on a small worker pool (Ollama runs one
+    generation at a time anyway); callers poll or stream the job by id
+Error results are returned to the callers that waited for them but never
+cached.
+"""
+
+import collections
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+CACHE_TTL = 30.0     # seconds a finished analysis is reused
+CACHE_SIZE = 64      # fingerprints kept (LRU)
+MAX_JOBS = 256       # finished jobs kept for polling
+WORKERS = 1          # concurrent LLM generations
+
+# field -> quantization step; readings in the same step share a fingerprint
+FINGERPRINT_STEPS = {
+    "temp": 1.0,
+    "gas": 25.0,
+    "pressure": 1.0,
+    "radiation": 0.05,
+    "flame": 1.0,
+    "water": 1.0,
+    "ax": 0.1,
+    "ay": 0.1,
+    "az": 0.1,
+}
+
+
+def fingerprint(status, steps=FINGERPRINT_STEPS):
+    """Hashable summary of a status snapshot, insensitive to timestamps and sensor jitter."""
+    values = []
+    for field, step in steps.items():
+        try:
+            values.append(round(float(status.get(field, 0)) / step))
+        except (TypeError, ValueError):
+            values.append(None)
+    labels = tuple(sorted({o.get("label") for o in status.get("objects") or []}))
+    return (status.get("rover"),) + tuple(values) + (labels,)
+
+
+class AnalysisJob:
+    def __init__(self, job_id, key):
+        self.id = job_id
+        self.key = key
+        self.status = "pending"     # pending | running | done | error
+        self.result = None
+        self.cached = False
+        self.created = time.time()
+        self.finished = None
+        self._done = threading.Event()
+
+    def wait(self, timeout=None):
+        """Blocks until the job finishes; True if it did within timeout."""
+        return self._done.wait(timeout)
+
+    def _finish(self, status, result):
+        self.status = status
+        self.result = result
+        self.finished = time.time()
+        self._done.set()
+
+    def to_dict(self):
+        out = {"job": self.id, "status": self.status, "cached": self.cached}
+        if self.finished is not None:
+            out["result"] = self.result
+            out["elapsed_ms"] = round(1000 * (self.finished - self.created), 1)
+        return out
+
+
+class AnalysisService:
+    def __init__(self, analyze, ttl=CACHE_TTL, cache_size=CACHE_SIZE, workers=WORKERS, max_jobs=MAX_JOBS):
+        self.analyze = analyze
+        self.ttl = ttl
+        self.cache_size = cache_size
+        self.max_jobs = max_jobs
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ares-analyze")
+        self._lock = threading.Lock()
+        self._cache = collections.OrderedDict()   # key -> (expires, result)
+        self._inflight = {}                       # key -> running/pending job
+        self._jobs = collections.OrderedDict()    # id -> job, oldest first
+        self._ids = itertools.count(1)
+        self.hits = 0
+        self.joined = 0
+        self.generations = 0
+
+    def submit(self, status):
+        """Returns a job for this snapshot: a finished one on a cache hit, the in-flight one if shared."""
+        key = fingerprint(status)
+        now = time.time()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] > now:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                job = self._new_job(key)
+                job.cached = True
+                job._finish("done", cached[1])
+                return job
+            job = self._inflight.get(key)
+            if job is not None:
+                self.joined += 1
+                return job
+            job = self._new_job(key)
+            self._inflight[key] = job
+            self.generations += 1
+        self._executor.submit(self._run, job, status)
+        return job
+
+    def _new_job(self, key):
+        job = AnalysisJob(next(self._ids), key)
+        self._jobs[job.id] = job
+        # Forget the oldest finished jobs; unfinished ones are still referenced by _inflight
+        while len(self._jobs) > self.max_jobs:
+            oldest_id, oldest = next(iter(self._jobs.items()))
+            if oldest.finished is None:
+                break
+            del self._jobs[oldest_id]
+        return job
+
+    def _run(self, job, status):
+        job.status = "running"
+        try:
+            result = self.analyze(status)
+            ok = not (isinstance(result, dict) and result.get("status") == "ERROR")
+        except Exception as e:
+            result, ok = {"status": "ERROR", "message": str(e), "action": "Check AI System"}, False
+        with self._lock:
+            if ok:
+                self._cache[job.key] = (time.time() + self.ttl, result)
+                self._cache.move_to_end(job.key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            self._inflight.pop(job.key, None)
+        job._finish("done" if ok else "error", result)
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "cache_entries": len(self._cache),
+                "in_flight": len(self._inflight),
+                "cache_hits": self.hits,
+                "joined": self.joined,
+                "generations": self.generations,
+            }
@@ -1,6 +1,20 @@
-from flask import Flask, request, jsonify, Response
+from flask import Flask, request, jsonify, Response, redirect, g
 from flask_cors import CORS
 from ai_engine import AIEngine
+from telemetry_store import TelemetryStore, to_epoch
+from log_writer import TelemetryLogWriter
+from telemetry_archive import RECORD_DTYPE, TelemetryArchive, entries_from_records
+from telemetry_ingest import DASHBOARD_FIELDS, ESP32_FIELDS, EXACT_DTYPE, parse_samples, samples_to_records
+from telemetry_aggregate import bucket_stats, lttb
+from telemetry_stream import TelemetryBroadcaster
+from rover_poller import RoverEndpoint, RoverPoller
+from rover_registry import RoverRegistry
+from hazard_events import HazardEventStore
+from chat_context import ChatContextBuilder, NUM_CTX
+from analysis_jobs import AnalysisService
+from gas_profile import GasModel
+from serving import CHAT_SLOTS, STREAM_RETRY_MS, STREAM_SLOTS, Slots
+from metrics import REGISTRY, CONTENT_TYPE as METRICS_CONTENT_TYPE
 import datetime
 import json
 import re
@@ -9,10 +23,45 @@ import requests
 import threading
 import time
 import os
+import atexit
+import collections
+import numpy as np
+from urllib.parse import urlsplit
 
 app = Flask(__name__)
 CORS(app)
 
+# Thread budgets for long-lived responses (see serving.py)
+stream_slots = Slots(STREAM_SLOTS)
+chat_slots = Slots(CHAT_SLOTS)
+
+# ── Metrics (served at /api/metrics; scrape-time collectors are registered further down) ──
+HTTP_LATENCY = REGISTRY.histogram("ares_http_request_seconds", "Request handling time (streams: until the response starts)",
+                                  ("endpoint", "method", "status"))
+POLL_RTT = REGISTRY.histogram("ares_rover_poll_seconds", "Rover /data round-trip time", ("rover",))
+POLL_FAILURES = REGISTRY.counter("ares_rover_poll_failures_total", "Failed rover polls", ("rover",))
+LOG_FLUSH = REGISTRY.histogram("ares_log_flush_seconds", "Telemetry log + archive batch write time")
+LOG_WRITTEN = REGISTRY.counter("ares_log_samples_written_total", "Telemetry samples written to the log")
+LLM_TTFT = REGISTRY.histogram("ares_llm_ttft_seconds", "Ollama time to first token", ("route",))
+LLM_DURATION = REGISTRY.histogram("ares_llm_generation_seconds", "Ollama generation time", ("route",))
+LLM_TOKENS = REGISTRY.counter("ares_llm_tokens_total", "Streamed Ollama tokens", ("route",))
+LLM_TOKENS_PER_S = REGISTRY.gauge("ares_llm_tokens_per_second", "Decode rate of the last generation", ("route",))
+EVENT_LATENCY = REGISTRY.histogram("ares_hazard_event_latency_seconds", "Frame capture to backend receive, per hazard event",
+                                   ("camera",))
+ALERTS_RAISED = REGISTRY.counter("ares_alerts_total", "Rule-engine alerts raised", ("rule", "severity"))
+
+@app.before_request
+def _start_timer():
+    g.started = time.perf_counter()
+
+@app.after_request
+def _record_latency(response):
+    started = g.get("started")
+    if started is not None:
+        rule = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        HTTP_LATENCY.observe(time.perf_counter() - started, rule, request.method, response.status_code)
+    return response
+
 ai = AIEngine(model="deepseek-r1:1.5b")
 
 # ── ESP32 Rover Config ──
@@ -20,15 +69,31 @@ ESP32_DATA_URL = "http://10.202.253.93/data"
 ESP32_POLL_INTERVAL = 2  # seconds
 obj_process = None
 
+# Telemetry/hazard history files live here; ARES_DATA_DIR points a scratch instance elsewhere (bench_load.py)
+DATA_DIR = os.environ.get("ARES_DATA_DIR", os.path.dirname(os.path.abspath(__file__)))
+
+# Fleet: one entry per rover. Override with a rovers.json next to this file (or at ARES_ROVERS_CONFIG):
+#   [{"id": "rover-2", "url": "http://10.0.0.12/data", "interval": 1, "timeout": 2}, ...]
+ROVERS_CONFIG_PATH = os.environ.get("ARES_ROVERS_CONFIG",
+                                    os.path.join(os.path.dirname(os.path.abspath(__file__)), "rovers.json"))
+ROVERS = [{"id": "rover-1", "url": ESP32_DATA_URL, "interval": ESP32_POLL_INTERVAL, "timeout": 3}]
+if os.path.exists(ROVERS_CONFIG_PATH):
+    with open(ROVERS_CONFIG_PATH) as f:
+        ROVERS = json.load(f)
+ROVER_ENDPOINTS = [RoverEndpoint.from_dict(cfg) for cfg in ROVERS]
+
 # ── Calibration Constants (MPU6050) ──
 # Scale: 16384 LSB per g (for +/- 2g range)
 ACCEL_SCALE = 16384.0
 AX_OFFSET = -1916
 AY_OFFSET = 976
 AZ_OFFSET = -252  # Offsets AZ to ~-16384 for -1.0g on flat ground
+GAS_R0 = None     # MQ135 datasheet R0 (kOhm, Rs at 100 ppm NH3); None = derived from gas_profile.CLEAN_AIR_ADC
+gas_model = GasModel(r0=GAS_R0)
+MPU_CALIBRATION = {"ax": (AX_OFFSET, ACCEL_SCALE), "ay": (AY_OFFSET, ACCEL_SCALE), "az": (AZ_OFFSET, ACCEL_SCALE)}
 
-# In-memory storage for latest telemetry
-latest_data = {
+# Returned by /api/status until the first sample arrives
+EMPTY_STATUS = {
     "temp": 0,
     "pressure": 0,
     "gas": 0,
@@ -45,99 +110,142 @@ latest_data = {
     "source": "none"
 }
 
+# ── In-memory State ──
+ROVER_HISTORY_SAMPLES = 3600   # per-rover ring size (72 bytes/sample); override per rover with "history"
+
 latest_objects = []
+# Per-camera detector results, keyed by the camera id the detector posts with
+CAMERA_STALE_AFTER = 5   # seconds without a post before a camera counts as offline
+LATENCY_WINDOW = 256     # recent hazard events per camera used for latency percentiles
 
-LOG_FILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "telemetry_history.jsonl")
+# ── Rule Engine ──
+RULE_WINDOW = 256        # newest samples per rover handed to the rule engine
+ALERT_HISTORY = 500      # raised alerts kept for /api/alerts
+alert_log = collections.deque(maxlen=ALERT_HISTORY)
+cameras = {}
+cameras_lock = threading.Lock()
+telemetry_stream = TelemetryBroadcaster()
+registry = RoverRegistry(
+    ROVER_HISTORY_SAMPLES,
+    {cfg["id"]: cfg["history"] for cfg in ROVERS if "history" in cfg},
+)
+
+LOG_FILE_PATH = os.path.join(DATA_DIR, "telemetry_history.jsonl")
+# Columnar copy of the numeric fields; seed it from an old log with `telemetry_archive.py convert`
+ARCHIVE_PATH = os.path.join(DATA_DIR, "telemetry_archive.bin")
+
+# ── Log Writer Config ──
+LOG_FLUSH_INTERVAL = 1.0               # seconds a sample may wait before hitting disk
+LOG_FSYNC_INTERVAL = None              # None = never, 0 = every batch, N = every N seconds
+LOG_SEGMENT_MAX_BYTES = 64 * 1024 * 1024
+LOG_SEGMENT_MAX_AGE = 24 * 3600        # seconds
+LOG_COMPRESS_SEGMENTS = True           # gzip segments once rotated out
+
+telemetry_store = TelemetryStore(LOG_FILE_PATH)
+telemetry_archive = TelemetryArchive(ARCHIVE_PATH)
+log_writer = TelemetryLogWriter(
+    telemetry_store,
+    flush_interval=LOG_FLUSH_INTERVAL,
+    fsync_interval=LOG_FSYNC_INTERVAL,
+    max_segment_bytes=LOG_SEGMENT_MAX_BYTES,
+    max_segment_age=LOG_SEGMENT_MAX_AGE,
+    compress_segments=LOG_COMPRESS_SEGMENTS,
+    archive=telemetry_archive,
+    on_flush=lambda seconds, samples: (LOG_FLUSH.observe(seconds), LOG_WRITTEN.inc(amount=samples)),
+).start()
+atexit.register(log_writer.close)
+
+# Hazard lifecycle history (open / peak / close per tracked hazard), see hazard_events.py
+HAZARD_EVENTS_PATH = os.path.join(DATA_DIR, "hazard_events.jsonl")
+TELEMETRY_JOIN_WINDOW = 30   # seconds; max distance between a hazard and its joined telemetry sample
+hazard_store = HazardEventStore(HAZARD_EVENTS_PATH)
+atexit.register(hazard_store.close_file)
 
 def log_telemetry(data):
     try:
         # Create a compact version for the log
         log_entry = {k: v for k, v in data.items() if k not in ["gasProfile", "objects"]}
-        with open(LOG_FILE_PATH, 'a') as f:
-            f.write(json.dumps(log_entry) + '\n')
+        log_writer.submit(log_entry)
     except Exception as e:
         print(f"[LOG ERROR] {e}")
 
-def generate_gas_profile(raw_adc):
-    """
-    Derives estimated gas concentrations from a single MQ135 ADC reading (0-4095).
-    
-    The MQ135 responds to multiple gases with different sensitivities.
-    These ratios are based on the MQ135 datasheet sensitivity curves:
-      - CO₂:     Primary target, highest sensitivity
-      - NH₃:     High sensitivity
-      - Benzene: Medium sensitivity
-      - Smoke:   Medium sensitivity (particulates)
-      - Alcohol: Medium sensitivity
-      - NOₓ:     Low sensitivity
-      - CO:      Low sensitivity
-    
-    ⚠️ These are ESTIMATES — true separation requires dedicated sensors.
-    """
-    import random
-    # Convert raw ADC (0-4095) to approximate PPM using MQ135 curve
-    # Rs/Ro ratio approximation for clean air calibration
-    ppm_base = max(0, (raw_adc / 4095.0) * 1000)  # rough 0-1000 PPM scale
-    
-    # MQ135 relative sensitivity ratios (from datasheet curves)
+# ── Rover Fleet Polling ──
+def safe_float(val, default=0):
+    try:
+        return float(val)
+    except (ValueError, TypeError):
+        return default
+
+def normalize_esp32(raw):
+    """Map raw ESP32 /data fields → dashboard fields (with MPU6050 calibration)."""
+    air_val = safe_float(raw.get("air", 0))
     return {
-        "co2":      round(ppm_base * 1.00, 1),   # Primary target
-        "ammonia":  round(ppm_base * 0.70, 1),   # High sensitivity
-        "benzene":  round(ppm_base * 0.35, 1),   # Medium
-        "smoke":    round(ppm_base * 0.30, 1),   # Medium
-        "alcohol":  round(ppm_base * 0.28, 1),   # Medium
-        "nox":      round(ppm_base * 0.15, 1),   # Low
-        "co":       round(ppm_base * 0.12, 1),   # Low
-        "methane":  round(ppm_base * 0.10, 1),   # Very low
-        "sulfur":   round(ppm_base * 0.08, 1),   # Trace
-        "hydrogen": round(ppm_base * 0.06, 1),   # Trace
+        "temp": safe_float(raw.get("temp", 0)),
+        "pressure": safe_float(raw.get("pressure", 0)),
+        "gas": air_val,                     # MQ135/MQ139 → gas
+        "radiation": safe_float(raw.get("flame", 0)),   # flame sensor → radiation slot (legacy)
+        "flame": safe_float(raw.get("flame", 0)),       # flame sensor → flame card
+        "water": safe_float(raw.get("water", 0)),
+        "ax": round((safe_float(raw.get("ax", 0)) - AX_OFFSET) / ACCEL_SCALE, 4),
+        "ay": round((safe_float(raw.get("ay", 0)) - AY_OFFSET) / ACCEL_SCALE, 4),
+        "az": round((safe_float(raw.get("az", 0)) - AZ_OFFSET) / ACCEL_SCALE, 4),
+        "gx": safe_float(raw.get("gx", 0)),
+        "gy": safe_float(raw.get("gy", 0)),
+        "gz": safe_float(raw.get("gz", 0)),
+        "lat": safe_float(raw.get("lat", 0)),
+        "lng": safe_float(raw.get("lng", 0)),
+        "gasProfile": gas_model.profile(air_val),
     }
 
-# ── Background Polling Thread ──
-def poll_esp32():
-    """Continuously fetch sensor data from the ESP32 rover and update latest_data."""
-    global latest_data
-    while True:
-        try:
-            resp = requests.get(ESP32_DATA_URL, timeout=3)
-            resp.raise_for_status()
-            raw = resp.json()
-
-            # Map ESP32 fields → dashboard fields
-            def safe_float(val, default=0):
-                try:
-                    return float(val)
-                except (ValueError, TypeError):
-                    return default
-
-            air_val = safe_float(raw.get("air", 0))
-            latest_data.update({
-                "temp": safe_float(raw.get("temp", 0)),
-                "pressure": safe_float(raw.get("pressure", 0)),
-                "gas": air_val,                     # MQ135/MQ139 → gas
-                "radiation": safe_float(raw.get("flame", 0)),   # flame sensor → radiation slot (legacy)
-                "flame": safe_float(raw.get("flame", 0)),       # flame sensor → flame card
-                "water": safe_float(raw.get("water", 0)),
-                "ax": round((safe_float(raw.get("ax", 0)) - AX_OFFSET) / ACCEL_SCALE, 4),
-                "ay": round((safe_float(raw.get("ay", 0)) - AY_OFFSET) / ACCEL_SCALE, 4),
-                "az": round((safe_float(raw.get("az", 0)) - AZ_OFFSET) / ACCEL_SCALE, 4),
-                "gx": safe_float(raw.get("gx", 0)),
-                "gy": safe_float(raw.get("gy", 0)),
-                "gz": safe_float(raw.get("gz", 0)),
-                "lat": safe_float(raw.get("lat", 0)),
-                "lng": safe_float(raw.get("lng", 0)),
-                "gasProfile": generate_gas_profile(air_val),
-                "timestamp": datetime.datetime.now().isoformat(),
-                "active": True,
-                "source": "esp32"
-            })
-            log_telemetry(latest_data)
-        except Exception as e:
-            # Only set active to False if the current source IS the ESP32
-            # or if we haven't received ANY data yet.
-            latest_data["active"] = False
-            print(f"[ESP32 Poll] Offline: {e}")
-        time.sleep(ESP32_POLL_INTERVAL)
+def current_status(rover_id=None):
+    """Latest snapshot for a rover (default: whichever reported last) with current detections."""
+    snapshot = registry.latest(rover_id) or EMPTY_STATUS
+    return dict(snapshot, objects=latest_objects, alerts=ai.rules.active(snapshot.get("rover")))
+
+def check_rules(rover_id):
+    """Runs the rule engine on a rover's newest sample; escalating alerts queue an LLM analysis."""
+    raised, cleared, escalate = ai.check_rules(rover_id, registry.recent(rover_id, RULE_WINDOW), latest_objects)
+    job = analysis.submit(current_status(rover_id)) if escalate else None
+    for alert in raised:
+        if job is not None and alert["escalate"]:
+            alert["analysis_job"] = job.id
+        alert_log.append(alert)
+        ALERTS_RAISED.inc(alert["rule"], alert["severity"])
+        print(f"[RULES] {alert['severity']} {rover_id}: {alert['message']}")
+    for rule_id in cleared:
+        print(f"[RULES] Cleared {rover_id}: {rule_id}")
+    return raised, cleared
+
+def record_sample(rover_id, snapshot):
+    """Single entry point for new telemetry: registry, log, live stream."""
+    snapshot = registry.update(rover_id, snapshot)
+    log_telemetry(snapshot)
+    check_rules(rover_id)
+    telemetry_stream.publish(dict(snapshot, objects=latest_objects, alerts=ai.rules.active(rover_id)))
+    return snapshot
+
+def on_rover_sample(rover_id, raw, rtt):
+    """Called by the fleet poller for every successful /data fetch."""
+    POLL_RTT.observe(rtt, rover_id)
+    snapshot = normalize_esp32(raw)
+    snapshot.update({
+        "timestamp": datetime.datetime.now().isoformat(),
+        "active": True,
+        "source": "esp32",
+    })
+    record_sample(rover_id, snapshot)
+
+def on_rover_offline(rover_id, error):
+    POLL_FAILURES.inc(rover_id)
+    state = registry.latest(rover_id)
+    if state is not None and state.get("active"):
+        registry.patch(rover_id, active=False)
+        # Only push to the dashboard if the offline rover is the one it is showing
+        if registry.latest_rover_id == rover_id:
+            telemetry_stream.publish(current_status())
+    print(f"[ESP32 Poll] {rover_id} offline: {error}")
+
+rover_poller = RoverPoller(ROVER_ENDPOINTS, on_rover_sample, on_rover_offline)
 
 SYSTEM_PROMPT = """You are A.R.E.S., an AI assistant for an industrial rover mission-control system.
 
@@ -149,44 +257,300 @@ STRICT RULES:
 - If you don't know something, say so in one sentence.
 - Never repeat the question back. Never add disclaimers."""
 
+CHAT_KEEP_ALIVE = "30m"   # keep the model (and its prompt cache) loaded between questions
+chat_context = ChatContextBuilder(SYSTEM_PROMPT, registry)
+
 @app.route('/api/telemetry', methods=['POST'])
 def receive_telemetry():
-    global latest_data
     data = request.json
     data['timestamp'] = datetime.datetime.now().isoformat()
-    latest_data = data
-    log_telemetry(latest_data)
-    
-    # Check for immediate risks
-    if ai.detect_fire_risk(data.get('temp', 0), data.get('gas', 0)):
-        print("CRITICAL: PRE-FIRE CONDITION DETECTED")
-        
-    return jsonify({"status": "received"}), 200
+    rover_id = data.get('rover') or data.get('source') or 'remote'
+    record_sample(rover_id, data)
+    return jsonify({"status": "received", "alerts": ai.rules.active(rover_id)}), 200
+
+@app.route('/api/telemetry/batch', methods=['POST'])
+def receive_telemetry_batch():
+    """
+    Bulk upload of timestamped samples (e.g. a rover's backlog after a dropout).
+    Body: JSON array, {"rover": id, "samples": [...]}, or NDJSON
+    (Content-Type application/x-ndjson). Each sample needs "ts" (epoch s/ms)
+    or an ISO "timestamp".
+    Query params:
+      rover   rover id (default: body "rover", else "remote")
+      format  "esp32" (raw /data fields, MPU6050 calibration applied; default)
+              or "dashboard" (already normalized fields)
+    The whole batch is converted, logged and rule-checked in one pass.
+    """
+    try:
+        body_rover, samples = parse_samples(request.get_data(), request.content_type)
+    except (ValueError, UnicodeDecodeError) as e:
+        return jsonify({"error": f"Invalid batch: {e}"}), 400
+    rover_id = request.args.get('rover') or body_rover or 'remote'
+    raw = request.args.get('format', 'esp32') == 'esp32'
+    exact, rejected = samples_to_records(samples, ESP32_FIELDS if raw else DASHBOARD_FIELDS,
+                                         MPU_CALIBRATION if raw else None, dtype=EXACT_DTYPE)
+    if not len(exact):
+        return jsonify({"accepted": 0, "rejected": rejected, "alerts": []}), 200
+
+    # Rule context: the rover's samples from just before the batch
+    records = exact.astype(RECORD_DTYPE)   # float32 copy for the registry, archive and rules
+    context = registry.recent(rover_id, RULE_WINDOW)
+    context = context[context["ts"] < records["ts"][0]]
+
+    entries = entries_from_records(exact, rover_id)   # logged/served values as sent
+    for entry in entries:
+        entry["source"] = "batch"
+    latest = dict(entries[-1], active=True, gasProfile=gas_model.profile(entries[-1].get("gas") or 0))
+    current = registry.extend(rover_id, records, latest)
+    log_writer.submit_batch(entries, records)
+
+    alerts, raised, cleared = ai.rules.evaluate_batch(
+        rover_id, np.concatenate([context, records]), rows=len(records), current=current, objects=latest_objects)
+    alert_log.extend(alerts)
+    for alert in alerts:
+        ALERTS_RAISED.inc(alert["rule"], alert["severity"])
+    if any(alert["escalate"] for alert in raised):
+        job = analysis.submit(current_status(rover_id))
+        for alert in raised:
+            if alert["escalate"]:
+                alert["analysis_job"] = job.id
+    if alerts or cleared:
+        print(f"[RULES] Batch of {len(records)} from {rover_id}: {len(alerts)} alert(s), "
+              f"{len(cleared)} cleared")
+    if current:
+        telemetry_stream.publish(dict(registry.latest(rover_id), objects=latest_objects,
+                                      alerts=ai.rules.active(rover_id)))
+
+    return jsonify({
+        "accepted": len(records),
+        "rejected": rejected,
+        "from": entries[0]["timestamp"],
+        "to": entries[-1]["timestamp"],
+        "current": current,
+        "alerts": alerts,
+    }), 200
 
 @app.route('/api/status', methods=['GET'])
 def get_status():
-    return jsonify(latest_data)
+    """Latest telemetry; ?rover=<id> selects a specific rover from the fleet."""
+    rover_id = request.args.get('rover')
+    if rover_id and registry.latest(rover_id) is None:
+        return jsonify({"error": f"Unknown or silent rover: {rover_id}"}), 404
+    return jsonify(current_status(rover_id))
+
+@app.route('/api/rovers', methods=['GET'])
+def get_rovers():
+    """Per-rover poller health and latest snapshot summary (polled rovers and push-only sources)."""
+    snapshots = registry.rovers()
+    rovers = {}
+    for rover_id in list(rover_poller.stats) + [r for r in snapshots if r not in rover_poller.stats]:
+        state = snapshots.get(rover_id, {})
+        rovers[rover_id] = dict(
+            rover_poller.stats.get(rover_id, {"url": None}),
+            active=state.get("active", False),
+            last_timestamp=state.get("timestamp"),
+            source=state.get("source"),
+        )
+    return jsonify({"rovers": rovers, "history_bytes": registry.memory_bytes()})
+
+def slotted(slots, make_stream, busy="Server busy, retrying"):
+    """
+    Runs an SSE generator inside a thread budget. The slot is taken when the
+    stream starts and released when it ends; with none free the client gets
+    one error event and a reconnect delay instead of a thread.
+    """
+    if not slots.acquire():
+        yield f"retry: {STREAM_RETRY_MS}\ndata: {json.dumps({'error': busy, 'busy': True})}\n\n"
+        return
+    try:
+        yield from make_stream()
+    finally:
+        slots.release()
+
+@app.route('/api/telemetry/stream', methods=['GET'])
+def stream_telemetry():
+    """
+    Server-Sent Events push of every telemetry update (replaces polling /api/status).
+    Query params:
+      fields  comma-separated subset of telemetry keys (default: all)
+      delta   "0" to always send full snapshots (default: only changed fields after the first)
+    Slow clients skip intermediate samples rather than buffering them.
+    """
+    fields = [f for f in request.args.get('fields', '').split(',') if f]
+    delta = request.args.get('delta', '1') != '0'
+    return Response(
+        slotted(stream_slots, lambda: telemetry_stream.stream(fields=fields or None, delta=delta)),
+        mimetype='text/event-stream',
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @app.route('/api/logs', methods=['GET'])
 def get_logs():
+    """
+    Returns logged telemetry, oldest first.
+    Query params: limit (default 50, newest entries win), and optional
+    since / until bounds as ISO-8601 timestamps or epoch seconds (inclusive).
+    recent=N serves the newest N samples from memory instead (optionally ?rover=<id>).
+    profile=1 adds each entry's estimated gasProfile.
+    """
     try:
+        recent = int(request.args['recent']) if request.args.get('recent') else None
         limit = int(request.args.get('limit', 50))
-        if not os.path.exists(LOG_FILE_PATH):
-            return jsonify({"logs": []})
-        with open(LOG_FILE_PATH, 'r') as f:
-            lines = f.readlines()
-            logs = [json.loads(line) for line in lines[-limit:]]
-            return jsonify({"logs": logs})
+        since = to_epoch(request.args.get('since'))
+        until = to_epoch(request.args.get('until'))
+    except ValueError as e:
+        return jsonify({"error": f"Bad query parameter: {e}"}), 400
+    try:
+        if recent is not None:
+            logs = registry.recent_entries(request.args.get('rover'), recent)
+        else:
+            logs = telemetry_store.query(since=since, until=until, limit=limit)
+        if request.args.get('profile') == '1':
+            with_gas_profiles(logs)
+        return jsonify({"logs": logs})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/analyze', methods=['GET'])
-def analyze_status():
-    analysis = ai.analyze_telemetry(latest_data)
+def with_gas_profiles(entries):
+    """Adds gasProfile to log entries in place, converting the whole gas column at once."""
+    adc = np.array([e.get("gas") if isinstance(e.get("gas"), (int, float)) else np.nan for e in entries],
+                   dtype=np.float64)
+    columns = {gas: _json_floats(np.round(values, 1)) for gas, values in gas_model.columns(adc).items()}
+    for i, entry in enumerate(entries):
+        entry["gasProfile"] = {gas: column[i] for gas, column in columns.items()}
+    return entries
+
+def _json_floats(values):
+    """NumPy array -> list with NaN mapped to null (NaN is not valid JSON)."""
+    return [None if v != v else v for v in values.tolist()]
+
+@app.route('/api/telemetry/aggregate', methods=['GET'])
+def aggregate_telemetry():
+    """
+    Downsamples a telemetry field over a time window from the columnar archive.
+    Query params:
+      field    numeric telemetry field (default temp), or a gas from the MQ135
+               profile (co2, ammonia, ...) derived from the gas column
+      from/to  window bounds, ISO-8601 or epoch seconds (default: whole archive)
+      buckets  number of output points (default 500, max 5000)
+      mode     "stats" (per-bucket min/max/mean/last/count, default) or "lttb"
+    Timestamps in the response are epoch seconds.
+    """
     try:
-        return jsonify(json.loads(analysis))
-    except:
-        return jsonify({"raw_output": analysis})
+        field = request.args.get('field', 'temp')
+        mode = request.args.get('mode', 'stats')
+        buckets = max(1, min(int(request.args.get('buckets', 500)), 5000))
+        since = to_epoch(request.args.get('from'))
+        until = to_epoch(request.args.get('to'))
+        source = "gas" if field in gas_model.gases else field
+        window = telemetry_archive.query(since=since, until=until, fields=[source])
+    except KeyError as e:
+        return jsonify({"error": e.args[0]}), 400
+    except ValueError as e:
+        return jsonify({"error": f"Bad query parameter: {e}"}), 400
+
+    ts, values = window["ts"], window[source]
+    if source != field:
+        values = gas_model.ppm(values, field)
+    if len(ts) == 0:
+        return jsonify({"field": field, "mode": mode, "from": since, "to": until, "points": 0})
+    t0 = since if since is not None else float(ts[0])
+    t1 = until if until is not None else float(ts[-1])
+
+    if mode == "lttb":
+        out_t, out_v = lttb(ts, values, buckets)
+        return jsonify({
+            "field": field, "mode": mode, "from": t0, "to": t1, "points": len(out_t),
+            "t": out_t.tolist(), "value": _json_floats(out_v),
+        })
+    if mode != "stats":
+        return jsonify({"error": f"Unknown mode: {mode}"}), 400
+
+    stats = bucket_stats(ts, values, t0, t1, buckets)
+    return jsonify({
+        "field": field, "mode": mode, "from": t0, "to": t1, "points": buckets,
+        "t": stats["t"].tolist(),
+        "min": _json_floats(stats["min"]),
+        "max": _json_floats(stats["max"]),
+        "mean": _json_floats(stats["mean"]),
+        "last": _json_floats(stats["last"]),
+        "count": stats["count"].tolist(),
+    })
+
+def run_analysis(status):
+    """One LLM analysis of a status snapshot, parsed to a dict (raw text if the model skipped the JSON)."""
+    started = time.perf_counter()
+    analysis = ai.analyze_telemetry(status)
+    LLM_DURATION.observe(time.perf_counter() - started, "analyze")
+    try:
+        return json.loads(analysis)
+    except ValueError:
+        return {"raw_output": analysis}
+
+analysis = AnalysisService(run_analysis)
+# Request threads are a fixed budget (gunicorn.conf.py): never park one on a slow generation for long
+ANALYZE_WAIT = 3     # seconds /api/analyze waits for a result before handing back the job id
+JOB_POLL_MAX_WAIT = 10   # cap on ?wait= long-polls; the /stream endpoint is for longer waits
+
+@app.route('/api/analyze', methods=['GET', 'POST'])
+def analyze_status():
+    """
+    LLM analysis of the current telemetry. Identical (quantized) readings share
+    one generation and reuse its result for a while. Answers at once when the
+    result is cached or ready within ANALYZE_WAIT seconds; otherwise 202 with
+    a job id to poll (or stream).
+    Query params:
+      async  "1" to return 202 with a job id at once instead of waiting
+    """
+    job = analysis.submit(current_status())
+    if request.args.get('async') == '1' or not job.wait(ANALYZE_WAIT):
+        return jsonify(dict(job.to_dict(), poll=f"/api/analyze/jobs/{job.id}")), 202
+    return jsonify(job.result)
+
+@app.route('/api/analyze/jobs/<int:job_id>', methods=['GET'])
+def analyze_job(job_id):
+    """Job status; ?wait=N long-polls up to N seconds for the result."""
+    job = analysis.get(job_id)
+    if job is None:
+        return jsonify({"error": "unknown job"}), 404
+    wait = min(request.args.get('wait', 0, type=float), JOB_POLL_MAX_WAIT)
+    if wait > 0:
+        job.wait(wait)
+    return jsonify(job.to_dict())
+
+@app.route('/api/analyze/jobs/<int:job_id>/stream', methods=['GET'])
+def analyze_job_stream(job_id):
+    """SSE: keep-alives while the job runs, then one message with the finished job."""
+    job = analysis.get(job_id)
+    if job is None:
+        return jsonify({"error": "unknown job"}), 404
+
+    def generate():
+        if job.finished is None:
+            yield f"data: {json.dumps(job.to_dict())}\n\n"
+        while not job.wait(15):
+            yield ": keepalive\n\n"
+        yield f"data: {json.dumps(job.to_dict())}\n\n"
+
+    return Response(slotted(stream_slots, generate), mimetype='text/event-stream',
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.route('/api/alerts', methods=['GET'])
+def get_alerts():
+    """
+    Rule-engine alerts.
+    Query params:
+      rover  restrict to one rover
+      limit  number of recent raised alerts (default 50)
+    """
+    rover_id = request.args.get('rover')
+    limit = request.args.get('limit', 50, type=int)
+    recent = [a for a in alert_log if rover_id is None or a["rover"] == rover_id]
+    return jsonify({
+        "active": ai.rules.active(rover_id),
+        "recent": recent[-limit:] if limit > 0 else [],
+        "evaluations": ai.rules.evaluations,
+    })
 
 @app.route('/api/sensor', methods=['GET'])
 def get_remote_sensor_data():
@@ -273,12 +637,16 @@ def services_status():
         pass
     
     # Check ESP32 poller (always running if backend is up)
-    esp32_connected = latest_data.get("active", False)
+    status = current_status()
+    esp32_connected = status.get("active", False)
     
     # Check Object Identifier
     obj_running = False
+    camera_stats = camera_status()
     if obj_process and obj_process.poll() is None:
         obj_running = True
+    elif any(cam["online"] for cam in camera_stats.values()):
+        obj_running = True
     else:
         # Fallback check via pgrep
         try:
@@ -291,8 +659,12 @@ def services_status():
         "ollama": ollama_running,
         "esp32": esp32_connected,
         "object_id": obj_running,
-        "esp32_source": latest_data.get("source", "none"),
-        "last_timestamp": latest_data.get("timestamp")
+        "cameras": camera_stats,
+        "analysis": analysis.stats(),
+        "streams": stream_slots.stats(),
+        "chat": chat_slots.stats(),
+        "esp32_source": status.get("source", "none"),
+        "last_timestamp": status.get("timestamp")
     }), 200
 
 @app.route('/api/services/start', methods=['POST'])
@@ -360,45 +732,35 @@ def chat():
     user_message = body.get('message', '')
     history = body.get('history', [])
 
-    # Build the messages array with system prompt + telemetry context
-    history_context = ""
-    try:
-        if os.path.exists(LOG_FILE_PATH):
-            with open(LOG_FILE_PATH, 'r') as f:
-                lines = f.readlines()
-                recent_logs = lines[-5:] # Last 5 entries
-                history_context = "\n\nRecent telemetry history (oldest to newest):\n" + "".join(recent_logs)
-    except:
-        pass
-
-    telemetry_context = f"\n\nCurrent telemetry readings: {json.dumps(latest_data)}" if latest_data.get('timestamp') else ""
-    
-    messages = [
-        {"role": "system", "content": SYSTEM_PROMPT + telemetry_context + history_context}
-    ]
-    
-    # Add conversation history
-    for msg in history:
-        messages.append({"role": msg["role"], "content": msg["content"]})
-    
-    # Add current user message
-    messages.append({"role": "user", "content": user_message})
+    # Stable system prompt, then budgeted history, then compact live telemetry (see chat_context.py)
+    messages = chat_context.build(user_message, history, current_status())
 
     def generate():
         yield f"data: {json.dumps({'status': 'connected'})}\n\n"
         try:
+            started = time.perf_counter()
+            ttft_ms = None
             stream = ollama.chat(
                 model='deepseek-r1:1.5b',
                 messages=messages,
-                stream=True
+                stream=True,
+                keep_alive=CHAT_KEEP_ALIVE,
+                options={"num_ctx": NUM_CTX},
             )
             
             full_response = ""
             inside_think = False
+            tokens = 0
             
             for chunk in stream:
                 token = chunk['message']['content']
                 if not token: continue
+                tokens += 1
+                if ttft_ms is None:
+                    first_token = time.perf_counter()
+                    ttft_ms = round(1000 * (first_token - started))
+                    LLM_TTFT.observe(first_token - started, "chat")
+                    print(f"[CHAT] Time to first token: {ttft_ms} ms")
                 full_response += token
                 
                 # Check for start of thinking
@@ -421,30 +783,257 @@ def chat():
                 if not inside_think:
                     yield f"data: {json.dumps({'token': token})}\n\n"
             
-            yield f"data: {json.dumps({'done': True})}\n\n"
+            finished = time.perf_counter()
+            LLM_DURATION.observe(finished - started, "chat")
+            LLM_TOKENS.inc("chat", amount=tokens)
+            if tokens > 1:
+                LLM_TOKENS_PER_S.set(round((tokens - 1) / max(finished - first_token, 1e-6), 2), "chat")
+            yield f"data: {json.dumps({'done': True, 'ttft_ms': ttft_ms})}\n\n"
             
         except Exception as e:
             yield f"data: {json.dumps({'error': str(e)})}\n\n"
 
-    return Response(generate(), mimetype='text/event-stream')
+    return Response(slotted(chat_slots, generate, busy="A.R.E.S. is answering other questions, try again shortly"),
+                    mimetype='text/event-stream')
+
+def camera_status():
+    """Per-camera detector health from the stats each camera worker posts with its results."""
+    now = time.time()
+    with cameras_lock:
+        items = list(cameras.items())
+    status = {}
+    for camera_id, cam in items:
+        stats = cam["stats"]
+        age = now - cam["received"]
+        status[camera_id] = {
+            "online": age <= CAMERA_STALE_AFTER,
+            "last_seen_s": round(age, 2),
+            "fps": stats.get("read_fps"),
+            "detect_fps": stats.get("detect_fps"),
+            "effective_fps": stats.get("effective_fps"),
+            "skip_rate": stats.get("skip_rate"),
+            "detect_ms": stats.get("detect_ms"),
+            # capture -> backend receive time of the latest result
+            "lag_ms": round(1000 * (cam["received"] - cam["captured"]), 1) if cam["captured"] else None,
+            "restarts": stats.get("restarts", 0),
+            "objects": len(cam["objects"]),
+            "events": cam["events"],
+            "preview_port": stats.get("preview_port"),
+            "preview_clients": stats.get("preview_clients"),
+            "event_latency_ms": latency_summary(cam["latency"]),
+        }
+    return status
+
+def latency_summary(samples):
+    """p50 / p95 / max of end-to-end event latencies (frame capture -> backend receive), in ms."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    pick = lambda q: round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 1)
+    return {"p50": pick(0.5), "p95": pick(0.95), "max": round(ordered[-1], 1), "n": len(ordered)}
 
 @app.route('/api/objects', methods=['GET', 'POST'])
 def manage_objects():
     """
-    GET: Returns the latest detected objects.
-    POST: Updates the latest detected objects from the identification script.
+    GET: Returns the latest detected objects (?camera=<id> for one camera).
+    POST: Updates the detected objects of one camera from the identification script.
     """
-    global latest_objects, latest_data
+    global latest_objects
     if request.method == 'POST':
-        latest_objects = request.json.get('objects', [])
-        latest_data['objects'] = latest_objects
+        body = request.json or {}
+        camera_id = body.get("camera", "default")
+        now = time.time()
+        with cameras_lock:
+            cam = cameras.get(camera_id)
+            if cam is None:
+                cam = cameras[camera_id] = {"objects": [], "captured": None, "received": now, "stats": {},
+                                            "events": 0, "latency": collections.deque(maxlen=LATENCY_WINDOW)}
+            cam["received"] = now
+            # Hazard events: every one opens or closes a history entry, with its end-to-end latency
+            for event in body.get("events", []):
+                captured = safe_float(event.get("captured"), None) or now
+                latency_ms = round(1000 * (now - captured), 1)
+                cam["latency"].append(latency_ms)
+                EVENT_LATENCY.observe(latency_ms / 1000, camera_id)
+                cam["events"] += 1
+                if event.get("event") == "cleared":
+                    hazard_store.close(camera_id, event["label"], event.get("track_id"), captured)
+                else:
+                    hazard_store.open(camera_id, event, captured, latency_ms)
+            # Routine state (may be absent on event-only posts)
+            if "objects" in body:
+                cam["objects"] = [dict(obj, camera=camera_id) for obj in body["objects"]]
+                cam["captured"] = safe_float(body.get("captured")) or None
+                cam["stats"] = body.get("stats") or {}
+                hazard_store.update(camera_id, cam["objects"], cam["captured"] or now)
+            # Detections from every camera that is still reporting
+            latest_objects = [obj for cam in cameras.values()
+                              if now - cam["received"] <= CAMERA_STALE_AFTER for obj in cam["objects"]]
+        telemetry_stream.publish(current_status())
         return jsonify({"status": "updated"}), 200
     else:
+        camera_id = request.args.get("camera")
+        if camera_id:
+            with cameras_lock:
+                cam = cameras.get(camera_id)
+            return jsonify({"camera": camera_id, "objects": cam["objects"] if cam else []})
         return jsonify({"objects": latest_objects})
 
+@app.route('/api/video/stream', methods=['GET'])
+@app.route('/api/video/<camera_id>/stream', methods=['GET'])
+@app.route('/api/video/<camera_id>/snapshot.jpg', methods=['GET'])
+def video_preview(camera_id=None):
+    """
+    Sends viewers to the shared preview of a camera (default: first online one)
+    served by the detector, so the ESP32-CAM itself keeps a single client.
+    Query params pass through: width, quality, fps, overlay=1 (see preview_stream.py).
+    """
+    status = camera_status()
+    if camera_id is None:
+        camera_id = next((cid for cid, cam in status.items() if cam["online"] and cam["preview_port"]), None)
+    cam = status.get(camera_id)
+    if cam is None or not cam["preview_port"]:
+        return jsonify({"error": "no preview available", "camera": camera_id}), 503
+    route = "snapshot.jpg" if request.path.endswith("snapshot.jpg") else "stream"
+    query = request.query_string.decode()
+    host = urlsplit(request.host_url).hostname
+    if ":" in host:
+        host = f"[{host}]"   # IPv6 literal
+    url = f"{request.scheme}://{host}:{cam['preview_port']}/{route}"
+    return redirect(f"{url}?{query}" if query else url, code=302)
+
+def nearest_telemetry(ts, rover_id=None):
+    """Telemetry sample closest to epoch ts: in-memory ring first, then the on-disk log."""
+    entry = registry.nearest(ts, rover_id, max_gap=TELEMETRY_JOIN_WINDOW)
+    if entry is not None:
+        return entry
+    candidates = telemetry_store.query(since=ts - TELEMETRY_JOIN_WINDOW, until=ts + TELEMETRY_JOIN_WINDOW)
+    if rover_id is not None:
+        candidates = [e for e in candidates if e.get("rover") == rover_id]
+    candidates = [e for e in candidates if e.get("timestamp")]
+    if not candidates:
+        return None
+    return min(candidates, key=lambda e: abs(to_epoch(e["timestamp"]) - ts))
+
+def _with_telemetry(event, rover_id=None):
+    return dict(event, telemetry=nearest_telemetry(event["opened"], rover_id))
+
+# Camera pipeline stats posted by each detector process -> (metric, help)
+CAMERA_METRICS = {
+    "read_fps": ("ares_camera_read_fps", "Camera frames read per second"),
+    "detect_fps": ("ares_camera_detect_fps", "Frames through the detect stage per second, motion-gate skips included"),
+    "effective_fps": ("ares_camera_effective_fps",
+                      "Frames actually analysed (full frame or changed regions) per second, skips excluded"),
+    "skip_rate": ("ares_camera_skip_rate", "Fraction of frames skipped by the motion gate"),
+    "decode_ms": ("ares_camera_decode_ms", "Mean JPEG decode time"),
+    "detect_ms": ("ares_camera_detect_ms", "Mean detection time per frame"),
+    "publish_ms": ("ares_camera_publish_ms", "Mean result post time"),
+    "dropped": ("ares_camera_dropped_frames", "Frames replaced before a worker picked them up"),
+    "restarts": ("ares_camera_restarts", "Detector process restarts"),
+    "preview_clients": ("ares_camera_preview_clients", "Connected preview viewers"),
+}
+
+def collect_runtime_metrics():
+    """Scrape-time values that already live in other components."""
+    now = time.time()
+    with cameras_lock:
+        cams = [(camera_id, dict(cam["stats"]), cam["received"], cam["captured"]) for camera_id, cam in cameras.items()]
+    families = [
+        (metric, "gauge", help_text, [({"camera": c}, stats.get(key)) for c, stats, _, _ in cams])
+        for key, (metric, help_text) in CAMERA_METRICS.items()
+    ]
+    families.append(("ares_camera_online", "gauge", "1 if the camera posted within CAMERA_STALE_AFTER",
+                     [({"camera": c}, int(now - received <= CAMERA_STALE_AFTER)) for c, _, received, _ in cams]))
+    families.append(("ares_camera_lag_seconds", "gauge", "Capture to receive time of the latest result",
+                     [({"camera": c}, received - captured) for c, _, received, captured in cams if captured]))
+
+    poll = dict(rover_poller.stats)
+    families += [
+        ("ares_rover_poll_ok_total", "counter", "Successful rover polls",
+         [({"rover": r}, st["ok"]) for r, st in poll.items()]),
+        ("ares_rover_consecutive_failures", "gauge", "Current run of failed polls",
+         [({"rover": r}, st["consecutive_failures"]) for r, st in poll.items()]),
+        ("ares_log_queue_depth", "gauge", "Samples waiting for the log writer", [({}, log_writer.queue_depth())]),
+        ("ares_log_samples_dropped_total", "counter", "Samples dropped by a full log queue", [({}, log_writer.dropped)]),
+        ("ares_stream_clients", "gauge", "Open SSE telemetry streams", [({}, telemetry_stream.subscribers)]),
+        ("ares_slots_in_use", "gauge", "Thread-budget slots in use",
+         [({"pool": "stream"}, stream_slots.in_use), ({"pool": "chat"}, chat_slots.in_use)]),
+        ("ares_slots_rejected_total", "counter", "Requests turned away by a full thread budget",
+         [({"pool": "stream"}, stream_slots.rejected), ({"pool": "chat"}, chat_slots.rejected)]),
+        ("ares_rule_evaluations_total", "counter", "Samples checked by the rule engine", [({}, ai.rules.evaluations)]),
+        ("ares_hazard_events", "gauge", "Hazard events in the history store", [({}, len(hazard_store))]),
+    ]
+    analysis_stats = analysis.stats()
+    families += [
+        ("ares_analysis_cache_hits_total", "counter", "/api/analyze answers served from cache",
+         [({}, analysis_stats["cache_hits"])]),
+        ("ares_analysis_joined_total", "counter", "/api/analyze calls that joined an in-flight generation",
+         [({}, analysis_stats["joined"])]),
+        ("ares_analysis_generations_total", "counter", "LLM analyses started", [({}, analysis_stats["generations"])]),
+    ]
+    return families
+
+REGISTRY.collect(collect_runtime_metrics)
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus text-format metrics for the backend and the cameras reporting to it."""
+    return Response(REGISTRY.render(), content_type=METRICS_CONTENT_TYPE)
+
+@app.route('/api/hazards', methods=['GET'])
+def get_hazards():
+    """
+    Hazard history, oldest first (recent events from memory, older ranges from the log).
+    Query params:
+      since/until     events overlapping the window (ISO-8601 or epoch seconds)
+      min_confidence  peak confidence threshold (0..1)
+      camera, label   exact filters (label e.g. FLAME)
+      open=1          only hazards still present
+      limit           newest N matches (default 100)
+      telemetry=0     skip joining each event to its nearest telemetry sample (?rover=<id> to pick the rover)
+    """
+    try:
+        hazard_store.expire()
+        min_confidence = request.args.get('min_confidence')
+        events = hazard_store.query(
+            since=to_epoch(request.args.get('since')),
+            until=to_epoch(request.args.get('until')),
+            min_confidence=float(min_confidence) if min_confidence else None,
+            camera=request.args.get('camera'),
+            label=request.args.get('label'),
+            open_only=request.args.get('open') == '1',
+            limit=int(request.args.get('limit', 100)),
+        )
+        if request.args.get('telemetry', '1') != '0':
+            events = [_with_telemetry(e, request.args.get('rover')) for e in events]
+        return jsonify({"events": events, "total": len(hazard_store)})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@app.route('/api/hazards/<int:event_id>', methods=['GET'])
+def get_hazard(event_id):
+    event = hazard_store.get(event_id)
+    if event is None:
+        return jsonify({"error": "unknown hazard event"}), 404
+    return jsonify(_with_telemetry(event, request.args.get('rover')))
+
+_background_lock = threading.Lock()
+_background_started = False
+
+def start_background():
+    """Starts the rover fleet poller. Idempotent: safe to call from every server hook."""
+    global _background_started
+    with _background_lock:
+        if _background_started:
+            return
+        _background_started = True
+    rover_poller.start()
+    for ep in ROVER_ENDPOINTS:
+        print(f"[ESP32 Poll] Polling {ep.rover_id} at {ep.url} every {ep.interval}s")
+
 if __name__ == '__main__':
-    # Start ESP32 polling in background
-    poller = threading.Thread(target=poll_esp32, daemon=True)
-    poller.start()
-    print(f"[ESP32 Poll] Polling {ESP32_DATA_URL} every {ESP32_POLL_INTERVAL}s")
+    # Development server. The reloader runs this module twice (watcher + server);
+    # only the serving child polls. Production: gunicorn -c gunicorn.conf.py wsgi:app
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_background()
     app.run(host='0.0.0.0', port=5000, debug=True)
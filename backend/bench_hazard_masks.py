@@ -0,0 +1,103 @@
+"""
+Project A.R.E.S. — Hazard Mask Benchmark
+Compares the per-frame cost of the original flame/smoke colour stage with the
+fused hazard_masks stage (full resolution and downscaled).
+
+Usage:
+    python3 bench_hazard_masks.py [--frames 200] [--size 640x480] [image.jpg ...]
+
+Without images, synthetic frames with a flickering flame blob and a grey smoke
+patch are generated.
+"""
+
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from hazard_masks import compute_hazard_masks, fire_candidates, smoke_detections
+
+
+def synthetic_frames(count, width, height, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for i in range(count):
+        frame = rng.integers(30, 90, size=(height, width, 3), dtype=np.uint8)
+        radius = int(min(width, height) * (0.08 + 0.02 * rng.random()))
+        cv2.circle(frame, (width // 2 + i % 7, height // 2), radius, (0, int(120 + 100 * rng.random()), 255), -1)
+        cv2.rectangle(frame, (width // 10, height // 10), (width // 4, height // 4), (150, 150, 150), -1)
+        frames.append(frame)
+    return frames
+
+
+def legacy_stage(frame):
+    """The colour stage as originally shipped in object_identifier.py (kept here only for comparison)."""
+    hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    mask1 = cv2.inRange(hsv, np.array([0, 70, 150], dtype="uint8"), np.array([25, 255, 255], dtype="uint8"))
+    mask2 = cv2.inRange(hsv, np.array([160, 70, 150], dtype="uint8"), np.array([180, 255, 255], dtype="uint8"))
+    hsv_mask = cv2.bitwise_or(mask1, mask2)
+    cv2.cvtColor(cv2.imdecode(cv2.imencode('.jpg', gray)[1], cv2.IMREAD_COLOR), cv2.COLOR_BGR2YCrCb)  # unused result
+    hsv_mask = cv2.dilate(hsv_mask, np.ones((5, 5), np.uint8), iterations=2)
+    hsv_mask = cv2.GaussianBlur(hsv_mask, (15, 15), 0)
+    fire, _ = cv2.findContours(hsv_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    for cnt in fire:
+        if cv2.contourArea(cnt) > 400:
+            x, y, w, h = cv2.boundingRect(cnt)
+            np.mean(gray[y:y + h, x:x + w])
+    smoke = cv2.GaussianBlur(cv2.inRange(hsv, np.array([0, 0, 100], dtype="uint8"), np.array([180, 50, 200], dtype="uint8")), (21, 21), 0)
+    cv2.findContours(smoke, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+
+def fused_stage(scale):
+    def run(frame):
+        masks = compute_hazard_masks(frame, scale)
+        fire_candidates(masks)
+        smoke_detections(masks)
+    return run
+
+
+def bench(fn, frames, warmup=10):
+    for frame in frames[:warmup]:
+        fn(frame)
+    timings = []
+    for frame in frames:
+        t0 = time.perf_counter()
+        fn(frame)
+        timings.append(time.perf_counter() - t0)
+    ms = np.array(timings) * 1000
+    return {"mean_ms": ms.mean(), "p50_ms": np.percentile(ms, 50), "p95_ms": np.percentile(ms, 95)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="A.R.E.S. hazard mask benchmark")
+    parser.add_argument("images", nargs="*", help="JPEG/PNG frames to use instead of synthetic ones")
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--size", default="640x480", help="synthetic frame size WxH")
+    args = parser.parse_args()
+
+    if args.images:
+        frames = [cv2.imread(p) for p in args.images]
+        frames = [f for f in frames if f is not None]
+        frames = (frames * (args.frames // max(1, len(frames)) + 1))[:args.frames]
+    else:
+        width, height = (int(v) for v in args.size.lower().split("x"))
+        frames = synthetic_frames(args.frames, width, height)
+
+    cv2.setNumThreads(1)  # per-frame cost on one core, as on the rover's edge CPU
+    h, w = frames[0].shape[:2]
+    print(f"{len(frames)} frames @ {w}x{h}, single thread")
+    results = {
+        "legacy (HSV+gray, JPEG round-trip)": bench(legacy_stage, frames),
+        "fused scale=1.0": bench(fused_stage(1.0), frames),
+        "fused scale=0.5": bench(fused_stage(0.5), frames),
+    }
+    base = results["legacy (HSV+gray, JPEG round-trip)"]["mean_ms"]
+    for name, r in results.items():
+        print(f"  {name:<36} mean {r['mean_ms']:6.2f} ms  p50 {r['p50_ms']:6.2f}  p95 {r['p95_ms']:6.2f}  "
+              f"x{base / r['mean_ms']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,386 @@
+"""
+Project A.R.E.S. — Load Test and Benchmark Suite
+Reproducible end-to-end runs against stand-in rovers and cameras (see
+telemetry_simulation.py), with results kept so regressions show up between
+runs.
+
+Usage:
+    python3 bench_load.py ingest [--rovers 20] [--rate 5] [--batch 1] [--duration 30] [--url URL --pid PID]
+    python3 bench_load.py poll   [--rovers 20] [--interval 0.5] [--delay 0.02] [--duration 30]
+    python3 bench_load.py vision [--frames 300] [--fps 15] [--size 640x480] [--frames-dir DIR] [--no-gate]
+    python3 bench_load.py all    [--check]
+
+Scenarios:
+    ingest  N rovers posting to /api/telemetry (or /api/telemetry/batch with
+            --batch) at a fixed rate. Without --url a scratch backend is
+            started under gunicorn with its own data directory, so nothing is
+            written to the real history. Reports throughput, p50/p99 request
+            latency and the backend's CPU and peak RSS.
+    poll    the fleet poller against an ESP32 /data stand-in serving N rovers
+            (in a separate process). Reports polls/s, p50/p99 RTT and the
+            poller's CPU.
+    vision  the object_identifier pipeline reading an MJPEG stand-in that
+            replays recorded (--frames-dir) or synthetic frames. Reports read
+            and detect FPS, per-frame decode/detect time and CPU per frame.
+
+Each run is appended to bench_results.jsonl (--results) and compared with the
+previous run of the same scenario, options and host; any metric that got
+worse by more than REGRESSION_TOLERANCE is flagged, and --check makes that a
+non-zero exit status. CPU and memory figures come from /proc (Linux).
+"""
+
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import requests
+
+from telemetry_simulation import RoverLoad, rover_configs
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_PATH = os.path.join(BASE_DIR, "bench_results.jsonl")
+REGRESSION_TOLERANCE = 0.10   # flag metrics more than 10% worse than the previous run
+STARTUP_TIMEOUT = 30          # seconds to wait for a spawned backend / stand-in
+RSS_SAMPLE_INTERVAL = 0.5     # seconds
+
+# metric -> +1 if higher is better, -1 if lower is better (others are informational)
+METRIC_DIRECTIONS = {
+    "throughput": 1, "requests_per_s": 1, "polls_per_s": 1, "read_fps": 1, "detect_fps": 1,
+    "p50_ms": -1, "p99_ms": -1, "errors": -1, "failures": -1, "cpu_percent": -1, "peak_rss_mb": -1,
+    "decode_ms": -1, "detect_ms": -1, "cpu_ms_per_frame": -1,
+}
+_CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+# ── Process usage (Linux /proc) ──
+
+def _children(pid):
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(p) for p in f.read().split()]
+    except OSError:
+        return []
+
+
+def process_usage(pid):
+    """(cpu seconds, rss MB) for pid and its children (gunicorn master + worker), or (None, None)."""
+    cpu, rss, pids = 0.0, 0.0, [pid]
+    try:
+        while pids:
+            p = pids.pop()
+            with open(f"/proc/{p}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            cpu += (int(fields[11]) + int(fields[12])) / _CLK_TCK   # utime + stime
+            rss += int(fields[21]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+            pids.extend(_children(p))
+    except (OSError, ValueError, IndexError):
+        return None, None
+    return cpu, rss
+
+
+class UsageMonitor:
+    """CPU % over a run and peak RSS, sampled from /proc for a process tree."""
+
+    def __init__(self, pid):
+        self.pid = pid
+        self.peak_rss = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self._cpu0, _ = process_usage(self.pid)
+        self._t0 = time.perf_counter()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def _sample(self):
+        while not self._stop.wait(RSS_SAMPLE_INTERVAL):
+            _, rss = process_usage(self.pid)
+            self.peak_rss = max(self.peak_rss, rss or 0.0)
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        cpu1, rss = process_usage(self.pid)
+        elapsed = time.perf_counter() - self._t0
+        if self._cpu0 is None or cpu1 is None:
+            self.result = {"cpu_percent": None, "peak_rss_mb": None}
+        else:
+            self.result = {"cpu_percent": round(100 * (cpu1 - self._cpu0) / elapsed, 1),
+                           "peak_rss_mb": round(max(self.peak_rss, rss), 1)}
+
+
+# ── Helpers ──
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for(url, timeout=STARTUP_TIMEOUT, proc=None):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc is not None and proc.poll() is not None:
+            raise RuntimeError(f"{' '.join(proc.args)} exited with status {proc.returncode}")
+        try:
+            requests.get(url, timeout=1)
+            return
+        except requests.RequestException:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+def percentiles(seconds):
+    if not len(seconds):
+        return {"p50_ms": None, "p99_ms": None}
+    p50, p99 = np.percentile(np.asarray(seconds) * 1000, [50, 99])
+    return {"p50_ms": round(float(p50), 2), "p99_ms": round(float(p99), 2)}
+
+
+@contextlib.contextmanager
+def simulator(*args):
+    """Runs telemetry_simulation.py with args in its own process (so its CPU is not counted)."""
+    proc = subprocess.Popen([sys.executable, os.path.join(BASE_DIR, "telemetry_simulation.py"), *args],
+                            cwd=BASE_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        yield proc
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+@contextlib.contextmanager
+def scratch_backend():
+    """A gunicorn backend on a free port with a throwaway data dir and no rovers to poll; yields (base url, pid)."""
+    port = free_port()
+    with tempfile.TemporaryDirectory(prefix="ares-bench-") as data_dir:
+        rovers_path = os.path.join(data_dir, "rovers.json")
+        with open(rovers_path, "w") as f:
+            json.dump([], f)
+        env = dict(os.environ, ARES_BIND=f"127.0.0.1:{port}", ARES_DATA_DIR=data_dir, ARES_ROVERS_CONFIG=rovers_path)
+        log = open(os.path.join(data_dir, "backend.log"), "w")
+        proc = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "wsgi:app"],
+                                cwd=BASE_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+        url = f"http://127.0.0.1:{port}"
+        try:
+            wait_for(f"{url}/api/status", proc=proc)
+            yield url, proc.pid
+        finally:
+            proc.terminate()
+            proc.wait(timeout=30)
+            log.close()
+
+
+# ── Scenarios ──
+
+def bench_ingest(args):
+    def run(url, pid):
+        load = RoverLoad(url, args.rovers, args.rate, args.batch, seed=args.seed)
+        monitor = UsageMonitor(pid) if pid else contextlib.nullcontext()
+        with monitor:
+            elapsed = load.run(args.duration)
+        result = {
+            "offered": round(args.rovers * args.rate, 1),
+            "throughput": round(load.samples / elapsed, 1),
+            "requests_per_s": round(len(load.latencies) / elapsed, 1),
+            "errors": load.errors,
+            **percentiles(load.latencies),
+        }
+        if pid:
+            result.update(monitor.result)
+        return result
+
+    if args.url:
+        return run(args.url, args.pid)
+    with scratch_backend() as (url, pid):
+        return run(url, pid)
+
+
+def bench_poll(args):
+    from rover_poller import RoverEndpoint, RoverPoller
+
+    port = free_port()
+    with simulator("--esp32", str(port), "--delay", str(args.delay)):
+        url = f"http://127.0.0.1:{port}"
+        wait_for(f"{url}/data")
+        rtts, lock = [], threading.Lock()
+
+        def on_sample(rover_id, raw, rtt):
+            with lock:
+                rtts.append(rtt)
+
+        endpoints = [RoverEndpoint.from_dict(cfg) for cfg in rover_configs(url, args.rovers, args.interval)]
+        poller = RoverPoller(endpoints, on_sample)
+        with UsageMonitor(os.getpid()) as monitor:
+            t0 = time.perf_counter()
+            poller.start()
+            time.sleep(args.duration)
+            with lock:
+                polls = len(rtts)
+                latencies = list(rtts)
+            elapsed = time.perf_counter() - t0
+        failures = sum(s["failures"] for s in poller.stats.values())
+    return {
+        "offered": round(args.rovers / args.interval, 1),
+        "polls_per_s": round(polls / elapsed, 1),
+        "failures": failures,
+        **percentiles(latencies),
+        "cpu_percent": monitor.result["cpu_percent"],
+    }
+
+
+def bench_vision(args):
+    import object_identifier
+    from object_identifier import HazardPipeline
+
+    port = free_port()
+    sim_args = ["--camera", str(port), "--fps", str(args.fps), "--limit", str(args.frames), "--size", args.size]
+    if args.frames_dir:
+        sim_args += ["--frames-dir", args.frames_dir]
+    with simulator(*sim_args) as proc:
+        base = f"http://127.0.0.1:{port}"
+        wait_for(f"{base}/api/objects", proc=proc)   # any HTTP answer (here a 404) means it is up
+        pipeline = HazardPipeline(f"{base}/stream", f"{base}/api/objects", workers=args.workers,
+                                  motion_gate=not args.no_gate, camera_id="bench")
+        object_identifier.STATS_INTERVAL = 3600      # keep the reporter quiet for the run
+        out = io.StringIO()
+        t0 = time.perf_counter()
+        cpu0 = time.process_time()
+        with contextlib.redirect_stdout(out if not args.verbose else sys.stdout):
+            pipeline.run()                           # returns when the stand-in ends the stream
+            while pipeline.frames._item is not None:
+                time.sleep(0.01)
+            time.sleep(0.2)                          # let the last frame finish detection
+        elapsed = time.perf_counter() - t0
+        cpu = time.process_time() - cpu0
+
+    stages = pipeline.stats.stages
+    analysed = stages["detect"]["count"]
+    avg = lambda s: round(1000 * stages[s]["total"] / stages[s]["count"], 2) if stages[s]["count"] else None
+    return {
+        "frames": stages["read"]["count"],
+        "analysed": analysed,
+        "dropped": pipeline.frames.dropped,
+        "read_fps": round(stages["read"]["count"] / elapsed, 1),
+        "detect_fps": round(analysed / elapsed, 1),
+        "decode_ms": avg("decode"),
+        "detect_ms": avg("detect"),
+        "cpu_ms_per_frame": round(1000 * cpu / analysed, 2) if analysed else None,
+    }
+
+
+SCENARIOS = {"ingest": bench_ingest, "poll": bench_poll, "vision": bench_vision}
+PARAMS = {
+    "ingest": ("rovers", "rate", "batch", "duration", "seed", "url"),
+    "poll": ("rovers", "interval", "delay", "duration"),
+    "vision": ("frames", "fps", "size", "frames_dir", "workers", "no_gate"),
+}
+
+
+# ── Results ──
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def load_results(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def compare(result, previous):
+    """Lines describing each metric against the previous run; returns (lines, regressions)."""
+    lines, regressions = [], []
+    for name, value in result["results"].items():
+        before = (previous or {}).get("results", {}).get(name)
+        line = f"  {name:<18} {value!s:>10}"
+        direction = METRIC_DIRECTIONS.get(name)
+        if isinstance(value, (int, float)) and isinstance(before, (int, float)) and before:
+            change = (value - before) / abs(before)
+            line += f"   was {before!s:>10}  {100 * change:+6.1f}%"
+            if direction and -direction * change > REGRESSION_TOLERANCE:
+                line += "  REGRESSION"
+                regressions.append(name)
+        lines.append(line)
+    return lines, regressions
+
+
+def run_scenario(name, args):
+    params = {key: getattr(args, key) for key in PARAMS[name]}
+    print(f"[BENCH] {name} {json.dumps(params)}")
+    result = {
+        "scenario": name,
+        "params": params,
+        "time": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "host": platform.node(),
+        "results": SCENARIOS[name](args),
+    }
+    history = load_results(args.results)
+    previous = next((r for r in reversed(history)
+                     if r["scenario"] == name and r["params"] == params and r.get("host") == result["host"]), None)
+    lines, regressions = compare(result, previous)
+    if previous:
+        print(f"  vs {previous['time']} ({previous.get('commit') or 'unknown commit'})")
+    print("\n".join(lines))
+    if not args.no_save:
+        with open(args.results, "a") as f:
+            f.write(json.dumps(result) + "\n")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="A.R.E.S. load test and benchmark suite")
+    parser.add_argument("scenario", choices=[*SCENARIOS, "all"])
+    parser.add_argument("--rovers", type=int, default=20, help="simulated rovers (ingest, poll)")
+    parser.add_argument("--rate", type=float, default=5.0, help="samples per second per rover (ingest)")
+    parser.add_argument("--batch", type=int, default=1, help="samples per post, >1 uses the batch endpoint (ingest)")
+    parser.add_argument("--interval", type=float, default=0.5, help="poll interval per rover, seconds (poll)")
+    parser.add_argument("--delay", type=float, default=0.02, help="ESP32 stand-in response delay, seconds (poll)")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds per ingest/poll run")
+    parser.add_argument("--url", help="benchmark a running backend instead of a scratch one (ingest)")
+    parser.add_argument("--pid", type=int, help="pid of the --url backend, for CPU and memory")
+    parser.add_argument("--frames", type=int, default=300, help="frames streamed (vision)")
+    parser.add_argument("--fps", type=float, default=15.0,
+                        help="camera stand-in frame rate; 0 = unthrottled, which mostly measures frame drops (vision)")
+    parser.add_argument("--size", default="640x480", help="synthetic frame size WxH (vision)")
+    parser.add_argument("--frames-dir", help="recorded JPEG frames to replay (vision)")
+    parser.add_argument("--workers", type=int, default=1, help="detect workers (vision)")
+    parser.add_argument("--no-gate", action="store_true", help="disable the motion gate (vision)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--results", default=RESULTS_PATH, help="results history file")
+    parser.add_argument("--no-save", action="store_true", help="compare without recording this run")
+    parser.add_argument("--check", action="store_true", help="exit 1 if any metric regressed")
+    parser.add_argument("--verbose", action="store_true", help="show the vision pipeline's own output")
+    args = parser.parse_args()
+
+    regressions = []
+    for name in (SCENARIOS if args.scenario == "all" else [args.scenario]):
+        regressions += [f"{name}.{metric}" for metric in run_scenario(name, args)]
+    if regressions:
+        print(f"[BENCH] Regressed beyond {100 * REGRESSION_TOLERANCE:.0f}%: {', '.join(regressions)}")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Project A.R.E.S. — Camera Supervisor
+Runs one hazard-detector worker process per camera and restarts any that die.
+
+    supervisor = CameraSupervisor(camera_process, [{"id": "arm-cam", "url": ".../stream"}], options)
+    supervisor.run()   # blocks; Ctrl+C / SIGTERM stops every worker
+
+Each camera gets its own process (spawned, not forked, so no threads or OpenCV
+state leak in from the supervisor), which keeps one slow or crashing stream
+from stalling the others and lets the decode/detect work use every core.
+target(camera, options, restarts) must be a module-level function.
+Crashed workers come back after an exponential backoff that resets once a
+worker has stayed up for STABLE_AFTER seconds.
+"""
+
+import multiprocessing
+import signal
+import time
+
+RESTART_DELAY = 2         # seconds before the first restart
+MAX_RESTART_DELAY = 60
+STABLE_AFTER = 60         # seconds of uptime after which the backoff resets
+CHECK_INTERVAL = 1
+
+
+class CameraSupervisor:
+    def __init__(self, target, cameras, options=None, restart_delay=RESTART_DELAY,
+                 max_restart_delay=MAX_RESTART_DELAY, stable_after=STABLE_AFTER):
+        self.target = target
+        self.cameras = {cam["id"]: cam for cam in cameras}
+        self.options = dict(options or {})
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.stable_after = stable_after
+        self._ctx = multiprocessing.get_context("spawn")
+        self._running = False
+        # camera id -> {process, started, restarts, delay, restart_at}
+        self.workers = {cam_id: {"process": None, "started": 0.0, "restarts": 0,
+                                 "delay": restart_delay, "restart_at": 0.0} for cam_id in self.cameras}
+
+    def _spawn(self, cam_id):
+        worker = self.workers[cam_id]
+        process = self._ctx.Process(
+            target=self.target,
+            args=(self.cameras[cam_id], self.options, worker["restarts"]),
+            name=f"ares-cam-{cam_id}",
+            daemon=True,
+        )
+        process.start()
+        worker["process"] = process
+        worker["started"] = time.time()
+        print(f"[SUPERVISOR] Camera {cam_id} started (pid {process.pid})")
+
+    def _check(self, cam_id, now):
+        worker = self.workers[cam_id]
+        process = worker["process"]
+        if process is not None and process.is_alive():
+            if now - worker["started"] >= self.stable_after:
+                worker["delay"] = self.restart_delay
+            return
+        if process is not None:
+            # Just exited: schedule the restart
+            uptime = now - worker["started"]
+            print(f"[SUPERVISOR] Camera {cam_id} exited with code {process.exitcode} after {uptime:.0f}s, "
+                  f"restarting in {worker['delay']:.0f}s")
+            process.join(0)
+            worker["process"] = None
+            worker["restart_at"] = now + worker["delay"]
+            worker["delay"] = min(worker["delay"] * 2, self.max_restart_delay)
+            worker["restarts"] += 1
+            return
+        if now >= worker["restart_at"]:
+            self._spawn(cam_id)
+
+    def status(self):
+        return {
+            cam_id: {
+                "pid": w["process"].pid if w["process"] is not None else None,
+                "alive": w["process"] is not None and w["process"].is_alive(),
+                "restarts": w["restarts"],
+            }
+            for cam_id, w in self.workers.items()
+        }
+
+    def stop(self, *_):
+        self._running = False
+
+    def run(self):
+        """Starts every camera worker and supervises them until stopped."""
+        self._running = True
+        signal.signal(signal.SIGTERM, self.stop)
+        try:
+            for cam_id in self.cameras:
+                self._spawn(cam_id)
+            while self._running:
+                time.sleep(CHECK_INTERVAL)
+                now = time.time()
+                for cam_id in self.cameras:
+                    if self._running:
+                        self._check(cam_id, now)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            for w in self.workers.values():
+                if w["process"] is not None and w["process"].is_alive():
+                    w["process"].terminate()
+            for w in self.workers.values():
+                if w["process"] is not None:
+                    w["process"].join(5)
+            print("[SUPERVISOR] Stopped")
@@ -0,0 +1,142 @@
+"""
+Project A.R.E.S. — Chat Context Builder
+Builds the Ollama message list for /api/chat so consecutive requests share as
+long a prompt prefix as possible (Ollama reuses the KV cache for a matching
+prefix, which is most of the time-to-first-token on a small CPU model).
+
+Message order, most stable first:
+    1. the fixed system prompt (byte-identical on every request)
+    2. conversation history, trimmed to the token budget in whole chunks so
+       the cut point (and therefore the prefix) only moves every few turns
+    3. one compact live-telemetry message, regenerated only when a new
+       sample or detection arrived
+    4. the new user message
+
+Telemetry is summarised from the registry's in-memory ring (current value,
+window min/max and trend per field) instead of dumping the raw snapshot,
+gasProfile and object list as JSON.
+"""
+
+import datetime
+
+import numpy as np
+
+CHARS_PER_TOKEN = 4          # rough estimate; no tokenizer is shipped with the backend
+MESSAGE_OVERHEAD = 4         # tokens of chat-template framing per message
+NUM_CTX = 2048               # Ollama context window (kept fixed: changing it reloads the model)
+RESPONSE_RESERVE = 512       # tokens left free for the answer
+HISTORY_CHUNK = 8            # history is dropped this many messages (4 turns) at a time
+SUMMARY_WINDOW = 60          # recent samples summarised per field
+
+# (field, label, format) in prompt order
+SUMMARY_FIELDS = (
+    ("temp", "temp", "{:.1f}"),
+    ("gas", "gas", "{:.0f}"),
+    ("pressure", "pressure", "{:.1f}"),
+    ("radiation", "radiation", "{:.2f}"),
+    ("flame", "flame", "{:.0f}"),
+    ("water", "water", "{:.0f}"),
+)
+
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+class ChatContextBuilder:
+    def __init__(self, system_prompt, registry, num_ctx=NUM_CTX, response_reserve=RESPONSE_RESERVE,
+                 window=SUMMARY_WINDOW):
+        self.system_prompt = system_prompt
+        self.registry = registry
+        self.num_ctx = num_ctx
+        self.response_reserve = response_reserve
+        self.window = window
+        self._system_tokens = estimate_tokens(system_prompt) + MESSAGE_OVERHEAD
+        self._cached = (None, "")  # (data key, rendered text), swapped as one tuple across request threads
+
+    # ── Volatile block ──
+    def telemetry_message(self, status):
+        """Compact live-telemetry text for a status snapshot; cached until the data changes."""
+        objects = status.get("objects") or []
+        key = (status.get("rover"), status.get("timestamp"),
+               tuple((o.get("label"), round(float(o.get("confidence", 0)), 2), o.get("camera")) for o in objects))
+        cached_key, text = self._cached
+        if key != cached_key:
+            text = self._render(status, objects)
+            self._cached = (key, text)
+        return text
+
+    def _render(self, status, objects):
+        if not status.get("timestamp"):
+            return "Live telemetry: no rover data received yet."
+        rover_id = status.get("rover")
+        recent = self.registry.recent(rover_id, self.window)
+
+        parts = []
+        for field, label, fmt in SUMMARY_FIELDS:
+            value = status.get(field)
+            if value is None:
+                continue
+            text = f"{label} {fmt.format(float(value))}"
+            if len(recent) > 1:
+                column = recent[field]
+                column = column[~np.isnan(column)]
+                if len(column) > 1 and column.min() != column.max():
+                    trend = column[-1] - column[0]
+                    text += (f" (last {len(column)}: {fmt.format(column.min())}-{fmt.format(column.max())}, "
+                             f"{'+' if trend >= 0 else ''}{fmt.format(trend)})")
+            parts.append(text)
+
+        accel = "/".join(f"{float(status.get(k, 0)):.2f}" for k in ("ax", "ay", "az"))
+        gyro = "/".join(f"{float(status.get(k, 0)):.1f}" for k in ("gx", "gy", "gz"))
+        parts.append(f"accel {accel} g")
+        parts.append(f"gyro {gyro}")
+        if status.get("lat") or status.get("lng"):
+            parts.append(f"position {float(status['lat']):.5f},{float(status['lng']):.5f}")
+
+        try:
+            when = datetime.datetime.fromisoformat(status["timestamp"]).strftime("%H:%M:%S")
+        except (TypeError, ValueError):
+            when = status["timestamp"]
+        lines = [f"Live telemetry ({rover_id or 'rover'}, {when}): " + ", ".join(parts) + "."]
+        if objects:
+            seen = ", ".join(f"{o.get('label')} {100 * float(o.get('confidence', 0)):.0f}%"
+                             + (f" on {o['camera']}" if o.get("camera") else "") for o in objects)
+            lines.append(f"Camera detections: {seen}.")
+        else:
+            lines.append("Camera detections: none.")
+        return "\n".join(lines)
+
+    # ── History budget ──
+    def trim_history(self, history, available):
+        """
+        Drops the oldest messages, HISTORY_CHUNK at a time, until history fits in
+        `available` tokens. The cut only moves when the budget is exceeded, so
+        the shared prefix survives several turns in a row.
+        """
+        costs = [estimate_tokens(m.get("content", "")) + MESSAGE_OVERHEAD for m in history]
+        total = sum(costs)
+        cut = 0
+        while total > available and cut < len(history):
+            step = min(HISTORY_CHUNK, len(history) - cut)
+            total -= sum(costs[cut:cut + step])
+            cut += step
+        # Never start on an assistant reply
+        while cut < len(history) and history[cut].get("role") == "assistant":
+            cut += 1
+        return history[cut:]
+
+    def build(self, user_message, history, status):
+        """Ollama messages for one /api/chat request (stable prefix first, volatile data last)."""
+        telemetry = self.telemetry_message(status)
+        fixed = (self._system_tokens + estimate_tokens(telemetry) + estimate_tokens(user_message)
+                 + 2 * MESSAGE_OVERHEAD)
+        available = max(0, self.num_ctx - self.response_reserve - fixed)
+        history = [{"role": m["role"], "content": m["content"]} for m in history
+                   if m.get("role") in ("user", "assistant")]
+        return (
+            [{"role": "system", "content": self.system_prompt}]
+            + self.trim_history(history, available)
+            + [{"role": "system", "content": telemetry},
+               {"role": "user", "content": user_message}]
+        )
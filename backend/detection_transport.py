@@ -0,0 +1,138 @@
+"""
+Project A.R.E.S. — Detection Transport
+Delivers detector results from a camera process to the backend's /api/objects.
+
+    transport = DetectionTransport(BACKEND_URL, camera_id="arm-cam").start()
+    transport.publish(captured, found_objects, stats)   # every analysed frame, never blocks
+
+One keep-alive requests.Session per camera; a single sender thread posts.
+Results are split in two:
+  * events — a hazard appearing (new track id, or a label not currently
+    present) or clearing after CLEAR_AFTER seconds without it. Every event
+    is queued and delivered with the capture time of the frame it was found
+    in; failed posts are retried.
+  * state — the routine "still present" object list. Only the newest one is
+    kept, and it is sent at most every coalesce_interval seconds unless an
+    event goes out first.
+Each post carries "sent" so the backend can separate detection time from
+transport time.
+"""
+
+import collections
+import threading
+import time
+
+import requests
+
+COALESCE_INTERVAL = 0.5   # seconds between routine state posts
+CLEAR_AFTER = 1.0         # seconds a detection must be absent before it counts as cleared
+MAX_PENDING_EVENTS = 1000
+RETRY_DELAY = 1.0
+MAX_RETRY_DELAY = 10.0
+
+
+def object_key(obj):
+    """Identity of a detection across frames: label plus track id when it has one."""
+    return obj["label"], obj.get("track_id")
+
+
+class DetectionTransport:
+    def __init__(self, url, camera_id, coalesce_interval=COALESCE_INTERVAL, clear_after=CLEAR_AFTER,
+                 timeout=2, max_events=MAX_PENDING_EVENTS, on_sent=None):
+        self.url = url
+        self.camera_id = camera_id
+        self.coalesce_interval = coalesce_interval
+        self.clear_after = clear_after
+        self.timeout = timeout
+        self.on_sent = on_sent              # on_sent(seconds) after each successful post
+        self.session = requests.Session()   # one pooled keep-alive connection
+        self._cond = threading.Condition()
+        self._events = collections.deque()
+        self._max_events = max_events
+        self._state = None                  # (captured, objects, stats) not yet sent
+        self._last_captured = 0.0
+        self._present = {}                  # key -> (object, capture time last seen)
+        self._thread = None
+        self.sent = 0
+        self.failed = 0
+        self.dropped_events = 0
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._sender, daemon=True)
+            self._thread.start()
+        return self
+
+    # ── Producer side (detect workers) ──
+    def publish(self, captured, objects, stats=None):
+        """Records one analysed frame: queues appear/clear events and replaces the pending state."""
+        detected = time.time()
+        with self._cond:
+            if captured < self._last_captured:
+                return  # a slower worker finished an older frame
+            self._last_captured = captured
+
+            for obj in objects:
+                key = object_key(obj)
+                if key not in self._present:
+                    self._queue_event("appeared", obj, captured, detected)
+                self._present[key] = (obj, captured)
+            # Short dropouts (a missed frame, a flicker check failing once) are not a clear
+            for key, (obj, seen) in list(self._present.items()):
+                if captured - seen >= self.clear_after:
+                    self._queue_event("cleared", obj, captured, detected)
+                    del self._present[key]
+
+            self._state = (captured, objects, stats)
+            self._cond.notify()
+
+    def _queue_event(self, kind, obj, captured, detected):
+        if len(self._events) >= self._max_events:
+            self._events.popleft()
+            self.dropped_events += 1
+        self._events.append(dict(obj, event=kind, captured=captured, detected=detected))
+
+    # ── Sender thread ──
+    def _sender(self):
+        last_post = 0.0
+        delay = RETRY_DELAY
+        while True:
+            with self._cond:
+                while True:
+                    due = last_post + self.coalesce_interval
+                    if self._events:
+                        break  # events go out immediately
+                    if self._state is not None and time.time() >= due:
+                        break
+                    self._cond.wait(None if self._state is None else max(0.0, due - time.time()))
+                events, self._events = list(self._events), collections.deque()
+                state, self._state = self._state, None
+
+            payload = {"camera": self.camera_id, "events": events, "sent": time.time()}
+            if state is not None:
+                captured, objects, stats = state
+                payload.update(captured=captured, objects=objects, stats=stats or {})
+
+            t0 = time.perf_counter()
+            try:
+                self.session.post(self.url, json=payload, timeout=self.timeout).raise_for_status()
+            except requests.RequestException as e:
+                self.failed += 1
+                with self._cond:
+                    # Keep the events for the retry; a newer state replaces ours
+                    self._events.extendleft(reversed(events))
+                    while len(self._events) > self._max_events:
+                        self._events.popleft()
+                        self.dropped_events += 1
+                    if self._state is None:
+                        self._state = state
+                print(f"[TRANSPORT {self.camera_id}] Post failed ({e}), retrying in {delay:.0f}s")
+                time.sleep(delay)
+                delay = min(delay * 2, MAX_RETRY_DELAY)
+                continue
+
+            delay = RETRY_DELAY
+            last_post = time.time()
+            self.sent += 1
+            if self.on_sent is not None:
+                self.on_sent(time.perf_counter() - t0)
@@ -0,0 +1,136 @@
+"""
+Project A.R.E.S. — MQ135 Gas Profile
+Estimated per-gas concentrations from the MQ135's single analog reading.
+
+    model = GasModel()                       # or GasModel(r0=...) / GasModel.from_clean_air(adc)
+    model.profile(1375)                      # {"co2": ..., "ammonia": ..., ...} for one reading
+    model.columns(archive["gas"])            # {"co2": array, ...} for a whole column of readings
+
+The sensor's resistance Rs follows from the ADC reading through the load
+resistor (ratiometric, so the ADC reference cancels out):
+    Rs = RL * (ADC_MAX - adc) / adc
+and each sensitivity curve is a power law in Rs/R0:
+    ppm = a * (Rs / R0) ** b
+R0 is the datasheet's: Rs at 100 ppm NH3, so clean air reads Rs/R0 =
+CLEAN_AIR_RATIO and R0 = Rs(clean air) / CLEAN_AIR_RATIO. The CO, NH3 (NH4
+curve), alcohol and toluene (used for benzene) fits are to the datasheet
+chart and already use that R0. The usual CO2 fit (116.6 * x ** -2.769,
+from the common MQ135 library) uses an R0 that puts clean air at Rs/R0 of
+about 0.63; its coefficient is rescaled here so 420 ppm falls on
+CLEAN_AIR_RATIO instead. All curves are evaluated on the same Rs/R0.
+
+CO2 is reported as an absolute level (clean air reads ATMOSPHERIC_CO2).
+Every other gas is the concentration of that gas alone that would explain
+the drop in Rs below its clean-air value, so clean air reads zero for them.
+Gases with no datasheet curve keep their old fixed fraction of the CO2 rise.
+
+Rs/R0 is clipped to each curve's valid range before conversion: never
+above CLEAN_AIR_RATIO (a reading below clean air is clean air), and never
+below the ratio at the top of the charted range (CURVE_MAX_PPM on the
+datasheet chart, CO2_MAX_PPM for CO2). Readings past that saturate at the
+range limit rather than extrapolating the power law. Every ADC value
+0..ADC_MAX is precomputed into a lookup table when the model is built, so
+converting a reading, or a million, is an index operation.
+
+These are estimates: one broad-spectrum sensor cannot separate gases.
+"""
+
+import numpy as np
+
+ADC_MAX = 4095                # ESP32 12-bit ADC
+LOAD_RESISTANCE = 10.0        # kOhm, RL on the MQ135 module
+ATMOSPHERIC_CO2 = 420.0       # ppm assumed when calibrating in clean air
+CLEAN_AIR_ADC = 300           # typical clean-air reading; re-measure per sensor with from_clean_air()
+CLEAN_AIR_RATIO = 3.6        # datasheet Rs/R0 in clean air (R0 = Rs at 100 ppm NH3)
+CURVE_MAX_PPM = 200.0        # top of the datasheet chart's gas curves (they span 10..200 ppm)
+CO2_MAX_PPM = 5000.0         # top of the range the CO2 fit is trusted for
+
+# The common library's CO2 fit, 116.6021 * x^-2.7690 with its own R0 (clean air at 420 ppm),
+# rescaled to the datasheet R0: ppm = a * (Rs/R0)^b with a = 420 * CLEAN_AIR_RATIO^-b
+_CO2_B = -2.7690
+# gas -> (a, b) for ppm = a * (Rs/R0)^b, all against the datasheet R0
+GAS_CURVES = {
+    "co2": (ATMOSPHERIC_CO2 * CLEAN_AIR_RATIO ** -_CO2_B, _CO2_B),
+    "co": (605.18, -3.937),
+    "ammonia": (102.2, -2.473),
+    "alcohol": (77.255, -3.18),
+    "benzene": (44.947, -3.445),   # toluene curve, the closest aromatic on the datasheet
+}
+# gas -> fraction of the CO2 rise above clean air, for gases with no datasheet curve
+GAS_RATIOS = {
+    "smoke": 0.30,
+    "nox": 0.15,
+    "methane": 0.10,
+    "sulfur": 0.08,
+    "hydrogen": 0.06,
+}
+# Output order (matches the dashboard's radar chart)
+GASES = ("co2", "ammonia", "benzene", "smoke", "alcohol", "nox", "co", "methane", "sulfur", "hydrogen")
+
+
+def rs_ratio(adc, r0, load_resistance=LOAD_RESISTANCE):
+    """Rs/R0 for ADC readings (inf at 0, where the sensor reads as open)."""
+    adc = np.asarray(adc, dtype=np.float64)
+    with np.errstate(divide="ignore"):
+        return load_resistance * (ADC_MAX - adc) / adc / r0
+
+
+class GasModel:
+    def __init__(self, r0=None, load_resistance=LOAD_RESISTANCE):
+        self.load_resistance = load_resistance
+        self.r0 = r0 if r0 is not None else self.r0_for(CLEAN_AIR_ADC, load_resistance)
+        self.gases = GASES
+        self._column = {gas: i for i, gas in enumerate(GASES)}
+        self.table = self._build_table()   # (ADC_MAX + 1, len(GASES)) float32, ppm
+
+    @staticmethod
+    def r0_for(clean_air_adc, load_resistance=LOAD_RESISTANCE):
+        """Datasheet R0 from a clean-air reading (clean air sits at CLEAN_AIR_RATIO)."""
+        rs = load_resistance * (ADC_MAX - clean_air_adc) / clean_air_adc
+        return rs / CLEAN_AIR_RATIO
+
+    @classmethod
+    def from_clean_air(cls, clean_air_adc, load_resistance=LOAD_RESISTANCE):
+        return cls(cls.r0_for(clean_air_adc, load_resistance), load_resistance)
+
+    def _build_table(self):
+        ratio = rs_ratio(np.arange(ADC_MAX + 1), self.r0, self.load_resistance)
+        table = np.empty((ADC_MAX + 1, len(GASES)), dtype=np.float32)
+        for gas, (a, b) in GAS_CURVES.items():
+            top = CO2_MAX_PPM if gas == "co2" else CURVE_MAX_PPM
+            valid = np.clip(ratio, (top / a) ** (1.0 / b), CLEAN_AIR_RATIO)
+            ppm = a * valid ** b
+            if gas != "co2":
+                ppm = ppm - a * CLEAN_AIR_RATIO ** b   # excess over this gas's clean-air reading
+            table[:, self._column[gas]] = np.maximum(ppm, 0.0)
+        rise = np.maximum(table[:, self._column["co2"]] - ATMOSPHERIC_CO2, 0.0)
+        for gas, fraction in GAS_RATIOS.items():
+            table[:, self._column[gas]] = rise * fraction
+        return table
+
+    def _rows(self, adc):
+        adc = np.asarray(adc, dtype=np.float64)
+        valid = ~np.isnan(adc)
+        rows = np.clip(np.rint(np.where(valid, adc, 0)), 0, ADC_MAX).astype(np.intp)
+        return rows, valid
+
+    def columns(self, adc, gases=None):
+        """{gas: ppm array} for an array of readings; NaN readings give NaN."""
+        rows, valid = self._rows(adc)
+        out = {}
+        for gas in gases or self.gases:
+            column = self.table[rows, self._column[gas]].astype(np.float64)
+            column[~valid] = np.nan
+            out[gas] = column
+        return out
+
+    def ppm(self, adc, gas):
+        return self.columns(adc, [gas])[gas]
+
+    def profile(self, adc):
+        """Per-gas estimate for one reading, rounded to 0.1 ppm (the dashboard's gasProfile)."""
+        try:
+            row = self.table[int(np.clip(round(float(adc)), 0, ADC_MAX))]
+        except (TypeError, ValueError):
+            return None
+        return dict(zip(self.gases, np.round(row.astype(np.float64), 1).tolist()))
@@ -0,0 +1,38 @@
+"""
+Project A.R.E.S. — gunicorn settings
+    cd backend && gunicorn -c gunicorn.conf.py wsgi:app
+
+One worker process, many threads: the backend's live state is in-process and
+its log files have a single writer (see serving.py for the sizing model).
+"""
+
+import os
+
+from serving import API_THREADS, CHAT_SLOTS, STREAM_SLOTS, thread_budget
+
+bind = os.environ.get("ARES_BIND", "0.0.0.0:5000")
+workers = 1                       # do not raise: state and the fleet poller are per process
+worker_class = "gthread"
+threads = thread_budget()
+timeout = 120                     # worker heartbeat, not a request limit (gthread keeps beating during streams)
+graceful_timeout = 10
+keepalive = 5
+accesslog = os.environ.get("ARES_ACCESS_LOG")   # unset = no access log (dashboards poll a lot)
+
+
+def on_starting(server):
+    if server.cfg.workers != 1:
+        raise RuntimeError("A.R.E.S. keeps live state in-process; run exactly one worker (scale with threads)")
+    server.log.info(f"A.R.E.S. thread budget: {STREAM_SLOTS} stream + {CHAT_SLOTS} chat + "
+                    f"{API_THREADS} API = {threads} threads")
+
+
+def post_worker_init(worker):
+    # Poller starts here, in the worker, exactly once (also after a worker restart)
+    from app import start_background
+    start_background()
+
+
+def worker_exit(server, worker):
+    from app import log_writer
+    log_writer.close()
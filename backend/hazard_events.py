@@ -0,0 +1,402 @@
+"""
+Project A.R.E.S. — Hazard Event Store
+Lifecycle history of every hazard the cameras report: when it appeared, how
+long it lasted, how confident the detector got.
+
+    store = HazardEventStore("hazard_events.jsonl")
+    store.open("arm-cam", {"label": "FLAME", "track_id": 3, "confidence": 0.7, "box": {...}}, ts)
+    store.update("arm-cam", objects, ts)      # routine "still present" lists
+    store.close("arm-cam", "FLAME", 3, ts)
+    store.query(since=t0, until=t1, min_confidence=0.8)
+
+An event is keyed per camera by (label, track_id). Opens and closes are
+appended to a JSONL log (the last record for an id wins on replay); updates
+only touch memory, and the peak confidence / last seen time are written with
+the close. Recent events live in memory with their open time, close time and peak
+confidence in NumPy columns, sorted by open time, so a time range is two
+binary searches plus a vectorized filter. Events still open on restart, or
+not seen for EXPIRE_AFTER seconds, are closed at their last sighting.
+
+The in-memory index is bounded: closed events older than RETENTION (and the
+oldest closed ones beyond MAX_INDEXED) leave it for a compact log index that
+keeps just their id, open/close time, peak confidence and the byte offset of
+their final record in the JSONL log. A query reaching back past the in-memory
+events filters that index and seeks to the few records it needs; get() for
+such an id reads one record.
+
+The log has a sidecar (<log>.idx) with one LOG_INDEX_DTYPE row per record, in
+file order, appended with every write. A restart loads it in one read, only
+parses the records of events still in the retention window, and rebuilds it
+(a full pass over the log) when it is missing or no longer matches the log.
+"""
+
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+EXPIRE_AFTER = 10.0   # seconds without a sighting before an open event is closed
+RETENTION = 24 * 3600 # seconds of closed events kept in the in-memory index
+MAX_INDEXED = 100000  # cap on indexed events; the oldest closed ones are dropped first
+EVICT_INTERVAL = 60.0 # seconds between index trims
+LOG_READ_CHUNK = 64   # log-only records read per pass when camera/label filters apply
+
+# One row per log record; closed is NaN while the event is open
+LOG_INDEX_DTYPE = np.dtype([("id", "<i8"), ("opened", "<f8"), ("closed", "<f8"), ("peak", "<f8"), ("offset", "<u8")])
+
+
+def _index_row(record, offset):
+    closed = record.get("closed")
+    return (record["id"], record["opened"], np.nan if closed is None else closed,
+            record.get("peak_confidence", 0.0), offset)
+
+
+def _parse(line):
+    """Log line -> record, or None for a torn or foreign line."""
+    try:
+        record = json.loads(line)
+        record["id"], record["opened"]
+    except (ValueError, KeyError, TypeError):
+        return None
+    return record
+
+
+class HazardEventStore:
+    def __init__(self, path, expire_after=EXPIRE_AFTER, retention=RETENTION, max_indexed=MAX_INDEXED):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.expire_after = expire_after
+        self.retention = retention
+        self.max_indexed = max_indexed
+        self._lock = threading.Lock()
+        self._events = []     # event dicts, ordered by "opened"
+        self._open = {}       # (camera, label, track_id) -> event
+        self._by_id = {}
+        self._offsets = {}    # indexed event id -> log offset of its latest record
+        self._next_id = 1
+        # Index columns aligned with _events
+        self._opened = np.empty(256)
+        self._closed = np.empty(256)  # +inf while open
+        self._peak = np.empty(256)
+        self._max_duration = 0.0      # longest closed event, bounds the range search
+        # Events on disk only: LOG_INDEX_DTYPE rows of their final records, sorted by open time
+        self._logged = np.empty(0, dtype=LOG_INDEX_DTYPE)
+        self._last_evict = 0.0
+        self._load()
+
+    # ── Persistence ──
+    def _load(self):
+        started = time.time()
+        rows = self._scan_log()
+        self._file = open(self.path, "ab", buffering=0)
+        self._index_file = open(self.index_path, "ab", buffering=0)
+        if not len(rows):
+            return
+        self._next_id = int(rows["id"].max()) + 1
+        # Final record of every event (the last row for an id wins)
+        _, last = np.unique(rows["id"][::-1], return_index=True)
+        final = rows[len(rows) - 1 - last]
+        keep = np.isnan(final["closed"]) | (final["closed"] >= started - self.retention)
+        logged = final[~keep]
+        self._logged = logged[np.argsort(logged["opened"], kind="stable")]
+        kept = final[keep]
+        records, recovered = [], []
+        for offset, record in zip(kept["offset"].tolist(), self._read(kept["offset"])):
+            if record is None:
+                continue
+            self._offsets[record["id"]] = offset
+            records.append(record)
+            if record.get("closed") is None:
+                # Open when the backend stopped: close it at its last sighting
+                record["closed"] = record.get("last_seen", record["opened"])
+                record["closed_by"] = "restart"
+                recovered.append(record)
+        for record in sorted(records, key=lambda r: r["opened"]):
+            self._insert(record)
+        for record in recovered:
+            self._write(record)
+        print(f"[HAZARDS] Indexed {len(self._events)} event(s) from {self.path} "
+              f"({len(recovered)} closed at restart, {len(self._logged)} older on disk only) "
+              f"in {1000 * (time.time() - started):.0f} ms")
+
+    def _scan_log(self):
+        """
+        Every log record's LOG_INDEX_DTYPE row, in file order: the sidecar plus
+        any records it is missing (or a full rebuild if it does not match).
+        Also drops a torn last line so the next write starts on a line boundary.
+        """
+        if not os.path.exists(self.path):
+            if os.path.exists(self.index_path):
+                os.remove(self.index_path)
+            return np.empty(0, dtype=LOG_INDEX_DTYPE)
+        rows = np.empty(0, dtype=LOG_INDEX_DTYPE)
+        if os.path.exists(self.index_path):
+            count = os.path.getsize(self.index_path) // LOG_INDEX_DTYPE.itemsize
+            rows = np.fromfile(self.index_path, dtype=LOG_INDEX_DTYPE, count=count)
+        with open(self.path, "r+b") as f:
+            size = f.seek(0, os.SEEK_END)
+            if len(rows) and not self._index_matches(f, rows[-1], size):
+                print(f"[HAZARDS] {self.index_path} does not match the log; rebuilding it")
+                rows = rows[:0]
+            start = 0
+            if len(rows):
+                f.seek(int(rows["offset"][-1]))
+                f.readline()
+                start = f.tell()
+            f.seek(start)
+            offset, missing = start, []
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                record = _parse(line)
+                if record is not None:
+                    missing.append(_index_row(record, offset))
+                offset += len(line)
+            if offset < size:
+                f.truncate(offset)   # torn last line after a crash
+        missing = np.array(missing, dtype=LOG_INDEX_DTYPE)
+        with open(self.index_path, "ab" if len(rows) else "wb") as f:
+            f.truncate(len(rows) * LOG_INDEX_DTYPE.itemsize)   # and a torn last row
+            f.write(missing.tobytes())
+        return np.concatenate([rows, missing])
+
+    @staticmethod
+    def _index_matches(f, row, size):
+        """True if the sidecar's last row still points at the same record in the log."""
+        offset = int(row["offset"])
+        if offset >= size:
+            return False
+        if offset > 0:
+            f.seek(offset - 1)
+            if f.read(1) != b"\n":
+                return False
+        f.seek(offset)
+        record = _parse(f.readline())
+        return record is not None and record["id"] == row["id"] and record["opened"] == row["opened"]
+
+    def _read(self, offsets):
+        """Parses the log records at the given offsets (in that order), front to back on disk."""
+        offsets = np.asarray(offsets, dtype=np.uint64)
+        records = [None] * len(offsets)
+        with open(self.path, "rb") as f:
+            for i in np.argsort(offsets, kind="stable"):
+                f.seek(int(offsets[i]))
+                records[i] = _parse(f.readline())
+        return records
+
+    def _write(self, event):
+        offset = self._file.seek(0, os.SEEK_END)
+        self._file.write((json.dumps(event) + "\n").encode())
+        self._index_file.write(np.array([_index_row(event, offset)], dtype=LOG_INDEX_DTYPE).tobytes())
+        self._offsets[event["id"]] = offset
+
+    # ── Index ──
+    def _insert(self, event):
+        n = len(self._events)
+        if n == len(self._opened):
+            for name in ("_opened", "_closed", "_peak"):
+                column = getattr(self, name)
+                setattr(self, name, np.concatenate([column, np.empty(len(column))]))
+        # Opens arrive almost in time order; a camera with a lagging clock may need a short shift
+        i = n
+        while i > 0 and self._opened[i - 1] > event["opened"]:
+            i -= 1
+        if i < n:
+            for name in ("_opened", "_closed", "_peak"):
+                column = getattr(self, name)
+                column[i + 1:n + 1] = column[i:n]
+        self._events.insert(i, event)
+        self._by_id[event["id"]] = event
+        self._opened[i] = event["opened"]
+        self._closed[i] = event["closed"] if event.get("closed") is not None else np.inf
+        self._peak[i] = event["peak_confidence"]
+        if event.get("closed") is not None:
+            self._max_duration = max(self._max_duration, event["closed"] - event["opened"])
+
+    def _position(self, event):
+        i = int(np.searchsorted(self._opened[:len(self._events)], event["opened"]))
+        while self._events[i] is not event:
+            i += 1
+        return i
+
+    # ── Lifecycle ──
+    def open(self, camera, obj, ts, latency_ms=None):
+        """Starts an event for a hazard that appeared (no-op if it is already open)."""
+        key = (camera, obj["label"], obj.get("track_id"))
+        with self._lock:
+            event = self._open.get(key)
+            if event is not None:
+                self._touch(event, obj, ts)
+                return event
+            confidence = float(obj.get("confidence", 0.0))
+            event = {
+                "id": self._next_id,
+                "camera": camera,
+                "label": obj["label"],
+                "track_id": obj.get("track_id"),
+                "opened": ts,
+                "last_seen": ts,
+                "closed": None,
+                "peak_confidence": confidence,
+                "peak_box": obj.get("box"),
+                "first_box": obj.get("box"),
+                "sightings": 1,
+                "latency_ms": latency_ms,
+            }
+            self._next_id += 1
+            self._open[key] = event
+            self._insert(event)
+            self._write(event)
+            return event
+
+    def _touch(self, event, obj, ts):
+        event["last_seen"] = max(event["last_seen"], ts)
+        event["sightings"] += 1
+        confidence = float(obj.get("confidence", 0.0))
+        if confidence > event["peak_confidence"]:
+            event["peak_confidence"] = confidence
+            event["peak_box"] = obj.get("box")
+            self._peak[self._position(event)] = confidence
+
+    def update(self, camera, objects, ts):
+        """Refreshes open events from a routine object list; also expires stale ones."""
+        with self._lock:
+            for obj in objects:
+                event = self._open.get((camera, obj["label"], obj.get("track_id")))
+                if event is not None:
+                    self._touch(event, obj, ts)
+            self._expire(ts)
+
+    def close(self, camera, label, track_id, ts, reason="cleared"):
+        with self._lock:
+            event = self._open.get((camera, label, track_id))
+            if event is not None:
+                self._close(event, ts, reason)
+
+    def _close(self, event, ts, reason):
+        del self._open[(event["camera"], event["label"], event["track_id"])]
+        event["closed"] = max(ts, event["opened"])
+        event["closed_by"] = reason
+        self._closed[self._position(event)] = event["closed"]
+        self._max_duration = max(self._max_duration, event["closed"] - event["opened"])
+        self._write(event)
+
+    def _expire(self, now):
+        for event in [e for e in self._open.values() if now - e["last_seen"] > self.expire_after]:
+            self._close(event, event["last_seen"], "expired")
+        self._evict(now)
+
+    def expire(self, now=None):
+        with self._lock:
+            self._expire(time.time() if now is None else now)
+
+    def _evict(self, now):
+        """Moves closed events past the retention window (or over MAX_INDEXED) to the log index."""
+        if now - self._last_evict < EVICT_INTERVAL:
+            return
+        self._last_evict = now
+        cutoff = now - self.retention
+        n = len(self._events)
+        k = 0
+        # Only a prefix can go (the index is sorted by open time); an open event stops the trim
+        while k < n and np.isfinite(self._closed[k]) and (self._closed[k] < cutoff or n - k > self.max_indexed):
+            k += 1
+        if not k:
+            return
+        evicted = np.array([_index_row(e, self._offsets.pop(e["id"])) for e in self._events[:k]],
+                           dtype=LOG_INDEX_DTYPE)
+        logged = np.concatenate([self._logged, evicted])
+        self._logged = logged[np.argsort(logged["opened"], kind="stable")]
+        for name in ("_opened", "_closed", "_peak"):
+            column = getattr(self, name)
+            column[:n - k] = column[k:n]
+        for event in self._events[:k]:
+            del self._by_id[event["id"]]
+        del self._events[:k]
+
+    # ── Queries ──
+    def query(self, since=None, until=None, min_confidence=None, camera=None, label=None,
+              open_only=False, limit=None):
+        """
+        Events overlapping [since, until] (either bound optional) with peak
+        confidence >= min_confidence, oldest first; limit keeps the newest.
+        Matches among the events that left memory are found in the log index
+        and only the records that can make the result are read from the log.
+        """
+        with self._lock:
+            n = len(self._events)
+            opened, closed, peak = self._opened[:n], self._closed[:n], self._peak[:n]
+            hi = n if until is None else int(np.searchsorted(opened, until, side="right"))
+            lo = 0
+            if since is not None:
+                # A closed event that opened before since - max_duration cannot reach since
+                start = since - self._max_duration
+                if self._open:
+                    start = min(start, min(e["opened"] for e in self._open.values()))
+                lo = int(np.searchsorted(opened, start, side="left"))
+            mask = np.ones(hi - lo, dtype=bool)
+            if since is not None:
+                mask &= closed[lo:hi] >= since
+            if min_confidence is not None:
+                mask &= peak[lo:hi] >= min_confidence
+            if open_only:
+                mask &= np.isinf(closed[lo:hi])
+            picked = [self._events[lo + i] for i in np.flatnonzero(mask)]
+            if camera is not None:
+                picked = [e for e in picked if e["camera"] == camera]
+            if label is not None:
+                picked = [e for e in picked if e["label"] == label]
+            picked = [dict(e) for e in picked]
+            logged = self._logged if not open_only else self._logged[:0]   # log-only events are all closed
+
+        if limit is not None and limit <= 0:
+            return []
+        if len(logged):
+            mask = np.ones(len(logged), dtype=bool)
+            if since is not None:
+                mask &= logged["closed"] >= since
+            if until is not None:
+                mask &= logged["opened"] <= until
+            if min_confidence is not None:
+                mask &= logged["peak"] >= min_confidence
+            if limit is not None and len(picked) >= limit:
+                # Only events newer than the oldest of the newest `limit` matches in memory can count
+                mask &= logged["opened"] > picked[-limit]["opened"]
+            candidates = logged[mask]
+            older = []
+            # Newest first, a chunk at a time, until `limit` matches are found (they beat every older one)
+            filtered = camera is not None or label is not None
+            end = len(candidates)
+            while end > 0 and (limit is None or len(older) < limit):
+                wanted = end if limit is None else limit - len(older)
+                chunk = min(end, max(wanted, LOG_READ_CHUNK) if filtered else wanted)
+                batch = [r for r in self._read(candidates["offset"][end - chunk:end][::-1]) if r is not None]
+                older.extend(r for r in batch
+                             if (camera is None or r["camera"] == camera) and (label is None or r["label"] == label))
+                end -= chunk
+            if older:
+                picked = sorted(older + picked, key=lambda e: e["opened"])
+        if limit is not None:
+            picked = picked[-limit:]
+        return picked
+
+    def get(self, event_id):
+        with self._lock:
+            event = self._by_id.get(event_id)
+            if event is not None:
+                return dict(event)
+            hits = np.flatnonzero(self._logged["id"] == event_id)
+            if not len(hits):
+                return None
+            offset = self._logged["offset"][hits[-1]]
+        return self._read([offset])[0]
+
+    def __len__(self):
+        """Events ever recorded (indexed or not)."""
+        return self._next_id - 1
+
+    def close_file(self):
+        self._file.close()
+        self._index_file.close()
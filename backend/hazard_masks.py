@@ -0,0 +1,115 @@
+"""
+Project A.R.E.S. — Fused Hazard Masks
+One colour-space pass per frame that feeds both flame and smoke detection.
+
+    masks = compute_hazard_masks(frame_bgr, scale=0.5)
+    candidates = fire_candidates(masks)      # (x, y, w, h, area, intensity) in full-res pixels
+    smoke = smoke_detections(masks)          # [{"label": "SMOKE", ...}]
+
+The BGR frame is optionally downscaled once, converted to HSV and YCrCb once,
+and the YCrCb luma plane doubles as the gray image (BT.601 Y is exactly what
+COLOR_BGR2GRAY computes). Flame pixels must pass both the HSV colour range and
+the YCbCr rules Y > Cb and Cr > Cb. Boxes and areas are reported in full-frame
+pixels whatever the working scale.
+"""
+
+import cv2
+import numpy as np
+
+# ── Flame colour (HSV): bright yellow to deep orange/red, hue wraps at 180 ──
+FIRE_HSV_RANGES = (
+    (np.array([0, 70, 150], dtype="uint8"), np.array([25, 255, 255], dtype="uint8")),
+    (np.array([160, 70, 150], dtype="uint8"), np.array([180, 255, 255], dtype="uint8")),
+)
+FIRE_MIN_AREA = 400      # full-res px²
+
+# ── Smoke colour (HSV): low saturation grey/white ──
+SMOKE_HSV_RANGE = (np.array([0, 0, 100], dtype="uint8"), np.array([180, 50, 200], dtype="uint8"))
+SMOKE_MIN_AREA = 1000    # full-res px²
+
+
+def _odd(size):
+    size = max(1, int(round(size)))
+    return size if size % 2 else size + 1
+
+
+class HazardMasks:
+    """Shared per-frame planes and masks at working scale."""
+
+    __slots__ = ("scale", "gray", "fire", "smoke")
+
+    def __init__(self, scale, gray, fire, smoke):
+        self.scale = scale
+        self.gray = gray
+        self.fire = fire
+        self.smoke = smoke
+
+
+def fire_color_mask(hsv):
+    """HSV-only flame colour mask."""
+    (lo1, hi1), (lo2, hi2) = FIRE_HSV_RANGES
+    return cv2.bitwise_or(cv2.inRange(hsv, lo1, hi1), cv2.inRange(hsv, lo2, hi2))
+
+
+def smoke_color_mask(hsv):
+    return cv2.inRange(hsv, *SMOKE_HSV_RANGE)
+
+
+def compute_hazard_masks(frame, scale=1.0):
+    """Runs the colour conversions once and builds refined flame and smoke masks."""
+    if scale < 1.0:
+        frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+    ycrcb = cv2.cvtColor(frame, cv2.COLOR_BGR2YCrCb)
+    y, cr, cb = cv2.split(ycrcb)
+
+    # Flame: colour range AND YCbCr rules (Y > Cb, Cr > Cb)
+    ycc_rule = cv2.bitwise_and(cv2.compare(y, cb, cv2.CMP_GT), cv2.compare(cr, cb, cv2.CMP_GT))
+    fire = cv2.bitwise_and(fire_color_mask(hsv), ycc_rule)
+    fire = cv2.dilate(fire, np.ones((_odd(5 * scale),) * 2, np.uint8), iterations=2)
+    fire = cv2.GaussianBlur(fire, (_odd(15 * scale),) * 2, 0)
+
+    smoke = cv2.GaussianBlur(smoke_color_mask(hsv), (_odd(21 * scale),) * 2, 0)
+    return HazardMasks(scale, y, fire, smoke)
+
+
+def fire_regions(mask, gray, scale=1.0, min_area=FIRE_MIN_AREA):
+    """Contours of a flame mask as (x, y, w, h, area, intensity) in full-res pixels."""
+    inv = 1.0 / scale
+    area_scale = inv * inv
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    regions = []
+    for cnt in contours:
+        area = cv2.contourArea(cnt) * area_scale
+        if area > min_area:
+            x, y, w, h = cv2.boundingRect(cnt)
+            # Use average gray intensity in the box as 'brightness'
+            intensity = float(np.mean(gray[y:y + h, x:x + w]))
+            regions.append((int(x * inv), int(y * inv), int(w * inv), int(h * inv), area, intensity))
+    return regions
+
+
+def smoke_regions(mask, scale=1.0, min_area=SMOKE_MIN_AREA):
+    """Contours of a smoke mask as SMOKE detections in full-res pixels."""
+    inv = 1.0 / scale
+    area_scale = inv * inv
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    detections = []
+    for cnt in contours:
+        area = cv2.contourArea(cnt) * area_scale
+        if area > min_area:
+            x, y, w, h = (int(v * inv) for v in cv2.boundingRect(cnt))
+            detections.append({
+                "label": "SMOKE",
+                "confidence": min(0.90, 0.4 + (area / 15000.0)),
+                "box": [x, y, x + w, y + h]
+            })
+    return detections
+
+
+def fire_candidates(masks):
+    return fire_regions(masks.fire, masks.gray, masks.scale)
+
+
+def smoke_detections(masks):
+    return smoke_regions(masks.smoke, masks.scale)
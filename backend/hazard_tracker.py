@@ -0,0 +1,179 @@
+"""
+Project A.R.E.S. — Hazard Tracker Pool
+Multi-object tracker that follows candidate flame regions across frames.
+
+Detections are associated with existing tracks by IoU, falling back to centroid
+distance, using vectorized cost matrices and greedy assignment. A flame that
+drifts across the frame keeps its history instead of restarting validation.
+Tracks expire after MAX_MISSED_FRAMES frames without a match and the pool is
+capped, so memory stays bounded however long the camera runs.
+
+Each track keeps its area / intensity history in fixed-size NumPy ring buffers
+with running sums, so the flicker and growth checks cost O(1) per frame.
+"""
+
+import numpy as np
+
+# Selective Validation thresholds
+FLICKER_THRESHOLD = 0.05  # Increased for selectivity
+GROWTH_STABILITY = 0.08   # Required boundary movement
+MIN_FRAMES_VALIDATION = 5 # More evidence required
+
+# Association
+IOU_THRESHOLD = 0.2       # min overlap to continue a track
+MAX_CENTROID_DISTANCE = 60  # px; fallback match for small/fast regions with no overlap
+MAX_MISSED_FRAMES = 5     # frames a track survives without a match
+MAX_TRACKS = 64
+
+
+class HazardTracker:
+    """Tracks one detected region over time to validate flicker and growth."""
+
+    def __init__(self, max_history=10, track_id=None, box=None):
+        self.track_id = track_id
+        self.box = box  # (x1, y1, x2, y2) of the latest match
+        self.max_history = max_history
+        self.missed = 0
+        self.hits = 0
+        self._area = np.zeros(max_history)
+        self._intensity = np.zeros(max_history)
+        self._head = 0
+        self._count = 0
+        # Running sums of values and squares for O(1) mean / variance
+        self._sums = np.zeros(4)  # area, area², intensity, intensity²
+
+    def update(self, area, intensity):
+        i = self._head
+        if self._count == self.max_history:
+            old_a, old_i = self._area[i], self._intensity[i]
+            self._sums -= (old_a, old_a * old_a, old_i, old_i * old_i)
+        else:
+            self._count += 1
+        self._area[i], self._intensity[i] = area, intensity
+        self._sums += (area, area * area, intensity, intensity * intensity)
+        self._head = (i + 1) % self.max_history
+        self.hits += 1
+
+    def _stats(self):
+        n = self._count
+        sa, sa2, si, si2 = self._sums
+        mean_a, mean_i = sa / n, si / n
+        var_a = max(sa2 / n - mean_a * mean_a, 0.0)
+        var_i = max(si2 / n - mean_i * mean_i, 0.0)
+        return mean_a, var_a, mean_i, var_i
+
+    def is_valid_hazard(self, label):
+        if self._count < MIN_FRAMES_VALIDATION:
+            return False
+
+        mean_a, var_a, mean_i, var_i = self._stats()
+        # 1. Flicker Analysis (Variance of Intensity)
+        variance = var_i / (mean_i + 1e-6)
+        # 2. Shape Dynamics (Changes in Area)
+        area_variation = np.sqrt(var_a) / (mean_a + 1e-6)
+
+        # Fire must flicker AND move
+        if label == "FLAME":
+            return variance > FLICKER_THRESHOLD and area_variation > GROWTH_STABILITY
+
+        # Smoke is purely color/area based
+        return True
+
+
+def iou_matrix(a, b):
+    """Pairwise IoU between boxes a (N×4) and b (M×4) in x1, y1, x2, y2 form."""
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-6)
+
+
+def centroid_distances(a, b):
+    ca = np.stack(((a[:, 0] + a[:, 2]) / 2, (a[:, 1] + a[:, 3]) / 2), axis=1)
+    cb = np.stack(((b[:, 0] + b[:, 2]) / 2, (b[:, 1] + b[:, 3]) / 2), axis=1)
+    return np.linalg.norm(ca[:, None, :] - cb[None, :, :], axis=2)
+
+
+def overlaps_any(box, rois):
+    """True if box (x1, y1, x2, y2) intersects any of rois."""
+    x1, y1, x2, y2 = box
+    return any(x1 < rx2 and rx1 < x2 and y1 < ry2 and ry1 < y2 for rx1, ry1, rx2, ry2 in rois)
+
+
+class HazardTrackerPool:
+    """Bounded set of HazardTrackers with IoU / centroid association."""
+
+    def __init__(self, iou_threshold=IOU_THRESHOLD, max_distance=MAX_CENTROID_DISTANCE,
+                 max_missed=MAX_MISSED_FRAMES, max_tracks=MAX_TRACKS, max_history=10):
+        self.iou_threshold = iou_threshold
+        self.max_distance = max_distance
+        self.max_missed = max_missed
+        self.max_tracks = max_tracks
+        self.max_history = max_history
+        self.tracks = []
+        self._next_id = 1
+
+    def _associate(self, det_boxes):
+        """Greedy min-cost matching. Returns {det_index: track_index}."""
+        if not self.tracks or len(det_boxes) == 0:
+            return {}
+        track_boxes = np.array([t.box for t in self.tracks], dtype=np.float64)
+        iou = iou_matrix(track_boxes, det_boxes)
+        dist = centroid_distances(track_boxes, det_boxes)
+        # IoU matches always beat distance-only matches
+        cost = np.where(iou >= self.iou_threshold, 1.0 - iou, np.inf)
+        cost = np.where(np.isinf(cost) & (dist <= self.max_distance), 1.0 + dist / self.max_distance, cost)
+
+        matches = {}
+        used_tracks = set()
+        for flat in np.argsort(cost, axis=None):
+            ti, di = divmod(int(flat), cost.shape[1])
+            if not np.isfinite(cost[ti, di]):
+                break
+            if ti in used_tracks or di in matches:
+                continue
+            matches[di] = ti
+            used_tracks.add(ti)
+        return matches
+
+    def update(self, regions, rois=None):
+        """
+        Feeds one frame of (x, y, w, h, area, intensity) regions.
+        rois limits the frame area that was analysed: unmatched tracks outside
+        every roi were not looked at and are not aged.
+        Returns the HazardTracker for each region, in order.
+        """
+        det_boxes = np.array([(x, y, x + w, y + h) for x, y, w, h, _, _ in regions], dtype=np.float64).reshape(-1, 4)
+        matches = self._associate(det_boxes)
+
+        matched_tracks = set(matches.values())
+        for ti, track in enumerate(self.tracks):
+            if ti not in matched_tracks and (rois is None or overlaps_any(track.box, rois)):
+                track.missed += 1
+
+        assigned = []
+        for di, (x, y, w, h, area, intensity) in enumerate(regions):
+            if di in matches:
+                track = self.tracks[matches[di]]
+            else:
+                track = HazardTracker(self.max_history, track_id=self._next_id)
+                self._next_id += 1
+                self.tracks.append(track)
+            track.box = (x, y, x + w, y + h)
+            track.missed = 0
+            track.update(area, intensity)
+            assigned.append(track)
+
+        # Expire stale tracks, then enforce the cap by dropping the least recently matched
+        self.tracks = [t for t in self.tracks if t.missed <= self.max_missed]
+        if len(self.tracks) > self.max_tracks:
+            self.tracks.sort(key=lambda t: (t.missed, -t.hits))
+            del self.tracks[self.max_tracks:]
+        return assigned
+
+    def __len__(self):
+        return len(self.tracks)
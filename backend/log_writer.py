@@ -0,0 +1,196 @@
+"""
+Project A.R.E.S. — Telemetry Log Writer
+Background thread that drains a bounded queue of telemetry samples and writes
+them to the TelemetryStore in batches, so the poller and HTTP handlers never
+touch the disk themselves.
+
+If an archive is attached, every batch is also appended to the columnar
+TelemetryArchive so analysis queries never have to parse JSONL.
+
+Rotation closes the active log into a size- or age-bounded segment, which can
+optionally be gzip-compressed once closed. Readers see rotated segments
+through the same TelemetryStore.
+"""
+
+import queue
+import threading
+import time
+
+import numpy as np
+
+from telemetry_archive import records_from_entries
+
+
+class TelemetryLogWriter:
+    """Batched, single-writer front end for a TelemetryStore."""
+
+    def __init__(self, store, max_queue=10000, batch_size=500, flush_interval=1.0,
+                 fsync_interval=None, max_segment_bytes=64 * 1024 * 1024,
+                 max_segment_age=24 * 3600, compress_segments=True, archive=None, on_flush=None):
+        """
+        flush_interval:   max seconds a sample waits in the queue before being written
+        fsync_interval:   None = never fsync, 0 = fsync every batch, N = at most every N seconds
+        max_segment_*:    rotate the active log when it exceeds this size (bytes) / age (s);
+                          None disables that trigger
+        archive:          optional TelemetryArchive that receives a copy of every batch
+        on_flush:         optional on_flush(seconds, samples) called after each batch is written
+        """
+        self.store = store
+        self.archive = archive
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_age = max_segment_age
+        self.compress_segments = compress_segments
+        self.on_flush = on_flush
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread = None
+        self._last_fsync = 0.0
+        self.dropped = 0
+        self.written = 0
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="telemetry-log-writer", daemon=True)
+            self._thread.start()
+        return self
+
+    def submit(self, entry):
+        """Queues one log entry. Never blocks; drops the sample if the writer has fallen behind."""
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped % 1000 == 1:
+                print(f"[LOG ERROR] Writer queue full, dropped {self.dropped} samples so far")
+
+    def submit_batch(self, entries, records=None):
+        """
+        Queues a whole batch as one unit, written with a single store append
+        (and a single archive append that reuses `records` when the caller
+        already has them as a structured array). Drops the batch if the queue is full.
+        """
+        if not entries:
+            return
+        try:
+            self._queue.put_nowait((entries, records))
+        except queue.Full:
+            self.dropped += len(entries)
+            print(f"[LOG ERROR] Writer queue full, dropped a batch of {len(entries)} samples")
+
+    def close(self, timeout=5):
+        """Flushes everything still queued and stops the writer thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    # ── Writer thread ──
+    def _drain(self):
+        batch = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _wants_fsync(self, now):
+        if self.fsync_interval is None:
+            return False
+        if now - self._last_fsync >= self.fsync_interval:
+            self._last_fsync = now
+            return True
+        return False
+
+    @staticmethod
+    def _entries(batch):
+        """Flattens queued items (single entries and submit_batch units) into one entry list."""
+        entries = []
+        for item in batch:
+            if isinstance(item, tuple):
+                entries.extend(item[0])
+            else:
+                entries.append(item)
+        return entries
+
+    def _records(self, batch):
+        """Archive records for a batch, converting only the entries that arrived without them."""
+        parts, pending = [], []
+        for item in batch:
+            if isinstance(item, tuple) and item[1] is not None:
+                if pending:
+                    parts.append(records_from_entries(pending, self.archive.dtype))
+                    pending = []
+                parts.append(item[1])
+            elif isinstance(item, tuple):
+                pending.extend(item[0])
+            else:
+                pending.append(item)
+        if pending:
+            parts.append(records_from_entries(pending, self.archive.dtype))
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def _flush(self, batch):
+        if not batch:
+            return
+        entries = self._entries(batch)
+        t0 = time.perf_counter()
+        try:
+            self.store.append(entries, fsync=self._wants_fsync(time.time()))
+            self.written += len(entries)
+        except Exception as e:
+            print(f"[LOG ERROR] {e}")
+        if self.archive is not None:
+            try:
+                self.archive.append(self._records(batch))
+            except Exception as e:
+                print(f"[ARCHIVE ERROR] {e}")
+        if self.on_flush is not None:
+            self.on_flush(time.perf_counter() - t0, len(entries))
+
+    def _maybe_rotate(self):
+        size, created = self.store.active_stats()
+        too_big = self.max_segment_bytes is not None and size >= self.max_segment_bytes
+        too_old = (self.max_segment_age is not None and created is not None
+                   and time.time() - created >= self.max_segment_age)
+        if not (too_big or too_old):
+            return
+        try:
+            closed_path = self.store.rotate()
+            if closed_path and self.compress_segments:
+                self.store.compress(closed_path)
+        except Exception as e:
+            print(f"[LOG ERROR] Rotation failed: {e}")
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._maybe_rotate()
+                continue
+            # Give the batch up to flush_interval to fill before writing
+            deadline = time.time() + self.flush_interval
+            batch = [first]
+            while len(batch) < self.batch_size and not self._stop.is_set():
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._flush(batch)
+            self._maybe_rotate()
+        # Final flush on shutdown
+        batch = self._drain()
+        while batch:
+            self._flush(batch)
+            batch = self._drain()
@@ -0,0 +1,130 @@
+"""
+Project A.R.E.S. — MJPEG Frame Splitter
+Splits a multipart MJPEG HTTP stream (ESP32-CAM :81/stream) into JPEG frames.
+
+Bytes are read straight into one preallocated bytearray, marker searches resume
+where the previous one stopped (no rescanning from offset 0), and the multipart
+Content-Length header is used when present so the JPEG body is never scanned.
+The buffer is capped: an oversized or corrupt frame is dropped instead of
+growing memory.
+
+    splitter = MJPEGSplitter()
+    for frame in splitter.frames_from(urllib.request.urlopen(CAM_URL)):
+        img = cv2.imdecode(np.frombuffer(frame, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+Yielded frames are memoryviews into the internal buffer and are only valid until
+the next frame is requested: decode them or copy them (bytes(frame)) first.
+"""
+
+import re
+
+SOI = b"\xff\xd8"  # JPEG start of image
+EOI = b"\xff\xd9"  # JPEG end of image
+_CONTENT_LENGTH = re.compile(rb"content-length:\s*(\d+)", re.IGNORECASE)
+_HEADER_WINDOW = 256  # bytes before SOI searched for part headers
+
+
+class MJPEGSplitter:
+    """Incremental, bounded-memory MJPEG demuxer."""
+
+    def __init__(self, max_frame_bytes=2 * 1024 * 1024, chunk_size=4096):
+        self.chunk_size = chunk_size
+        self.capacity = max_frame_bytes + chunk_size
+        self._buf = bytearray(self.capacity)
+        self._view = memoryview(self._buf)
+        self._start = 0    # first unconsumed byte
+        self._end = 0      # end of valid data
+        self._scan = 0     # where the next marker search resumes
+        self._soi = -1     # start of the frame being assembled
+        self._length = None
+        self.frames = 0
+        self.overflows = 0
+        self.bytes_read = 0
+
+    # ── Buffer management ──
+    def _compact(self):
+        """Moves unconsumed bytes to the front of the buffer."""
+        shift = self._start
+        if shift == 0:
+            return
+        pending = self._end - shift
+        self._buf[:pending] = bytes(self._view[shift:self._end])  # leftover is small (< one frame)
+        self._start, self._end = 0, pending
+        self._scan = max(0, self._scan - shift)
+        if self._soi >= 0:
+            self._soi -= shift
+
+    def _reset(self):
+        self._start = self._end = self._scan = 0
+        self._soi = -1
+        self._length = None
+
+    def _fill(self, stream):
+        """Reads one chunk into the buffer. Returns False at end of stream."""
+        if self.capacity - self._end < self.chunk_size:
+            self._compact()
+        if self.capacity - self._end < self.chunk_size:
+            # A single frame outgrew the cap (corrupt EOI or absurd size): drop it
+            self.overflows += 1
+            self._reset()
+        target = self._view[self._end:self._end + self.chunk_size]
+        if hasattr(stream, "readinto"):
+            n = stream.readinto(target)
+        else:
+            data = stream.read(self.chunk_size)
+            n = len(data)
+            target[:n] = data
+        if not n:
+            return False
+        self._end += n
+        self.bytes_read += n
+        return True
+
+    # ── Parsing ──
+    def _next_frame(self):
+        buf = self._buf
+        if self._soi < 0:
+            soi = buf.find(SOI, self._scan, self._end)
+            if soi < 0:
+                # Keep the last byte: a marker may straddle two reads
+                self._scan = max(self._start, self._end - 1)
+                return None
+            match = _CONTENT_LENGTH.search(buf, max(self._start, soi - _HEADER_WINDOW), soi)
+            self._length = int(match.group(1)) if match else None
+            self._soi = soi
+            self._scan = soi + 2
+
+        stop = None
+        if self._length:
+            candidate = self._soi + self._length
+            if candidate > self._soi + self.capacity - self.chunk_size:
+                self._length = None  # header claims more than we will ever buffer
+            elif self._end < candidate:
+                return None
+            elif buf[candidate - 2:candidate] == EOI:
+                stop = candidate
+            else:
+                self._length = None  # header and data disagree: fall back to scanning
+        if stop is None:
+            eoi = buf.find(EOI, self._scan, self._end)
+            if eoi < 0:
+                self._scan = max(self._soi + 2, self._end - 1)
+                return None
+            stop = eoi + 2
+
+        frame = self._view[self._soi:stop]
+        self._start = self._scan = stop
+        self._soi = -1
+        self._length = None
+        self.frames += 1
+        return frame
+
+    def frames_from(self, stream):
+        """Yields JPEG frames (memoryviews) from a file-like stream until it ends."""
+        while True:
+            frame = self._next_frame()
+            if frame is not None:
+                yield frame
+                continue
+            if not self._fill(stream):
+                return
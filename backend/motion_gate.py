@@ -0,0 +1,146 @@
+"""
+Project A.R.E.S. — Motion Gate
+Cheap pre-stage that decides how much of a frame the hazard detectors need to look at.
+
+    gate = MotionGate()
+    decision = gate.check(frame)    # "skip" | "roi" | "full"
+    for x1, y1, x2, y2 in decision.rois: ...
+
+The frame is shrunk to a small gray thumbnail (MOTION_WIDTH px wide) and diffed
+against the thumbnail of the last frame that was actually analysed, so slow
+changes such as creeping smoke still add up until they cross the threshold.
+Changed pixels are grouped into boxes, padded and scaled back to full
+resolution. A full-frame pass is forced every FULL_FRAME_INTERVAL seconds
+whatever the gate says.
+"""
+
+import threading
+import time
+
+import cv2
+import numpy as np
+
+MOTION_WIDTH = 160            # thumbnail width for differencing
+MOTION_THRESHOLD = 18         # per-pixel gray difference counted as change
+MOTION_MIN_FRACTION = 0.002   # changed fraction of the thumbnail below which the frame is skipped
+FULL_FRAME_INTERVAL = 2.0     # seconds; forced full-frame pass for safety
+ROI_PADDING = 24              # full-res px added around each changed region
+MAX_ROI_FRACTION = 0.5        # above this share of the frame, analyse the full frame instead
+MAX_ROIS = 8
+
+
+class GateDecision:
+    __slots__ = ("mode", "rois", "energy")
+
+    def __init__(self, mode, rois=(), energy=0.0):
+        self.mode = mode       # "skip", "roi" or "full"
+        self.rois = list(rois) # [(x1, y1, x2, y2)] full-res, only for "roi"
+        self.energy = energy   # changed fraction of the thumbnail
+
+    def __repr__(self):
+        return f"GateDecision({self.mode}, rois={self.rois}, energy={self.energy:.4f})"
+
+
+def _merge_boxes(boxes):
+    """Merges overlapping boxes until none overlap."""
+    boxes = [list(b) for b in boxes]
+    merged = True
+    while merged and len(boxes) > 1:
+        merged = False
+        for i in range(len(boxes)):
+            for j in range(i + 1, len(boxes)):
+                a, b = boxes[i], boxes[j]
+                if a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]:
+                    boxes[i] = [min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])]
+                    del boxes[j]
+                    merged = True
+                    break
+            if merged:
+                break
+    return [tuple(b) for b in boxes]
+
+
+class MotionGate:
+    """Frame-differencing gate. Thread-safe; one instance per camera."""
+
+    def __init__(self, width=MOTION_WIDTH, threshold=MOTION_THRESHOLD, min_fraction=MOTION_MIN_FRACTION,
+                 full_interval=FULL_FRAME_INTERVAL, padding=ROI_PADDING, max_roi_fraction=MAX_ROI_FRACTION):
+        self.width = width
+        self.threshold = threshold
+        self.min_fraction = min_fraction
+        self.full_interval = full_interval
+        self.padding = padding
+        self.max_roi_fraction = max_roi_fraction
+        self._lock = threading.Lock()
+        self._reference = None
+        self._last_full = 0.0
+        self._kernel = np.ones((3, 3), np.uint8)
+        self.counts = {"skip": 0, "roi": 0, "full": 0}
+        self._window_start = time.time()
+        self._window_counts = dict(self.counts)
+
+    def _thumbnail(self, frame):
+        h, w = frame.shape[:2]
+        size = (self.width, max(1, round(h * self.width / w)))
+        small = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+        return cv2.GaussianBlur(gray, (5, 5), 0)
+
+    def _changed_rois(self, changed, frame_shape):
+        h, w = frame_shape[:2]
+        sy, sx = h / changed.shape[0], w / changed.shape[1]
+        n, _, boxes, _ = cv2.connectedComponentsWithStats(changed, connectivity=8)
+        rois = []
+        for x, y, bw, bh, _ in boxes[1:n]:
+            rois.append((
+                max(0, int(x * sx) - self.padding), max(0, int(y * sy) - self.padding),
+                min(w, int((x + bw) * sx) + self.padding), min(h, int((y + bh) * sy) + self.padding),
+            ))
+        return _merge_boxes(rois)
+
+    def check(self, frame):
+        thumb = self._thumbnail(frame)
+        now = time.time()
+        with self._lock:
+            reference = self._reference
+            if reference is None or reference.shape != thumb.shape or now - self._last_full >= self.full_interval:
+                decision = GateDecision("full", energy=1.0 if reference is None else 0.0)
+            else:
+                changed = cv2.compare(cv2.absdiff(thumb, reference), self.threshold, cv2.CMP_GT)
+                energy = cv2.countNonZero(changed) / changed.size
+                if energy < self.min_fraction:
+                    decision = GateDecision("skip", energy=energy)
+                else:
+                    changed = cv2.dilate(changed, self._kernel, iterations=2)
+                    rois = self._changed_rois(changed, frame.shape)
+                    roi_area = sum((x2 - x1) * (y2 - y1) for x1, y1, x2, y2 in rois)
+                    if len(rois) > MAX_ROIS or roi_area > self.max_roi_fraction * frame.shape[0] * frame.shape[1]:
+                        decision = GateDecision("full", energy=energy)
+                    else:
+                        decision = GateDecision("roi", rois, energy)
+
+            if decision.mode != "skip":
+                self._reference = thumb  # diff future frames against what was last analysed
+            if decision.mode == "full":
+                self._last_full = now
+            self.counts[decision.mode] += 1
+        return decision
+
+    def report(self):
+        """Returns {frames, skipped, roi, full, skip_rate, input_fps, effective_fps} and starts a new window."""
+        with self._lock:
+            now = time.time()
+            elapsed = max(now - self._window_start, 1e-6)
+            delta = {k: self.counts[k] - self._window_counts[k] for k in self.counts}
+            frames = sum(delta.values())
+            analysed = delta["roi"] + delta["full"]
+            self._window_start, self._window_counts = now, dict(self.counts)
+        return {
+            "frames": sum(self.counts.values()),
+            "skipped": self.counts["skip"],
+            "roi": self.counts["roi"],
+            "full": self.counts["full"],
+            "skip_rate": round(delta["skip"] / frames, 3) if frames else 0.0,
+            "input_fps": round(frames / elapsed, 2),
+            "effective_fps": round(analysed / elapsed, 2),
+        }
@@ -0,0 +1,210 @@
+"""
+Project A.R.E.S. — MobileNet-SSD Object Detector
+Optional DNN backend for the hazard detector: person / object detection with
+the bundled MobileNet-SSD (Caffe, PASCAL VOC classes) through cv2.dnn on CPU.
+
+    detector = load_detector()              # None when the weights are missing
+    batcher = BatchingDetector(detector)    # shares one forward pass across detect threads
+    tracked = IntervalDetector(batcher, every_n=3)
+    detections = tracked.detect(frame)      # [{"label": "PERSON", "confidence", "box"}]
+
+The .prototxt ships in models/; the matching weights (MobileNetSSD_deploy.caffemodel,
+~23 MB) are not in the repo and must be placed next to it. Needs OpenCV 4.x
+(the Caffe importer was dropped in OpenCV 5).
+
+Frames from several detect threads are stacked into one blobFromImages batch,
+and IntervalDetector only runs the network on every Nth frame, carrying the
+boxes forward in between with sparse optical flow. Output boxes are pixel
+[x1, y1, x2, y2] like the colour detectors, so they go through the same
+/api/objects conversion.
+"""
+
+import os
+import queue
+import threading
+from concurrent.futures import Future
+
+import cv2
+import numpy as np
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+PROTOTXT_PATH = os.path.join(MODEL_DIR, "MobileNetSSD_deploy.prototxt")
+WEIGHTS_PATH = os.path.join(MODEL_DIR, "MobileNetSSD_deploy.caffemodel")
+
+# PASCAL VOC labels in model output order (index 0 is background)
+CLASSES = (
+    "background", "aeroplane", "bicycle", "bird", "boat", "bottle", "bus", "car",
+    "cat", "chair", "cow", "diningtable", "dog", "horse", "motorbike", "person",
+    "pottedplant", "sheep", "sofa", "train", "tvmonitor",
+)
+
+INPUT_SIZE = 300          # network input (square); 224 trades accuracy for speed
+CONFIDENCE = 0.5
+MEAN = 127.5
+SCALE = 0.007843          # 1 / 127.5
+MAX_BATCH = 4
+BATCH_WAIT = 0.01         # seconds to wait for more frames before running a partial batch
+EVERY_N = 3               # run the DNN on 1 of every N frames, track in between
+
+
+class MobileNetSSD:
+    """cv2.dnn wrapper around MobileNet-SSD with batched inference."""
+
+    def __init__(self, prototxt=PROTOTXT_PATH, weights=WEIGHTS_PATH, input_size=INPUT_SIZE,
+                 confidence=CONFIDENCE, threads=None, labels=None):
+        self.input_size = input_size
+        self.confidence = confidence
+        self.labels = set(labels) if labels else None  # e.g. {"person"}; None keeps every class
+        if threads:
+            cv2.setNumThreads(threads)
+        read_caffe = getattr(cv2.dnn, "readNetFromCaffe", None)  # removed in OpenCV 5
+        self.net = read_caffe(prototxt, weights) if read_caffe else cv2.dnn.readNet(weights, prototxt)
+        self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+        self._lock = threading.Lock()  # cv2.dnn.Net is not safe to share across threads
+
+    def detect_batch(self, frames):
+        """Runs one forward pass over a list of BGR frames. Returns a detection list per frame."""
+        if not frames:
+            return []
+        blob = cv2.dnn.blobFromImages(frames, SCALE, (self.input_size, self.input_size), MEAN)
+        with self._lock:
+            self.net.setInput(blob)
+            out = self.net.forward()  # (1, 1, K, 7): image_id, class, conf, x1, y1, x2, y2
+        rows = out.reshape(-1, 7)
+        rows = rows[rows[:, 2] >= self.confidence]
+
+        results = [[] for _ in frames]
+        for image_id, class_id, conf, x1, y1, x2, y2 in rows:
+            image_id, class_id = int(image_id), int(class_id)
+            if not 0 <= image_id < len(frames) or not 0 < class_id < len(CLASSES):
+                continue
+            name = CLASSES[class_id]
+            if self.labels is not None and name not in self.labels:
+                continue
+            h, w = frames[image_id].shape[:2]
+            box = np.clip([x1 * w, y1 * h, x2 * w, y2 * h], 0, [w, h, w, h]).astype(int)
+            results[image_id].append({
+                "label": name.upper(),
+                "confidence": float(conf),
+                "box": [int(v) for v in box]
+            })
+        return results
+
+    def detect(self, frame):
+        return self.detect_batch([frame])[0]
+
+
+def load_detector(prototxt=PROTOTXT_PATH, weights=WEIGHTS_PATH, **kwargs):
+    """Builds a MobileNetSSD, or returns None (with a message) if the model files are missing."""
+    for path in (prototxt, weights):
+        if not os.path.exists(path):
+            print(f"[DNN] Model file not found: {path} — DNN detector disabled")
+            return None
+    try:
+        return MobileNetSSD(prototxt, weights, **kwargs)
+    except cv2.error as e:
+        print(f"[DNN] Failed to load MobileNet-SSD: {e}")
+        return None
+
+
+class BatchingDetector:
+    """
+    Collects detect() calls from several threads (a camera's detect workers)
+    and serves them with one batched forward pass of up to max_batch frames.
+    Only worth it with more than one producer: a lone caller just waits
+    max_wait for frames that never come.
+    """
+
+    def __init__(self, detector, max_batch=MAX_BATCH, max_wait=BATCH_WAIT):
+        self.detector = detector
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batches = 0
+        self.frames = 0
+        self._pending = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, frame):
+        future = Future()
+        self._pending.put((frame, future))
+        return future
+
+    def detect(self, frame):
+        return self.submit(frame).result()
+
+    def _run(self):
+        while True:
+            batch = [self._pending.get()]
+            try:
+                while len(batch) < self.max_batch:
+                    batch.append(self._pending.get(timeout=self.max_wait))
+            except queue.Empty:
+                pass
+            # blobFromImages resizes every frame to the same input size, so mixed camera resolutions are fine
+            try:
+                results = self.detector.detect_batch([frame for frame, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.frames += len(batch)
+            for (_, future), detections in zip(batch, results):
+                future.set_result(detections)
+
+    @property
+    def mean_batch(self):
+        return self.frames / self.batches if self.batches else 0.0
+
+
+class IntervalDetector:
+    """
+    Runs the DNN on one frame in every_n and moves its boxes along with
+    Lucas-Kanade optical flow on the frames in between. Feed frames in order.
+    """
+
+    def __init__(self, detector, every_n=EVERY_N, max_points=20):
+        self.detector = detector
+        self.every_n = max(1, every_n)
+        self.max_points = max_points
+        self._count = 0
+        self._prev_gray = None
+        self._detections = []
+
+    def detect(self, frame, gray=None):
+        if gray is None:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if self._count % self.every_n == 0 or self._prev_gray is None or self._prev_gray.shape != gray.shape:
+            self._detections = self.detector.detect(frame)
+        elif self._detections:
+            self._detections = self._track(self._prev_gray, gray, self._detections)
+        self._count += 1
+        self._prev_gray = gray
+        return [dict(d, box=list(d["box"])) for d in self._detections]
+
+    def _track(self, prev, gray, detections):
+        h, w = gray.shape[:2]
+        tracked = []
+        for det in detections:
+            x1, y1, x2, y2 = det["box"]
+            if x2 - x1 < 4 or y2 - y1 < 4:
+                tracked.append(det)
+                continue
+            mask = np.zeros_like(prev)
+            mask[y1:y2, x1:x2] = 255
+            points = cv2.goodFeaturesToTrack(prev, self.max_points, 0.01, 5, mask=mask)
+            if points is None:
+                tracked.append(det)
+                continue
+            moved, status, _ = cv2.calcOpticalFlowPyrLK(prev, gray, points, None)
+            ok = status.ravel() == 1
+            if not ok.any():
+                tracked.append(det)
+                continue
+            dx, dy = np.median((moved - points).reshape(-1, 2)[ok], axis=0)
+            dx = int(round(np.clip(dx, -x1, w - x2)))
+            dy = int(round(np.clip(dy, -y1, h - y2)))
+            tracked.append(dict(det, box=[x1 + dx, y1 + dy, x2 + dx, y2 + dy]))
+        return tracked
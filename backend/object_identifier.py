@@ -1,136 +1,73 @@
 import cv2
-import requests
 import numpy as np
 import time
 import os
 import urllib.request
-from collections import deque
-import sys
-import random
+import threading
+import argparse
+import json
+from mjpeg_stream import MJPEGSplitter
+from hazard_tracker import HazardTrackerPool, overlaps_any
+from hazard_masks import compute_hazard_masks, fire_candidates, smoke_detections
+import object_detector
+from object_detector import BatchingDetector, IntervalDetector, load_detector
+from motion_gate import MotionGate
+from camera_supervisor import CameraSupervisor
+from detection_transport import DetectionTransport
+from preview_stream import PreviewHub, PreviewServer, PREVIEW_PORT
+from metrics import REGISTRY
 
 # ── Configuration ──
 CAM_URL = "http://10.202.253.217:81/stream"
 BACKEND_URL = "http://127.0.0.1:5000/api/objects"
 
+# Cameras: one worker process each. Override with a cameras.json next to this file:
+#   [{"id": "arm-cam", "url": "http://10.202.253.217:81/stream", "workers": 1}, ...]
+CAMERAS_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cameras.json")
+CAMERAS = [{"id": "arm-cam", "url": CAM_URL}]
+if os.path.exists(CAMERAS_CONFIG_PATH):
+    with open(CAMERAS_CONFIG_PATH) as f:
+        CAMERAS = json.load(f)
+
 # ── Demo Mode Detection ──
 DEMO_MODE = False
 
-# Selective Validation thresholds
-FLICKER_THRESHOLD = 0.05  # Increased for selectivity
-GROWTH_STABILITY = 0.08   # Required boundary movement
-MIN_FRAMES_VALIDATION = 5 # More evidence required
-
-class HazardTracker:
-    """Tracks detected regions over time to validate flicker and growth."""
-    def __init__(self, max_history=10):
-        self.history = deque(maxlen=max_history)
-        self.max_history = max_history
-
-    def update(self, area, intensity):
-        self.history.append({"area": area, "intensity": intensity})
-
-    def is_valid_hazard(self, label):
-        if len(self.history) < MIN_FRAMES_VALIDATION:
-            return False
-            
-        # 1. Flicker Analysis (Variance of Intensity)
-        intensities = [h["intensity"] for h in self.history]
-        avg_int = np.mean(intensities) + 1e-6
-        variance = np.var(intensities) / avg_int
-        
-        # 2. Shape Dynamics (Changes in Area)
-        areas = [h["area"] for h in self.history]
-        avg_area = np.mean(areas) + 1e-6
-        area_variation = np.std(areas) / avg_area
-        
-        # Fire must flicker AND move
-        if label == "FLAME":
-            return variance > FLICKER_THRESHOLD and area_variation > GROWTH_STABILITY
-        
-        # Smoke is purely color/area based
-        return True
-
-# Global tracker pool
-trackers = {} # (x_key, y_key) -> HazardTracker
-
-def get_tracker_key(x, y, w, h):
-    """Grid-based keying to match regions across frames."""
-    gx, gy = x // 30, y // 30  # Approx 30px grid to account for slight camera movement
-    return (gx, gy)
-
-def detect_fire(hsv_frame, gray_frame):
-    """
-    Detects fire using HSV (Orange/Red/Yellow) and YCbCr (Intensity) color spaces.
-    """
-    # 1. HSV Mask (Color)
-    # Fire ranges from bright yellow to deep orange/red
-    lower_fire1 = np.array([0, 70, 150], dtype="uint8")
-    upper_fire1 = np.array([25, 255, 255], dtype="uint8")
-    lower_fire2 = np.array([160, 70, 150], dtype="uint8")
-    upper_fire2 = np.array([180, 255, 255], dtype="uint8")
-    
-    mask1 = cv2.inRange(hsv_frame, lower_fire1, upper_fire1)
-    mask2 = cv2.inRange(hsv_frame, lower_fire2, upper_fire2)
-    hsv_mask = cv2.bitwise_or(mask1, mask2)
-    
-    # 2. YCbCr Mask (Intensity/Contrast)
-    # Fire usually has Y > Cb and Cr > Cb
-    ycbcr = cv2.cvtColor(cv2.imdecode(cv2.imencode('.jpg', gray_frame)[1], cv2.IMREAD_COLOR), cv2.COLOR_BGR2YCrCb) # Mock from gray for simplicity
-    # Real YCbCr from RGB
-    # ycbcr = cv2.cvtColor(rgb_frame, cv2.COLOR_BGR2YCrCb) 
-    # But since we only have hsv/gray here, we stick to hsv + area dynamics
-    
-    # Refine mask
-    kernel = np.ones((5, 5), np.uint8)
-    hsv_mask = cv2.dilate(hsv_mask, kernel, iterations=2)
-    hsv_mask = cv2.GaussianBlur(hsv_mask, (15, 15), 0)
-    
-    contours, _ = cv2.findContours(hsv_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    detections = []
-    
-    for cnt in contours:
-        area = cv2.contourArea(cnt)
-        if area > 400: # Smaller threshold than smoke
-            x, y, w, h = cv2.boundingRect(cnt)
-            
-            # Tracker Validation
-            key = get_tracker_key(x, y, w, h)
-            if key not in trackers:
-                trackers[key] = HazardTracker()
-            
-            # Use average gray intensity in the box as 'brightness'
-            roi_gray = gray_frame[y:y+h, x:x+w]
-            intensity = np.mean(roi_gray)
-            
-            trackers[key].update(area, intensity)
-            
-            if trackers[key].is_valid_hazard("FLAME"):
-                detections.append({
-                    "label": "FLAME",
-                    "confidence": min(0.95, 0.5 + (area / 10000.0)),
-                    "box": [x, y, x + w, y + h]
-                })
-    return detections
+# ── Pipeline ──
+DETECT_WORKERS = 1        # decode/detect threads per camera (OpenCV releases the GIL)
+POST_INTERVAL = 0.5       # seconds between routine result posts (hazard events are sent at once)
+STATS_INTERVAL = 10       # seconds between pipeline timing reports
+MAX_FRAME_BYTES = 2 * 1024 * 1024  # cap on one buffered JPEG frame
+DETECT_SCALE = 1.0        # <1.0 runs the colour masks on a downscaled frame (e.g. 0.5)
+MOTION_GATE = True        # skip static frames / analyse only changed regions (see motion_gate.py)
+# Shared dashboard preview (see preview_stream.py): camera i serves on PREVIEW_PORT + i; 0 disables
+PREVIEW_PORT_BASE = PREVIEW_PORT
+
+# ── Detector backends ──
+DETECTOR = "hsv"          # "hsv" (flame/smoke colour), "dnn" (MobileNet-SSD objects) or "both"
+DNN_INPUT_SIZE = object_detector.INPUT_SIZE
+DNN_EVERY_N = object_detector.EVERY_N   # DNN on 1 frame in N, optical-flow tracking in between
+DNN_BATCH = object_detector.MAX_BATCH   # max frames per forward pass (one per detect worker of a camera)
+DNN_THREADS = None        # cv2 threads per camera process; None splits the cores between cameras
 
-def detect_smoke(hsv_frame):
-    """Detects smoke (grey/white)."""
-    lower_smoke = np.array([0, 0, 100], dtype="uint8")
-    upper_smoke = np.array([180, 50, 200], dtype="uint8")
-    
-    mask = cv2.inRange(hsv_frame, lower_smoke, upper_smoke)
-    mask = cv2.GaussianBlur(mask, (21, 21), 0)
-    
-    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+# Per-process metrics, served at /metrics on each camera's preview port
+STAGE_SECONDS = REGISTRY.histogram("ares_vision_stage_seconds", "Per-frame time in each pipeline stage",
+                                   ("camera", "stage"))
+STAGE_FPS = REGISTRY.gauge("ares_vision_stage_fps", "Frames through each pipeline stage per second, last window",
+                           ("camera", "stage"))
+DROPPED_FRAMES = REGISTRY.gauge("ares_vision_dropped_frames", "Frames replaced before a worker picked them up",
+                                ("camera",))
+
+def validate_fire_candidates(candidates, tracker_pool, rois=None):
+    """Feeds candidates to the tracker pool and returns the ones confirmed as FLAME."""
     detections = []
-    
-    for cnt in contours:
-        area = cv2.contourArea(cnt)
-        if area > 1000:
-            x, y, w, h = cv2.boundingRect(cnt)
+    # Tracker Validation
+    for (x, y, w, h, area, intensity), tracker in zip(candidates, tracker_pool.update(candidates, rois)):
+        if tracker.is_valid_hazard("FLAME"):
             detections.append({
-                "label": "SMOKE",
-                "confidence": min(0.90, 0.4 + (area / 15000.0)),
-                "box": [x, y, x + w, y + h]
+                "label": "FLAME",
+                "confidence": min(0.95, 0.5 + (area / 10000.0)),
+                "box": [x, y, x + w, y + h],
+                "track_id": tracker.track_id
             })
     return detections
 
@@ -138,73 +75,359 @@ def demo_mode():
     """Demo mode is disabled."""
     pass
 
-def process_stream():
-    """Reads MJPEG stream and detects Hazards."""
-    print(f"Connecting to stream: {CAM_URL}")
-    try:
-        stream = urllib.request.urlopen(CAM_URL, timeout=5)
-    except Exception as e:
-        print(f"Failed to open stream: {e}")
-        return
-
-    bytes_data = b''
-    last_post_time = 0
-    post_interval = 0.5
-    
-    while True:
+def to_found_objects(hazards, w, h):
+    """Converts pixel-space hazards into the /api/objects schema (normalized boxes)."""
+    found_objects = []
+    for hazard in hazards:
+        startX, startY, endX, endY = hazard["box"]
+        obj = {
+            "label": hazard["label"],
+            "confidence": float(hazard["confidence"]),
+            "box": {
+                "x": float(startX / w),
+                "y": float(startY / h),
+                "w": float((endX - startX) / w),
+                "h": float((endY - startY) / h)
+            }
+        }
+        if hazard.get("track_id") is not None:
+            obj["track_id"] = hazard["track_id"]
+        found_objects.append(obj)
+    return found_objects
+
+class LatestSlot:
+    """Single-item handoff between stages: a new item replaces an unconsumed one (latest frame wins)."""
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if self._item is not None:
+                self.dropped += 1
+            self._item = item
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        with self._cond:
+            self._cond.wait_for(lambda: self._item is not None, timeout)
+            item, self._item = self._item, None
+            return item
+
+class StageStats:
+    """Per-stage timing counters: count, total / last / max seconds (and STAGE_SECONDS when labelled)."""
+    def __init__(self, stages, camera_id=None):
+        self.camera_id = camera_id
+        self._lock = threading.Lock()
+        self.stages = {name: {"count": 0, "total": 0.0, "last": 0.0, "max": 0.0} for name in stages}
+        self._window_start = time.time()
+        self._window_counts = {name: 0 for name in stages}
+
+    def record(self, stage, seconds):
+        with self._lock:
+            s = self.stages[stage]
+            s["count"] += 1
+            s["total"] += seconds
+            s["last"] = seconds
+            s["max"] = max(s["max"], seconds)
+        if self.camera_id is not None:
+            STAGE_SECONDS.observe(seconds, self.camera_id, stage)
+
+    def report(self):
+        """Returns {stage: {fps, avg_ms, last_ms, max_ms, count}} and starts a new FPS window."""
+        with self._lock:
+            now = time.time()
+            elapsed = max(now - self._window_start, 1e-6)
+            out = {}
+            for name, s in self.stages.items():
+                out[name] = {
+                    "count": s["count"],
+                    "fps": round((s["count"] - self._window_counts[name]) / elapsed, 2),
+                    "avg_ms": round(1000 * s["total"] / s["count"], 2) if s["count"] else 0.0,
+                    "last_ms": round(1000 * s["last"], 2),
+                    "max_ms": round(1000 * s["max"], 2),
+                }
+                self._window_counts[name] = s["count"]
+            self._window_start = now
+            return out
+
+class HazardPipeline:
+    """
+    Staged detector for one camera:
+      reader thread  -> [latest frame] -> decode/detect workers -> DetectionTransport (events + coalesced state)
+    Slow stages never stall the camera read; they just skip to the freshest frame.
+    """
+    def __init__(self, cam_url=CAM_URL, backend_url=BACKEND_URL, workers=DETECT_WORKERS, post_interval=POST_INTERVAL,
+                 hazards=True, object_detector=None, dnn_every_n=DNN_EVERY_N, motion_gate=MOTION_GATE,
+                 camera_id=None, restarts=0, preview_port=None):
+        self.camera_id = camera_id or CAMERAS[0]["id"]
+        self.cam_url = cam_url
+        self.backend_url = backend_url
+        self.workers = workers
+        self.post_interval = post_interval
+        self.frames = LatestSlot()
+        self.stats = StageStats(("read", "decode", "detect", "publish"), self.camera_id)
+        self.trackers = HazardTrackerPool()
+        self._tracker_lock = threading.Lock()
+        self._last_hazards = []   # pixel-space hazards from the last analysed frame
+        self._last_objects = []   # /api/objects payload from the last analysed frame
+        self.gate = MotionGate() if motion_gate else None
+        self.hazards = hazards
+        # Optional DNN objects: the model (or a BatchingDetector over it) is shared by the
+        # workers, interval tracking is per worker so each follows its own frame sequence
+        self.object_detector = object_detector
+        self.dnn_every_n = dnn_every_n
+        self._worker_state = threading.local()
+        # Latest stats window, posted with every result for /api/services/status
+        self.metrics = {"restarts": restarts}
+        self.preview_port = preview_port
+        self.preview = PreviewHub() if preview_port else None
+        if preview_port:
+            self.metrics["preview_port"] = preview_port
+        self.transport = DetectionTransport(backend_url, self.camera_id, post_interval,
+                                            on_sent=lambda seconds: self.stats.record("publish", seconds))
+        self._threads = []
+
+    def start(self):
+        """Starts the detect workers, transport and stats reporter (idempotent)."""
+        if self._threads:
+            return self
+        self.transport.start()
+        if self.preview is not None:
+            try:
+                PreviewServer(self.preview, self.preview_port).start()
+            except OSError as e:
+                print(f"[PREVIEW] Port {self.preview_port} unavailable: {e}")
+        targets = [self._detect_worker] * self.workers + [self._reporter]
+        for target in targets:
+            t = threading.Thread(target=target, daemon=True)
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def run(self):
+        """Reads the camera until the stream fails (call again to reconnect)."""
+        self.start()
+        self._read_stream()
+
+    # ── Stage 1: reader ──
+    def _read_stream(self):
+        print(f"[{self.camera_id}] Connecting to stream: {self.cam_url}")
+        try:
+            stream = urllib.request.urlopen(self.cam_url, timeout=5)
+        except Exception as e:
+            print(f"Failed to open stream: {e}")
+            return
+
+        splitter = MJPEGSplitter(MAX_FRAME_BYTES)
+        t0 = time.perf_counter()
         try:
-            bytes_data += stream.read(4096)
-            a = bytes_data.find(b'\xff\xd8')
-            b = bytes_data.find(b'\xff\xd9')
-            
-            if a != -1 and b != -1:
-                jpg = bytes_data[a:b+2]
-                bytes_data = bytes_data[b+2:]
-                
+            for jpg in splitter.frames_from(stream):
+                # One copy per frame, shared by the worker threads and the preview viewers
+                captured, jpg = time.time(), bytes(jpg)
+                self.frames.put((captured, jpg))
+                if self.preview is not None:
+                    self.preview.put_jpeg(jpg, captured)
+                now = time.perf_counter()
+                self.stats.record("read", now - t0)
+                t0 = now
+            print("Stream ended")
+        except Exception as e:
+            print(f"Error: {e}")
+        if splitter.overflows:
+            print(f"[PIPELINE] Dropped {splitter.overflows} oversized/corrupt frame(s)")
+
+    # ── Stage 2: decode + detect ──
+    def detect(self, frame):
+        h, w = frame.shape[:2]
+        decision = self.gate.check(frame) if self.gate is not None else None
+        if decision is not None and decision.mode == "skip":
+            # Nothing changed since the last analysed frame: its result still stands
+            with self._tracker_lock:
+                return list(self._last_objects)
+        rois = decision.rois if decision is not None and decision.mode == "roi" else None
+
+        hazards = []
+        if self.hazards:
+            candidates, smoke = self._hazard_candidates(frame, rois)
+            with self._tracker_lock:
+                hazards = validate_fire_candidates(candidates, self.trackers, rois)
+                hazards.extend(smoke)
+                if rois is not None:
+                    # Hazards outside every changed region are unchanged: carry them over
+                    hazards.extend(hz for hz in self._last_hazards if not overlaps_any(hz["box"], rois))
+                self._last_hazards = hazards
+
+            for hazard in hazards:
+                print(f"HAZARD DETECTED: {hazard['label']} at {hazard['box']}")
+
+        found = list(hazards)
+        if self.object_detector is not None:
+            found.extend(self._interval_detector().detect(frame))
+        found_objects = to_found_objects(found, w, h)
+        with self._tracker_lock:
+            self._last_objects = found_objects
+        return found_objects
+
+    def _interval_detector(self):
+        """The calling worker's IntervalDetector (created on first use)."""
+        objects = getattr(self._worker_state, "objects", None)
+        if objects is None:
+            objects = self._worker_state.objects = IntervalDetector(self.object_detector, self.dnn_every_n)
+        return objects
+
+    def _hazard_candidates(self, frame, rois=None):
+        """Flame candidates and smoke detections for the full frame or just the given ROIs."""
+        if rois is None:
+            # One fused colour pass shared by flame and smoke
+            masks = compute_hazard_masks(frame, DETECT_SCALE)
+            return fire_candidates(masks), smoke_detections(masks)
+
+        candidates, smoke = [], []
+        for x1, y1, x2, y2 in rois:
+            masks = compute_hazard_masks(frame[y1:y2, x1:x2], DETECT_SCALE)
+            candidates.extend((x + x1, y + y1, cw, ch, area, intensity)
+                              for x, y, cw, ch, area, intensity in fire_candidates(masks))
+            for det in smoke_detections(masks):
+                bx1, by1, bx2, by2 = det["box"]
+                det["box"] = [bx1 + x1, by1 + y1, bx2 + x1, by2 + y1]
+                smoke.append(det)
+        return candidates, smoke
+
+    def _detect_worker(self):
+        while True:
+            item = self.frames.get()
+            if item is None:
+                continue
+            captured, jpg = item
+            try:
+                t0 = time.perf_counter()
                 frame = cv2.imdecode(np.frombuffer(jpg, dtype=np.uint8), cv2.IMREAD_COLOR)
+                t1 = time.perf_counter()
+                self.stats.record("decode", t1 - t0)
                 if frame is None:
                     continue
-                    
-                h, w = frame.shape[:2]
-                hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                
-                hazards = []
-                hazards.extend(detect_fire(hsv, gray)) 
-                hazards.extend(detect_smoke(hsv))
-                
-                found_objects = []
-                for hazard in hazards:
-                    startX, startY, endX, endY = hazard["box"]
-                    found_objects.append({
-                        "label": hazard["label"],
-                        "confidence": float(hazard["confidence"]),
-                        "box": {
-                            "x": float(startX / w),
-                            "y": float(startY / h),
-                            "w": float((endX - startX) / w),
-                            "h": float((endY - startY) / h)
-                        }
-                    })
-                    print(f"HAZARD DETECTED: {hazard['label']} at {hazard['box']}")
-                
-                if time.time() - last_post_time > post_interval:
-                    try:
-                        requests.post(BACKEND_URL, json={"objects": found_objects}, timeout=1)
-                        last_post_time = time.time()
-                    except:
-                        pass
-        except Exception as e:
-            print(f"Error: {e}")
-            break
+                found_objects = self.detect(frame)
+                self.stats.record("detect", time.perf_counter() - t1)
+                self.transport.publish(captured, found_objects, self.metrics)
+                if self.preview is not None:
+                    self.preview.set_objects(found_objects)
+            except Exception as e:
+                print(f"Detect error: {e}")
+
+    def _reporter(self):
+        while True:
+            time.sleep(STATS_INTERVAL)
+            r = self.stats.report()
+            for stage, values in r.items():
+                STAGE_FPS.set(values["fps"], self.camera_id, stage)
+            DROPPED_FRAMES.set(self.frames.dropped, self.camera_id)
+            metrics = dict(self.metrics, read_fps=r["read"]["fps"], detect_fps=r["detect"]["fps"],
+                           detect_ms=r["detect"]["avg_ms"], decode_ms=r["decode"]["avg_ms"],
+                           publish_ms=r["publish"]["avg_ms"], dropped=self.frames.dropped)
+            extra = ""
+            if self.gate is not None:
+                g = self.gate.report()
+                metrics.update(skip_rate=g["skip_rate"], effective_fps=g["effective_fps"])
+                extra += f" | gate skip {100 * g['skip_rate']:.0f}% effective {g['effective_fps']} fps"
+            if isinstance(self.object_detector, BatchingDetector):
+                extra += f" | dnn batch {self.object_detector.mean_batch:.1f}"
+            if self.preview is not None:
+                p = self.preview.stats()
+                metrics.update(preview_clients=p["clients"], preview_encodes=p["encodes"])
+            self.metrics = metrics
+            print(
+                f"[PIPELINE {self.camera_id}] read {r['read']['fps']} fps | detect {r['detect']['fps']} fps "
+                f"({r['detect']['avg_ms']} ms) | decode {r['decode']['avg_ms']} ms | "
+                f"post {r['publish']['avg_ms']} ms | dropped frames {self.frames.dropped}{extra}"
+            )
+
+def process_stream(pipeline=None):
+    """Reads MJPEG stream and detects Hazards."""
+    (pipeline or HazardPipeline()).run()
+
+def run_camera(cam_url, workers, hazards=True, object_detector=None, dnn_every_n=DNN_EVERY_N, motion_gate=MOTION_GATE,
+               camera_id=None, restarts=0, backend_url=BACKEND_URL, preview_port=None):
+    """Runs one camera pipeline forever, reconnecting on stream errors."""
+    pipeline = HazardPipeline(cam_url, backend_url, workers=workers, hazards=hazards, object_detector=object_detector,
+                              dnn_every_n=dnn_every_n, motion_gate=motion_gate, camera_id=camera_id, restarts=restarts,
+                              preview_port=preview_port)
+    while True:
+        process_stream(pipeline)
+        print(f"[{pipeline.camera_id}] Reconnecting in 5s...")
+        time.sleep(5)
+
+def camera_process(camera, options, restarts=0):
+    """Worker process entry point (see camera_supervisor.py): one camera, its own detectors."""
+    cv2.setNumThreads(options["threads"])
+    hazards = options["detector"] != "dnn"
+    workers = camera.get("workers", options["workers"])
+    dnn = None
+    if options["detector"] != "hsv":
+        model = load_detector(input_size=options["dnn_size"], labels=options["dnn_labels"])
+        if model is not None and workers > 1 and options["dnn_batch"] > 1:
+            # The camera's detect workers are the only producers: batch at most one frame each
+            dnn = BatchingDetector(model, max_batch=min(options["dnn_batch"], workers))
+        elif model is not None:
+            dnn = model   # a single worker never has a second frame to batch with
+        elif not hazards:
+            print("[DNN] Falling back to the HSV hazard detector")
+            hazards = True
+    run_camera(camera["url"], workers, hazards, dnn, options["dnn_every"],
+               options["motion_gate"], camera_id=camera["id"], restarts=restarts,
+               backend_url=options.get("backend_url", BACKEND_URL), preview_port=camera.get("preview_port"))
+
+def parse_cameras(specs):
+    """CLI camera specs ("url" or "id=url") -> [{"id", "url"}]; falls back to CAMERAS."""
+    if not specs:
+        return CAMERAS
+    cameras = []
+    for i, spec in enumerate(specs, 1):
+        cam_id, sep, url = spec.partition("=")
+        if not sep or "://" in cam_id:
+            cam_id, url = f"cam-{i}", spec
+        cameras.append({"id": cam_id, "url": url})
+    return cameras
 
 if __name__ == "__main__":
-    if DEMO_MODE:
+    parser = argparse.ArgumentParser(description="A.R.E.S. Hazard Detector")
+    parser.add_argument("cameras", nargs="*", help="MJPEG stream URL(s), optionally id=url (default: cameras.json)")
+    parser.add_argument("--backend", default=BACKEND_URL, help="/api/objects URL results are posted to")
+    parser.add_argument("--workers", type=int, default=DETECT_WORKERS, help="decode/detect threads per camera")
+    parser.add_argument("--demo", action="store_true", help="demo mode (disabled)")
+    parser.add_argument("--detector", choices=("hsv", "dnn", "both"), default=DETECTOR,
+                        help="hsv: flame/smoke colour, dnn: MobileNet-SSD objects, both: run both")
+    parser.add_argument("--dnn-size", type=int, default=DNN_INPUT_SIZE, help="DNN input resolution (square)")
+    parser.add_argument("--dnn-every", type=int, default=DNN_EVERY_N, help="run the DNN on 1 of every N frames")
+    parser.add_argument("--dnn-batch", type=int, default=DNN_BATCH, help="max frames per DNN forward pass")
+    parser.add_argument("--dnn-threads", type=int, default=DNN_THREADS,
+                        help="OpenCV CPU threads per camera process (default: cores / cameras)")
+    parser.add_argument("--dnn-labels", default=None, help="comma-separated classes to keep, e.g. person,bottle")
+    parser.add_argument("--no-motion-gate", action="store_true", help="analyse every full frame")
+    parser.add_argument("--preview-port", type=int, default=PREVIEW_PORT_BASE,
+                        help="first camera's preview port (next cameras +1, +2...); 0 disables the preview")
+    args = parser.parse_args()
+
+    if DEMO_MODE or args.demo:
         print("🔬 A.R.E.S. Hazard Detector v2.2 (DEMO MODE)")
         demo_mode()
     else:
         print("📡 A.R.E.S. Hazard Detector v2.2 (Live Mode)")
-        while True:
-            process_stream()
-            print("Reconnecting in 5s...")
-            time.sleep(5)
+        cameras = parse_cameras(args.cameras)
+        if args.preview_port:
+            for i, camera in enumerate(cameras):
+                camera.setdefault("preview_port", args.preview_port + i)
+        options = {
+            "backend_url": args.backend,
+            "workers": args.workers,
+            "detector": args.detector,
+            "dnn_size": args.dnn_size,
+            "dnn_every": args.dnn_every,
+            "dnn_batch": args.dnn_batch,
+            "dnn_labels": args.dnn_labels.split(",") if args.dnn_labels else None,
+            "motion_gate": MOTION_GATE and not args.no_motion_gate,
+            # Split the cores between camera processes so OpenCV pools don't oversubscribe
+            "threads": args.dnn_threads or max(1, (os.cpu_count() or 1) // len(cameras)),
+        }
+        CameraSupervisor(camera_process, cameras, options).run()
@@ -4,7 +4,7 @@ Fetches live telemetry from the backend and sends a compact plain-text
 data packet to the OLED receiver ESP32 for physical monitoring.
 
 Usage:
-    python3 oled_sender.py [OLED_IP]
+    python3 oled_sender.py [OLED_IP] [--metrics-port 9102]
 """
 
 import requests
@@ -12,18 +12,27 @@ import time
 import sys
 import argparse
 
+import metrics
+
 # ── Configuration Defaults ──
 BACKEND_URL = "http://localhost:5000/api/status" 
 DEFAULT_OLED_IP = "10.73.208.199" # Default from last session
 SEND_INTERVAL = 2  # seconds
 
+FETCH_SECONDS = metrics.REGISTRY.histogram("ares_oled_fetch_seconds", "Backend /api/status round trip")
+SEND_SECONDS = metrics.REGISTRY.histogram("ares_oled_send_seconds", "OLED upload round trip")
+FAILURES = metrics.REGISTRY.counter("ares_oled_failures_total", "Failed fetches and uploads", ("stage",))
+
 def fetch_telemetry():
     """Pull latest telemetry from the A.R.E.S. backend."""
+    start = time.perf_counter()
     try:
         resp = requests.get(BACKEND_URL, timeout=3)
         resp.raise_for_status()
+        FETCH_SECONDS.observe(time.perf_counter() - start)
         return resp.json()
     except Exception as e:
+        FAILURES.inc("fetch")
         print(f"[FETCH ERROR] Backend at {BACKEND_URL} unreachable. {e}")
         return None
 
@@ -62,6 +71,7 @@ def build_oled_text(data):
 def send_to_oled(text, oled_ip):
     """Send telemetry text to the ESP32 receiver via HTTP POST."""
     endpoint = f"http://{oled_ip}/upload"
+    start = time.perf_counter()
     try:
         resp = requests.post(
             endpoint,
@@ -69,17 +79,23 @@ def send_to_oled(text, oled_ip):
             headers={"Content-Type": "text/plain"},
             timeout=3
         )
+        SEND_SECONDS.observe(time.perf_counter() - start)
         if resp.status_code == 200:
             print(f"[BRIDGE] Sent to {oled_ip}: {text}")
         else:
+            FAILURES.inc("send")
             print(f"[OLED ERR] HTTP {resp.status_code} at {oled_ip}")
     except Exception as e:
+        FAILURES.inc("send")
         print(f"[OFFLINE] Cannot reach OLED at {oled_ip}. Check IP on screen.")
 
 def main():
     parser = argparse.ArgumentParser(description="ARES OLED Data Bridge")
     parser.add_argument("ip", nargs="?", default=DEFAULT_OLED_IP, help="IP of the OLED ESP32")
+    parser.add_argument("--metrics-port", type=int, default=None, help="Serve Prometheus /metrics on this port")
     args = parser.parse_args()
+    if args.metrics_port:
+        metrics.serve(args.metrics_port)
 
     print("=" * 50)
     print("  A.R.E.S. OLED DASHBOARD BRIDGE")
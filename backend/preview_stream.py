@@ -0,0 +1,282 @@
+"""
+Project A.R.E.S. — Shared Preview Stream
+Re-serves a camera to any number of dashboard viewers so the ESP32-CAM only
+ever has one client (the hazard detector).
+
+    hub = PreviewHub()
+    PreviewServer(hub, port=8090).start()
+    hub.put_jpeg(jpg_bytes, captured)     # from the detector's reader stage
+    hub.set_objects(found_objects)        # /api/objects-style normalized boxes
+
+Viewers open  http://<host>:8090/stream?width=320&quality=50&fps=5&overlay=1
+(multipart MJPEG, usable as an <img> src) or /snapshot.jpg with the same
+parameters; /metrics serves the camera process's pipeline metrics.
+Requested sizes and qualities snap to a few fixed tiers, and each tier is
+encoded at most once per camera frame whatever the number of viewers: the
+first viewer to ask encodes, the others reuse the bytes. A request at the
+source size with no overlay gets the camera's own JPEG, not re-encoded, as
+long as the camera's quality (estimated from its quantization table) is
+within the requested quality tier.
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import cv2
+import numpy as np
+
+from metrics import REGISTRY, CONTENT_TYPE as METRICS_CONTENT_TYPE
+
+PREVIEW_PORT = 8090
+WIDTH_TIERS = (160, 320, 480, 640)    # 0 = source size
+QUALITY_TIERS = (30, 50, 70, 90)
+DEFAULT_QUALITY = 70
+MAX_FPS = 15
+BOUNDARY = "aresframe"
+
+OVERLAY_COLORS = {"FLAME": (0, 80, 255), "SMOKE": (200, 200, 200)}  # BGR; everything else green
+
+# IJG standard luminance quantization table (quality 50); encoders scale it by quality
+_STD_LUMA_SUM = sum((
+    16, 11, 10, 16, 24, 40, 51, 61, 12, 12, 14, 19, 26, 58, 60, 55,
+    14, 13, 16, 24, 40, 57, 69, 56, 14, 17, 22, 29, 51, 87, 80, 62,
+    18, 22, 37, 56, 68, 109, 103, 77, 24, 35, 55, 64, 81, 104, 113, 92,
+    49, 64, 78, 87, 103, 121, 120, 101, 72, 92, 95, 98, 112, 100, 103, 99,
+))
+
+
+def _snap(value, tiers):
+    return min(tiers, key=lambda tier: abs(tier - value))
+
+
+def jpeg_quality(jpg):
+    """
+    Estimated IJG quality (1-100) of a JPEG from its luminance quantization
+    table, reading only the header; None if there is none to read.
+    """
+    i = 2
+    while i + 4 <= len(jpg) and jpg[i] == 0xFF:
+        marker, length = jpg[i + 1], int.from_bytes(jpg[i + 2:i + 4], "big")
+        if marker == 0xDA:  # start of scan: no more tables
+            break
+        if marker == 0xDB:
+            j, end = i + 4, i + 2 + length
+            while j < end:
+                precision, table = jpg[j] >> 4, jpg[j] & 0x0F
+                size = 128 if precision else 64
+                if table == 0:
+                    values = jpg[j + 1:j + 1 + size]
+                    if precision:
+                        values = [int.from_bytes(values[k:k + 2], "big") for k in range(0, size, 2)]
+                    scale = 100.0 * sum(values) / _STD_LUMA_SUM
+                    quality = (200 - scale) / 2 if scale <= 100 else 5000 / scale
+                    return max(1, min(100, round(quality)))
+                j += 1 + size
+        i += 2 + length
+    return None
+
+
+class PreviewHub:
+    """Latest camera frame plus per-tier encoded copies, shared by every viewer."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._seq = 0
+        self._jpeg = None
+        self._captured = None
+        self._objects = []
+        self._decoded = (0, None)      # (seq, BGR frame)
+        self._source_quality = (0, None)  # (seq, estimated JPEG quality of the camera frame)
+        self._decode_lock = threading.Lock()
+        self._cache = {}               # tier -> (seq, jpeg bytes)
+        self._tier_locks = {}
+        self.encodes = 0
+        self.clients = 0
+
+    # ── Producer side ──
+    def put_jpeg(self, jpg, captured=None):
+        with self._cond:
+            self._seq += 1
+            self._jpeg = jpg
+            self._captured = captured if captured is not None else time.time()
+            self._cond.notify_all()
+
+    def set_objects(self, objects):
+        self._objects = objects
+
+    # ── Viewer side ──
+    def wait(self, last_seq, timeout=None):
+        """Blocks until a frame newer than last_seq exists. Returns its seq, or None on timeout."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._seq > last_seq, timeout):
+                return None
+            return self._seq
+
+    def tier(self, width=0, quality=DEFAULT_QUALITY, overlay=False):
+        """Normalizes a viewer request to one of the shared encoding tiers."""
+        width = _snap(width, WIDTH_TIERS) if width else 0
+        return width, _snap(quality, QUALITY_TIERS), bool(overlay)
+
+    def _frame(self, seq, jpg):
+        """Decodes the current JPEG once, however many tiers need it."""
+        with self._decode_lock:
+            if self._decoded[0] != seq:
+                self._decoded = (seq, cv2.imdecode(np.frombuffer(jpg, dtype=np.uint8), cv2.IMREAD_COLOR))
+            return self._decoded[1]
+
+    def _quality(self, seq, jpg):
+        """Source JPEG quality, estimated once per frame."""
+        cached = self._source_quality
+        if cached[0] != seq:
+            cached = self._source_quality = (seq, jpeg_quality(jpg))
+        return cached[1]
+
+    def render(self, tier):
+        """Latest frame encoded for tier as (seq, jpeg bytes); None before the first frame."""
+        with self._cond:
+            seq, jpg = self._seq, self._jpeg
+            lock = self._tier_locks.setdefault(tier, threading.Lock())
+        if jpg is None:
+            return None
+        width, quality, overlay = tier
+        if not width and not overlay and (self._quality(seq, jpg) or 101) <= quality:
+            return seq, jpg  # passthrough: the camera already encoded it within the tier's quality
+
+        with lock:
+            cached = self._cache.get(tier)
+            if cached is not None and cached[0] >= seq:
+                return cached
+            frame = self._frame(seq, jpg)
+            if frame is None:
+                return None
+            if width and width < frame.shape[1]:
+                frame = cv2.resize(frame, (width, round(frame.shape[0] * width / frame.shape[1])),
+                                   interpolation=cv2.INTER_AREA)
+            elif overlay:
+                frame = frame.copy()  # never draw on the shared decoded frame
+            if overlay:
+                self._draw(frame, self._objects)
+            ok, buf = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+            if not ok:
+                return None
+            self.encodes += 1
+            self._cache[tier] = (seq, buf.tobytes())
+            return self._cache[tier]
+
+    @staticmethod
+    def _draw(frame, objects):
+        h, w = frame.shape[:2]
+        for obj in objects:
+            box = obj.get("box") or {}
+            x1, y1 = int(box.get("x", 0) * w), int(box.get("y", 0) * h)
+            x2, y2 = x1 + int(box.get("w", 0) * w), y1 + int(box.get("h", 0) * h)
+            color = OVERLAY_COLORS.get(obj.get("label"), (80, 220, 80))
+            cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+            text = f"{obj.get('label', '?')} {100 * obj.get('confidence', 0):.0f}%"
+            cv2.putText(frame, text, (x1, max(12, y1 - 4)), cv2.FONT_HERSHEY_SIMPLEX, 0.4, color, 1, cv2.LINE_AA)
+
+    def attach(self):
+        with self._cond:
+            self.clients += 1
+
+    def detach(self):
+        with self._cond:
+            self.clients -= 1
+
+    def stats(self):
+        return {"seq": self._seq, "clients": self.clients, "encodes": self.encodes, "tiers": len(self._cache)}
+
+
+class _PreviewHandler(BaseHTTPRequestHandler):
+    hub = None  # set per server class
+
+    def _params(self):
+        q = parse_qs(urlparse(self.path).query)
+        get = lambda name, default: q.get(name, [default])[0]
+        try:
+            width = int(get("width", 0))
+            quality = int(get("quality", DEFAULT_QUALITY))
+            fps = max(0.5, min(float(get("fps", MAX_FPS)), MAX_FPS))
+        except ValueError:
+            width, quality, fps = 0, DEFAULT_QUALITY, MAX_FPS
+        overlay = get("overlay", "0") not in ("0", "", "false")
+        return self.hub.tier(width, quality, overlay), fps
+
+    def do_GET(self):
+        route = urlparse(self.path).path
+        if route == "/stream":
+            self._stream()
+        elif route == "/snapshot.jpg":
+            tier, _ = self._params()
+            frame = self.hub.render(tier)
+            if frame is None:
+                self.send_error(503, "No frame yet")
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "image/jpeg")
+            self.send_header("Content-Length", str(len(frame[1])))
+            self.send_header("Access-Control-Allow-Origin", "*")
+            self.end_headers()
+            self.wfile.write(frame[1])
+        elif route == "/metrics":
+            body = REGISTRY.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", METRICS_CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self.send_error(404)
+
+    def _stream(self):
+        tier, fps = self._params()
+        self.send_response(200)
+        self.send_header("Content-Type", f"multipart/x-mixed-replace; boundary={BOUNDARY}")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        self.hub.attach()
+        seq = 0
+        next_due = 0.0
+        try:
+            while True:
+                # Per-viewer FPS cap: sleep, then jump to whatever frame is newest
+                delay = next_due - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                if self.hub.wait(seq, timeout=10) is None:
+                    continue
+                frame = self.hub.render(tier)
+                if frame is None:
+                    continue
+                seq, jpg = frame
+                self.wfile.write(
+                    f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\nContent-Length: {len(jpg)}\r\n\r\n".encode()
+                    + jpg + b"\r\n"
+                )
+                next_due = time.monotonic() + 1.0 / fps
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.hub.detach()
+
+    def log_message(self, *args):
+        pass
+
+
+class PreviewServer:
+    """Threaded HTTP server for one PreviewHub (one camera)."""
+
+    def __init__(self, hub, port=PREVIEW_PORT, host="0.0.0.0"):
+        handler = type("PreviewHandler", (_PreviewHandler,), {"hub": hub})
+        self.hub = hub
+        self.port = port
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        print(f"[PREVIEW] Serving on port {self.port}")
+        return self
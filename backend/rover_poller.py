@@ -0,0 +1,116 @@
+"""
+Project A.R.E.S. — Fleet Poller
+Polls any number of rover /data endpoints concurrently from one background
+thread running an asyncio loop.
+
+Each rover gets its own schedule (interval, timeout), its own keep-alive HTTP
+session, and jittered exponential backoff while it is offline. Blocking HTTP
+calls run on a shared thread pool, so one slow or dead rover never delays the
+others.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class RoverEndpoint:
+    """Polling config for one rover."""
+
+    def __init__(self, rover_id, url, interval=2.0, timeout=3.0, max_backoff=60.0):
+        self.rover_id = rover_id
+        self.url = url
+        self.interval = float(interval)
+        self.timeout = float(timeout)
+        self.max_backoff = float(max_backoff)
+
+    @classmethod
+    def from_dict(cls, cfg):
+        return cls(cfg["id"], cfg["url"], cfg.get("interval", 2.0), cfg.get("timeout", 3.0), cfg.get("max_backoff", 60.0))
+
+
+class RoverPoller:
+    """
+    Runs one polling task per rover.
+    on_sample(rover_id, raw_json, rtt_seconds) is called for every successful poll,
+    on_offline(rover_id, error) for every failed one. Both run on the poller thread.
+    """
+
+    def __init__(self, endpoints, on_sample, on_offline=None, max_workers=None):
+        self.endpoints = list(endpoints)
+        self.on_sample = on_sample
+        self.on_offline = on_offline
+        self.max_workers = max_workers or min(32, max(4, len(self.endpoints)))
+        self.stats = {
+            ep.rover_id: {"url": ep.url, "ok": 0, "failures": 0, "consecutive_failures": 0,
+                          "last_rtt_ms": None, "last_ok": None, "next_delay": ep.interval}
+            for ep in self.endpoints
+        }
+        self._thread = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=lambda: asyncio.run(self._main()), name="rover-poller", daemon=True)
+            self._thread.start()
+        return self
+
+    async def _main(self):
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="rover-http") as pool:
+            await asyncio.gather(*(self._poll_rover(ep, pool) for ep in self.endpoints))
+
+    @staticmethod
+    def _session():
+        session = requests.Session()
+        # One pooled keep-alive connection per rover
+        session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        return session
+
+    @staticmethod
+    def _fetch(session, endpoint):
+        resp = session.get(endpoint.url, timeout=endpoint.timeout)
+        resp.raise_for_status()
+        return resp.json()
+
+    def _backoff(self, endpoint, failures):
+        """Exponential backoff with equal jitter, capped at max_backoff."""
+        delay = min(endpoint.max_backoff, endpoint.interval * (2 ** min(failures, 16)))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    async def _poll_rover(self, endpoint, pool):
+        loop = asyncio.get_running_loop()
+        session = self._session()
+        stats = self.stats[endpoint.rover_id]
+        # Stagger start-up so a fleet doesn't poll in lock-step
+        await asyncio.sleep(random.uniform(0, endpoint.interval))
+        while True:
+            started = time.monotonic()
+            try:
+                future = loop.run_in_executor(pool, self._fetch, session, endpoint)
+            except RuntimeError:
+                return  # pool shut down: interpreter is exiting
+            try:
+                raw = await future
+                rtt = time.monotonic() - started
+                stats.update(ok=stats["ok"] + 1, consecutive_failures=0,
+                             last_rtt_ms=round(rtt * 1000, 1), last_ok=time.time())
+                try:
+                    self.on_sample(endpoint.rover_id, raw, rtt)
+                except Exception as e:
+                    print(f"[ESP32 Poll] {endpoint.rover_id}: bad sample: {e}")
+                delay = max(0.0, endpoint.interval - (time.monotonic() - started))
+            except Exception as e:
+                stats["failures"] += 1
+                stats["consecutive_failures"] += 1
+                if self.on_offline is not None:
+                    self.on_offline(endpoint.rover_id, e)
+                # Drop the pooled connection; it is probably dead
+                session.close()
+                session = self._session()
+                delay = self._backoff(endpoint, stats["consecutive_failures"])
+            stats["next_delay"] = round(delay, 2)
+            await asyncio.sleep(delay)
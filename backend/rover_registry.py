@@ -0,0 +1,175 @@
+"""
+Project A.R.E.S. — Rover State Registry
+Thread-safe, in-memory state for every telemetry source (rover, simulator, ...).
+
+Each rover keeps its latest snapshot plus a fixed-capacity ring buffer of recent
+samples in the columnar archive record layout, so memory per rover is bounded
+(capacity * 72 bytes) and recent history never has to come from disk.
+"""
+
+import threading
+
+import numpy as np
+
+from telemetry_archive import RECORD_DTYPE, entries_from_records, records_from_entries
+
+
+class RingBuffer:
+    """Fixed-capacity ring of structured records with O(1) append."""
+
+    def __init__(self, capacity, dtype=RECORD_DTYPE):
+        self.capacity = max(1, int(capacity))
+        self._buf = np.zeros(self.capacity, dtype=dtype)
+        self._head = 0  # next write position
+        self._size = 0
+
+    def append(self, record):
+        self._buf[self._head] = record
+        self._head = (self._head + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def extend(self, records):
+        """
+        Adds a batch of records (sorted by ts). A batch that starts before the
+        newest record already held is merged in time order; either way only
+        the newest `capacity` records are kept.
+        """
+        if not len(records):
+            return
+        if self._size and records["ts"][0] < self._buf[(self._head - 1) % self.capacity]["ts"]:
+            merged = np.concatenate([self.latest(), records])
+            merged = merged[np.argsort(merged["ts"], kind="stable")][-self.capacity:]
+            self._buf[:len(merged)] = merged
+            self._size = len(merged)
+            self._head = self._size % self.capacity
+            return
+        records = records[-self.capacity:]
+        n = len(records)
+        first = min(n, self.capacity - self._head)
+        self._buf[self._head:self._head + first] = records[:first]
+        self._buf[:n - first] = records[first:]
+        self._head = (self._head + n) % self.capacity
+        self._size = min(self._size + n, self.capacity)
+
+    def views(self, n=None):
+        """
+        Returns the newest n records (oldest first) as one or two zero-copy views.
+        Views alias the live buffer: copy them if they must outlive later appends.
+        """
+        n = self._size if n is None else max(0, min(n, self._size))
+        start = (self._head - n) % self.capacity
+        if n == 0:
+            return [self._buf[:0]]
+        if start + n <= self.capacity:
+            return [self._buf[start:start + n]]
+        return [self._buf[start:], self._buf[:self._head]]
+
+    def latest(self, n=None):
+        """Newest n records as a single array (a copy only when the window wraps)."""
+        parts = self.views(n)
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def __len__(self):
+        return self._size
+
+
+class RoverRegistry:
+    """Latest snapshot + recent-history ring per rover ID."""
+
+    def __init__(self, default_capacity=3600, capacities=None):
+        self.default_capacity = default_capacity
+        self.capacities = dict(capacities or {})
+        self._lock = threading.Lock()
+        self._snapshots = {}
+        self._rings = {}
+        self._latest_id = None
+
+    def _ring(self, rover_id):
+        ring = self._rings.get(rover_id)
+        if ring is None:
+            ring = self._rings[rover_id] = RingBuffer(self.capacities.get(rover_id, self.default_capacity))
+        return ring
+
+    def update(self, rover_id, snapshot):
+        """Stores a new snapshot for rover_id and appends its numeric fields to the ring."""
+        snapshot = dict(snapshot, rover=rover_id)
+        record = records_from_entries([snapshot])[0]
+        with self._lock:
+            self._snapshots[rover_id] = snapshot
+            self._ring(rover_id).append(record)
+            self._latest_id = rover_id
+        return snapshot
+
+    def extend(self, rover_id, records, snapshot):
+        """
+        Adds a batch of samples (structured records sorted by ts) to a rover's
+        ring. snapshot describes the newest record; it becomes the rover's
+        latest snapshot only if the batch is newer than what the ring already
+        held (a late backlog upload must not roll the live view back).
+        Returns True when it did.
+        """
+        snapshot = dict(snapshot, rover=rover_id)
+        with self._lock:
+            ring = self._ring(rover_id)
+            newest = ring.latest(1)
+            current = not len(newest) or bool(records["ts"][-1] >= newest["ts"][0])
+            ring.extend(records)
+            if current:
+                self._snapshots[rover_id] = snapshot
+                self._latest_id = rover_id
+            return current
+
+    def patch(self, rover_id, **fields):
+        """Updates fields of the latest snapshot without recording a new sample."""
+        with self._lock:
+            if rover_id not in self._snapshots:
+                return None
+            snapshot = self._snapshots[rover_id] = dict(self._snapshots[rover_id], **fields)
+            return snapshot
+
+    def latest(self, rover_id=None):
+        """Latest snapshot for rover_id, or for whichever rover reported last. None if unknown."""
+        with self._lock:
+            return self._snapshots.get(rover_id if rover_id is not None else self._latest_id)
+
+    @property
+    def latest_rover_id(self):
+        with self._lock:
+            return self._latest_id
+
+    def rovers(self):
+        with self._lock:
+            return {rover_id: dict(snapshot) for rover_id, snapshot in self._snapshots.items()}
+
+    def _recent(self, rover_id, n=None):
+        """(resolved rover id, copy of its newest n records), read under one lock hold."""
+        with self._lock:
+            rover_id = rover_id if rover_id is not None else self._latest_id
+            ring = self._rings.get(rover_id)
+            if ring is None:
+                return rover_id, np.empty(0, dtype=RECORD_DTYPE)
+            return rover_id, ring.latest(n).copy()
+
+    def recent(self, rover_id=None, n=None):
+        """Newest n samples for a rover as a structured NumPy array (oldest first)."""
+        return self._recent(rover_id, n)[1]
+
+    def recent_entries(self, rover_id=None, n=None):
+        """Newest n samples as log-style dicts (ISO timestamp + numeric fields)."""
+        rover_id, records = self._recent(rover_id, n)
+        return entries_from_records(records, rover_id)
+
+    def nearest(self, ts, rover_id=None, max_gap=None):
+        """Sample closest in time to epoch ts as a log-style dict, or None (also if further than max_gap s)."""
+        rover_id, records = self._recent(rover_id)
+        if not len(records):
+            return None
+        gaps = np.abs(records["ts"] - ts)
+        i = int(np.nanargmin(gaps)) if not np.isnan(gaps).all() else None
+        if i is None or (max_gap is not None and gaps[i] > max_gap):
+            return None
+        return entries_from_records(records[i:i + 1], rover_id)[0]
+
+    def memory_bytes(self):
+        with self._lock:
+            return sum(ring.capacity * ring._buf.itemsize for ring in self._rings.values())
@@ -0,0 +1,70 @@
+"""
+Project A.R.E.S. — Serving Capacity
+Thread budget for running the backend under gunicorn (see gunicorn.conf.py).
+
+All live state (rover registry, SSE broadcaster, rule engine, analysis cache,
+hazard store, log writer) lives in one process, and the log/archive files
+have a single writer. So the server runs ONE worker process with a pool of
+threads, and the background services (fleet poller, log writer) start once
+in that worker. Scaling past one process would need that state moved to an
+external store first.
+
+Every in-flight request holds a thread, and streams hold theirs for as long
+as the client stays connected, so the pool is split into three budgets that
+cannot eat each other:
+
+    threads = STREAM_SLOTS + CHAT_SLOTS + API_THREADS
+
+    STREAM_SLOTS  long-lived SSE clients: each dashboard tab keeps one
+                  /api/telemetry/stream open, plus short analysis job streams
+    CHAT_SLOTS    concurrent /api/chat generations (Ollama runs them one or a
+                  few at a time anyway; more would only queue on the GPU/CPU)
+    API_THREADS   everything short: status, ingest, /api/objects posts from
+                  every camera, logs, aggregates, hazards
+
+A stream or chat request that finds its budget full is answered at once
+(an SSE "busy" event with a retry hint) instead of taking a thread from the
+API budget. Size STREAM_SLOTS to dashboards x 1 plus a few spare, and
+API_THREADS to at least cameras + rovers pushing data + 4.
+Override with ARES_STREAM_SLOTS, ARES_CHAT_SLOTS and ARES_API_THREADS.
+"""
+
+import os
+import threading
+
+STREAM_SLOTS = int(os.environ.get("ARES_STREAM_SLOTS", 16))
+CHAT_SLOTS = int(os.environ.get("ARES_CHAT_SLOTS", 2))
+API_THREADS = int(os.environ.get("ARES_API_THREADS", 8))
+STREAM_RETRY_MS = 5000   # SSE reconnect delay suggested to clients turned away
+
+
+def thread_budget():
+    return STREAM_SLOTS + CHAT_SLOTS + API_THREADS
+
+
+class Slots:
+    """Non-blocking counting limit for one budget (streams or chat)."""
+
+    def __init__(self, size):
+        self.size = size
+        self._sem = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self.in_use = 0
+        self.rejected = 0
+
+    def acquire(self):
+        if not self._sem.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            return False
+        with self._lock:
+            self.in_use += 1
+        return True
+
+    def release(self):
+        with self._lock:
+            self.in_use -= 1
+        self._sem.release()
+
+    def stats(self):
+        return {"size": self.size, "in_use": self.in_use, "rejected": self.rejected}
@@ -0,0 +1,91 @@
+"""
+Project A.R.E.S. — Telemetry Aggregation
+Vectorized downsampling of long telemetry windows so charts receive a fixed
+number of points regardless of how much history they cover.
+
+    bucket_stats(): per time bucket min / max / mean / last / count
+    lttb():         Largest-Triangle-Three-Buckets shape-preserving downsample
+
+Both expect `ts` sorted ascending (as returned by TelemetryArchive.query).
+"""
+
+import numpy as np
+
+
+def _drop_nan(ts, values):
+    values = np.asarray(values, dtype=np.float64)
+    mask = ~np.isnan(values)
+    if mask.all():
+        return np.asarray(ts, dtype=np.float64), values
+    return np.asarray(ts, dtype=np.float64)[mask], values[mask]
+
+
+def bucket_stats(ts, values, t0, t1, buckets):
+    """
+    Splits [t0, t1] into `buckets` equal-width time buckets and reduces each one.
+    Returns a dict of equal-length arrays: t (bucket start), min, max, mean, last, count.
+    Empty buckets report count 0 and NaN statistics.
+    """
+    ts, values = _drop_nan(ts, values)
+    edges = np.linspace(t0, t1, buckets + 1)
+    bounds = np.searchsorted(ts, edges, side="left")
+    bounds[-1] = np.searchsorted(ts, t1, side="right")  # last bucket is closed on the right
+    starts, ends = bounds[:-1], bounds[1:]
+    counts = ends - starts
+    filled = counts > 0
+
+    result = {
+        "t": edges[:-1],
+        "min": np.full(buckets, np.nan),
+        "max": np.full(buckets, np.nan),
+        "mean": np.full(buckets, np.nan),
+        "last": np.full(buckets, np.nan),
+        "count": counts,
+    }
+    if not filled.any():
+        return result
+
+    # Filled buckets tile values[starts[0]:ends[-1]] contiguously, so reduceat can run on it directly
+    first, stop = starts[filled][0], ends[filled][-1]
+    window = values[first:stop]
+    offsets = starts[filled] - first
+    result["min"][filled] = np.minimum.reduceat(window, offsets)
+    result["max"][filled] = np.maximum.reduceat(window, offsets)
+    result["mean"][filled] = np.add.reduceat(window, offsets) / counts[filled]
+    result["last"][filled] = values[ends[filled] - 1]
+    return result
+
+
+def lttb(ts, values, threshold):
+    """
+    Largest-Triangle-Three-Buckets downsample to at most `threshold` points.
+    Keeps the first and last sample and, per bucket, the sample forming the largest
+    triangle with the previously chosen point and the next bucket's average.
+    Returns (ts, values) arrays.
+    """
+    ts, values = _drop_nan(ts, values)
+    n = len(ts)
+    if threshold >= n or threshold < 3:
+        return ts, values
+
+    # Bucket boundaries over the interior points [1, n-1)
+    bounds = np.floor(np.linspace(1, n - 1, threshold - 1)).astype(np.int64)
+    picked = np.empty(threshold, dtype=np.int64)
+    picked[0], picked[-1] = 0, n - 1
+
+    # Next-bucket averages are independent of the choices made, so compute them up front
+    sums_t = np.add.reduceat(ts[1:n - 1], bounds[:-1] - 1)
+    sums_v = np.add.reduceat(values[1:n - 1], bounds[:-1] - 1)
+    sizes = np.diff(bounds)
+    avg_t = np.append(sums_t / sizes, ts[-1])
+    avg_v = np.append(sums_v / sizes, values[-1])
+
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = bounds[i], bounds[i + 1]
+        bt, bv = ts[lo:hi], values[lo:hi]
+        # Twice the triangle area; the constant factor doesn't change the argmax
+        area = np.abs((ts[a] - avg_t[i + 1]) * (bv - values[a]) - (ts[a] - bt) * (avg_v[i + 1] - values[a]))
+        a = lo + int(np.argmax(area))
+        picked[i + 1] = a
+    return ts[picked], values[picked]
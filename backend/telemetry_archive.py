@@ -0,0 +1,267 @@
+"""
+Project A.R.E.S. — Columnar Telemetry Archive
+Compact binary archive for the numeric telemetry fields. Each sample is one
+fixed-width little-endian record (epoch timestamp + typed sensor columns), so
+the file can be memory-mapped and sliced by time without parsing anything.
+
+File layout:
+    8 bytes   magic b"ARESCOL1"
+    4 bytes   uint32 header length H
+    H bytes   JSON header {"fields": [[name, numpy dtype], ...]}, padded to 64 bytes
+    N * record_size bytes of records, in ts order
+
+Samples older than the newest archived one go to <archive>.late (same layout,
+arrival order) and are merged in by time at query time.
+
+Usage:
+    python3 telemetry_archive.py convert [telemetry_history.jsonl] [telemetry_archive.bin]
+"""
+
+import datetime
+import json
+import os
+import struct
+import sys
+import threading
+
+import numpy as np
+
+from telemetry_store import TelemetryStore, to_epoch
+
+MAGIC = b"ARESCOL1"
+LATE_SUFFIX = ".late"   # side file for samples older than the newest archived one
+
+# Numeric fields of the latest_data schema. GPS keeps float64 precision.
+ARCHIVE_FIELDS = (
+    "temp", "pressure", "gas", "radiation", "flame", "water",
+    "ax", "ay", "az", "gx", "gy", "gz", "lat", "lng",
+)
+RECORD_DTYPE = np.dtype(
+    [("ts", "<f8")] + [(f, "<f8" if f in ("lat", "lng") else "<f4") for f in ARCHIVE_FIELDS]
+)
+
+
+def _span(ts, since, until):
+    """Slice of a sorted ts column with since <= ts <= until (either bound optional)."""
+    i0 = int(np.searchsorted(ts, since, side="left")) if since is not None else 0
+    i1 = int(np.searchsorted(ts, until, side="right")) if until is not None else len(ts)
+    return slice(i0, i1)
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def records_from_entries(entries, dtype=RECORD_DTYPE):
+    """Converts a list of telemetry dicts into a structured record array (missing values -> NaN)."""
+    records = np.empty(len(entries), dtype=dtype)
+    for name in dtype.names:
+        if name == "ts":
+            column = []
+            for entry in entries:
+                try:
+                    column.append(to_epoch(entry.get("timestamp")))
+                except ValueError:
+                    column.append(None)
+            records["ts"] = np.array(column, dtype=float)  # None -> nan
+        else:
+            records[name] = np.fromiter((_to_float(e.get(name)) for e in entries), dtype=float, count=len(entries))
+    return records
+
+
+def entries_from_records(records, rover_id=None):
+    """
+    Structured records -> log-style dicts (ISO timestamp + numeric fields).
+    float32 columns come out as the shortest decimal that maps back to the
+    stored value (0.1, not 0.10000000149011612), i.e. what was received.
+    """
+    names = [name for name in records.dtype.names if name != "ts"]
+    columns = {}
+    for name in names:
+        column = records[name]
+        if column.dtype == np.float32:
+            column = column.astype(str).astype(np.float64)
+        # NaN (missing value) -> None so the entries stay valid JSON
+        columns[name] = [None if v != v else v for v in column.tolist()]
+    entries = []
+    for i, ts in enumerate(records["ts"].tolist()):
+        entry = {name: columns[name][i] for name in names}
+        entry["timestamp"] = datetime.datetime.fromtimestamp(ts).isoformat() if ts == ts else None
+        if rover_id is not None:
+            entry["rover"] = rover_id
+        entries.append(entry)
+    return entries
+
+
+class _RecordFile:
+    """One archive file (header + fixed-width records), memory-mapped for reads."""
+
+    def __init__(self, path, dtype=RECORD_DTYPE):
+        self.path = path
+        self._mmap = None
+        self._mapped_count = -1
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            self._write_header(dtype)
+        self.dtype, self.data_offset = self._read_header()
+
+    def _write_header(self, dtype):
+        header = json.dumps({"fields": [[name, dtype[name].str] for name in dtype.names]}).encode()
+        total = len(MAGIC) + 4 + len(header)
+        header += b" " * (-total % 64)
+        with open(self.path, "wb") as f:
+            f.write(MAGIC + struct.pack("<I", len(header)) + header)
+
+    def _read_header(self):
+        with open(self.path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{self.path} is not an A.R.E.S. telemetry archive")
+            (length,) = struct.unpack("<I", f.read(4))
+            header = json.loads(f.read(length))
+        dtype = np.dtype([(name, fmt) for name, fmt in header["fields"]])
+        return dtype, len(MAGIC) + 4 + length
+
+    def count(self):
+        return (os.path.getsize(self.path) - self.data_offset) // self.dtype.itemsize
+
+    def records(self):
+        """Memory-mapped view of all complete records (re-mapped only when the file grows)."""
+        count = self.count()
+        if count != self._mapped_count:
+            if count == 0:
+                self._mmap = np.empty(0, dtype=self.dtype)
+            else:
+                self._mmap = np.memmap(self.path, dtype=self.dtype, mode="r", offset=self.data_offset, shape=(count,))
+            self._mapped_count = count
+        return self._mmap
+
+    def write(self, records):
+        with open(self.path, "ab") as f:
+            # Drop any torn trailing record left by a crash mid-write
+            f.truncate(self.data_offset + self.count() * self.dtype.itemsize)
+            f.write(records.astype(self.dtype, copy=False).tobytes())
+
+
+class TelemetryArchive:
+    """
+    Append-only, memory-mapped columnar archive with time-window queries.
+
+    The main file is kept sorted by ts so a window is two binary searches.
+    Samples older than the newest archived one (a rover uploading a backlog
+    after a dropout) are written to a side file, <archive>.late, in the same
+    format; its sort order is kept in memory and late records that fall in
+    a window are merged in by time when it is queried.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._main = _RecordFile(path)
+        self.dtype = self._main.dtype
+        self._late = _RecordFile(path + LATE_SUFFIX, self.dtype) if os.path.exists(path + LATE_SUFFIX) else None
+        self._late_order = np.empty(0, dtype=np.intp)
+        records = self._main.records()
+        self._last_ts = float(records["ts"][-1]) if len(records) else -np.inf
+
+    # ── Writes ──
+    def append(self, entries):
+        """
+        Appends telemetry dicts (or a structured record array). Records at or
+        after the newest archived time go to the main file with one write,
+        older ones to the late file.
+        """
+        if len(entries) == 0:
+            return
+        records = entries if isinstance(entries, np.ndarray) else records_from_entries(entries, self.dtype)
+        with self._lock:
+            records = records.copy()
+            # A sample without a usable time is filed at the newest archived time
+            fallback = self._last_ts if np.isfinite(self._last_ts) else 0.0
+            records["ts"] = np.where(np.isfinite(records["ts"]), records["ts"], fallback)
+            records = records[np.argsort(records["ts"], kind="stable")]
+            cut = int(np.searchsorted(records["ts"], self._last_ts, side="left"))
+            if cut < len(records):
+                self._main.write(records[cut:])
+                self._last_ts = float(records["ts"][-1])
+            if cut:
+                if self._late is None:
+                    self._late = _RecordFile(self.path + LATE_SUFFIX, self.dtype)
+                self._late.write(records[:cut])
+
+    # ── Queries ──
+    def _late_records(self):
+        """(late records, their ts sort order); the order is recomputed only when the file grew."""
+        if self._late is None:
+            return None, self._late_order
+        late = self._late.records()
+        if len(self._late_order) != len(late):
+            self._late_order = np.argsort(late["ts"], kind="stable")
+        return late, self._late_order
+
+    def window(self, since=None, until=None):
+        """
+        Returns the structured records with since <= ts <= until, sorted by ts:
+        a zero-copy slice of the main file, or a merged copy when late records
+        fall in the window.
+        """
+        since, until = to_epoch(since), to_epoch(until)
+        with self._lock:
+            records = self._main.records()
+            late, order = self._late_records()
+        selected = records[_span(records["ts"], since, until)]
+        if late is None or not len(late):
+            return selected
+        late_ts = late["ts"][order]
+        late_selected = late[order[_span(late_ts, since, until)]]
+        if not len(late_selected):
+            return selected
+        merged = np.concatenate([late_selected, selected])
+        return merged[np.argsort(merged["ts"], kind="stable")]
+
+    def query(self, since=None, until=None, fields=None):
+        """
+        Returns {"ts": array, field: array, ...} for the time window.
+        Arrays are views onto the memory-mapped file; copy them if you need to keep them.
+        """
+        records = self.window(since, until)
+        names = ["ts"] + [f for f in (fields or self.dtype.names) if f != "ts"]
+        unknown = [f for f in names if f not in self.dtype.names]
+        if unknown:
+            raise KeyError(f"Unknown archive field(s): {', '.join(unknown)}")
+        return {name: records[name] for name in names}
+
+    def __len__(self):
+        with self._lock:
+            return self._main.count() + (self._late.count() if self._late is not None else 0)
+
+
+def convert_jsonl(log_path, archive_path, batch_size=10000):
+    """Converts a JSONL telemetry history (including rotated segments) into a columnar archive."""
+    archive = TelemetryArchive(archive_path)
+    store = TelemetryStore(log_path)
+    batch, total = [], 0
+    for entry in store.iter_entries():
+        batch.append(entry)
+        if len(batch) >= batch_size:
+            archive.append(batch)
+            total += len(batch)
+            batch = []
+    archive.append(batch)
+    return total + len(batch)
+
+
+if __name__ == "__main__":
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    args = sys.argv[1:]
+    if not args or args[0] != "convert":
+        print(__doc__)
+        sys.exit(1)
+    src = args[1] if len(args) > 1 else os.path.join(base_dir, "telemetry_history.jsonl")
+    dst = args[2] if len(args) > 2 else os.path.join(base_dir, "telemetry_archive.bin")
+    if os.path.exists(dst) and len(TelemetryArchive(dst)):
+        print(f"[ARCHIVE] {dst} already contains samples; refusing to append a duplicate history")
+        sys.exit(1)
+    count = convert_jsonl(src, dst)
+    print(f"[ARCHIVE] Converted {count} samples: {src} -> {dst} ({os.path.getsize(dst)} bytes)")
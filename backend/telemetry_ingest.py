@@ -0,0 +1,124 @@
+"""
+Project A.R.E.S. — Batch Telemetry Ingest
+Turns an uploaded batch of samples (a rover's buffered backlog after a radio
+dropout) into one structured record array in a handful of NumPy operations,
+instead of one HTTP round trip and one log write per sample.
+
+    samples = parse_samples(request.get_data(), request.content_type)
+    exact, rejected = samples_to_records(samples, ESP32_FIELDS, calibration, dtype=EXACT_DTYPE)
+    records = exact.astype(RECORD_DTYPE)     # float32 sensor columns, for the archive / rules
+
+Log entries and snapshots are built from the float64 records, so values are
+stored as the rover sent them (25.3, not float32's 25.299999237060547).
+
+Bodies may be a JSON array of samples, {"rover": ..., "samples": [...]}, or
+newline-delimited JSON. Every sample carries its own time: "ts" (epoch
+seconds, or milliseconds if larger than 1e12) or an ISO "timestamp".
+Samples with no usable time, a time too far in the future, or no sensor
+values at all are rejected; the rest are sorted by time with duplicate
+timestamps dropped.
+"""
+
+import json
+import time
+
+import numpy as np
+
+from telemetry_archive import ARCHIVE_FIELDS, RECORD_DTYPE
+from telemetry_store import to_epoch
+
+MAX_BATCH_SAMPLES = 50000
+MAX_CLOCK_SKEW = 300      # seconds a sample may be ahead of the backend clock
+
+# archive field -> key in a raw ESP32 /data sample (same mapping as app.normalize_esp32)
+ESP32_FIELDS = {
+    "temp": "temp", "pressure": "pressure", "gas": "air", "radiation": "flame", "flame": "flame",
+    "water": "water", "ax": "ax", "ay": "ay", "az": "az", "gx": "gx", "gy": "gy", "gz": "gz",
+    "lat": "lat", "lng": "lng",
+}
+# Samples already in dashboard units use the archive names directly
+DASHBOARD_FIELDS = {name: name for name in ARCHIVE_FIELDS}
+# RECORD_DTYPE's fields at full precision
+EXACT_DTYPE = np.dtype([(name, np.float64) for name in RECORD_DTYPE.names])
+
+
+def parse_samples(body, content_type=None):
+    """Decodes a batch body into (rover or None, list of sample dicts). Raises ValueError."""
+    text = body.decode("utf-8") if isinstance(body, bytes) else body
+    if "ndjson" in (content_type or "") or "jsonl" in (content_type or ""):
+        samples = [json.loads(line) for line in text.splitlines() if line.strip()]
+        rover = None
+    else:
+        data = json.loads(text)
+        rover = None
+        if isinstance(data, dict):
+            rover = data.get("rover")
+            data = data.get("samples")
+        if not isinstance(data, list):
+            raise ValueError("expected a JSON array of samples or {\"samples\": [...]}")
+        samples = data
+    if len(samples) > MAX_BATCH_SAMPLES:
+        raise ValueError(f"batch too large ({len(samples)} > {MAX_BATCH_SAMPLES} samples)")
+    if not all(isinstance(s, dict) for s in samples):
+        raise ValueError("every sample must be a JSON object")
+    return rover, samples
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _column(values):
+    """List of JSON scalars -> float64 array (missing/invalid -> NaN), vectorized when possible."""
+    try:
+        column = np.array(values, dtype=np.float64)  # None -> nan, numeric strings parse
+        if column.ndim == 1:
+            return column
+    except (TypeError, ValueError):
+        pass
+    return np.fromiter((_float(v) for v in values), dtype=np.float64, count=len(values))
+
+
+def _timestamps(samples):
+    ts = _column([s.get("ts") for s in samples])
+    ts = np.where(ts > 1e12, ts / 1000.0, ts)  # epoch milliseconds
+    missing = np.flatnonzero(np.isnan(ts))
+    for i in missing:
+        try:
+            ts[i] = to_epoch(samples[i].get("timestamp", samples[i].get("ts")))
+        except (TypeError, ValueError):
+            pass
+    return ts
+
+
+def samples_to_records(samples, fields=ESP32_FIELDS, calibration=None, now=None, dtype=RECORD_DTYPE):
+    """
+    Converts sample dicts to records (RECORD_DTYPE, or EXACT_DTYPE) sorted by ts.
+    calibration: optional {"ax": (offset, scale), ...}; those columns become
+    (raw - offset) / scale, applied to the whole column at once.
+    Returns (records, rejected count).
+    """
+    now = time.time() if now is None else now
+    ts = _timestamps(samples)
+    columns = {name: _column([s.get(key) for s in samples]) for name, key in fields.items()}
+    for name, (offset, scale) in (calibration or {}).items():
+        columns[name] = np.round((columns[name] - offset) / scale, 4)
+
+    sensors = np.column_stack([columns[name] for name in fields]) if fields else np.empty((len(samples), 0))
+    keep = np.isfinite(ts) & (ts <= now + MAX_CLOCK_SKEW) & ~np.isnan(sensors).all(axis=1)
+    order = np.flatnonzero(keep)
+    order = order[np.argsort(ts[order], kind="stable")]
+    # Retransmitted samples: keep the first copy of each timestamp
+    _, first = np.unique(ts[order], return_index=True)
+    order = order[first]
+
+    records = np.empty(len(order), dtype=dtype)
+    for name in dtype.names:
+        records[name] = np.nan
+    records["ts"] = ts[order]
+    for name, column in columns.items():
+        records[name] = column[order]
+    return records, len(samples) - len(order)
@@ -0,0 +1,294 @@
+"""
+Project A.R.E.S. — Telemetry Rule Engine
+Cheap first tier of hazard assessment: declarative threshold rules evaluated
+against every incoming sample in a few tens of microseconds, so alerts are
+immediate and the LLM only runs when a rule escalates (or someone asks).
+
+    engine = RuleEngine()                              # RULES below, or your own list
+    raised, cleared = engine.evaluate("rover-1", registry.recent("rover-1", 256), objects)
+    alerts, raised, cleared = engine.evaluate_batch("rover-1", window, rows=len(batch))
+
+Rule types (all share "id", "severity", "message" and optional "escalate"):
+    threshold  latest `field` `op` `value`
+    sustained  every sample over the last `for` seconds satisfies `field` `op` `value`
+    rate       least-squares slope of `field` over the last `window` seconds, per
+               second, `op` `value` (only once the samples span at least
+               RATE_MIN_COVERAGE of the window)
+    tilt       angle between the accelerometer vector and vertical > `value` degrees
+    object     a camera detection with `label` at >= `value` confidence
+    all / any  combination of earlier rules listed in `of`
+A rule with "severity": None is a building block for all/any and never alerts
+on its own. Each family is compiled to NumPy arrays, so adding rules adds
+columns, not Python loops. Alerts are edge-triggered per rover: evaluate()
+returns the alerts that started and the rule ids that stopped with this sample.
+"""
+
+import threading
+
+import numpy as np
+
+SEVERITIES = ("INFO", "WARNING", "CRITICAL")
+
+# Thresholds mirror the dashboard's alert levels (frontend_react/src/App.jsx)
+RULES = [
+    {"id": "temp-high", "type": "threshold", "field": "temp", "op": ">", "value": 40,
+     "severity": "WARNING", "message": "High temperature: {value:.1f}°C"},
+    {"id": "temp-critical", "type": "threshold", "field": "temp", "op": ">", "value": 45,
+     "severity": "CRITICAL", "message": "Critical temperature: {value:.1f}°C", "escalate": True},
+    {"id": "temp-rising", "type": "rate", "field": "temp", "op": ">", "value": 0.5, "window": 20,
+     "severity": "WARNING", "message": "Temperature rising {value:.2f}°C/s"},
+    {"id": "gas-high", "type": "threshold", "field": "gas", "op": ">", "value": 800,
+     "severity": "WARNING", "message": "High gas level: {value:.0f}"},
+    {"id": "gas-sustained", "type": "sustained", "field": "gas", "op": ">", "value": 500, "for": 10,
+     "severity": "WARNING", "message": "Gas above 500 for 10 s (now {value:.0f})", "escalate": True},
+    {"id": "gas-rising", "type": "rate", "field": "gas", "op": ">", "value": 20, "window": 10,
+     "severity": "WARNING", "message": "Gas rising {value:.0f}/s"},
+    {"id": "water-high", "type": "threshold", "field": "water", "op": ">", "value": 400,
+     "severity": "WARNING", "message": "High water level: {value:.0f}"},
+    {"id": "tilt", "type": "tilt", "value": 30,
+     "severity": "CRITICAL", "message": "Rover tilted {value:.0f}°", "escalate": True},
+    # Flame sensor is active-low: 0 means flame seen
+    {"id": "flame-sensor", "type": "threshold", "field": "flame", "op": "<", "value": 0.5,
+     "severity": "CRITICAL", "message": "Flame sensor triggered"},
+    {"id": "vision-flame", "type": "object", "label": "FLAME", "value": 0.6,
+     "severity": None},
+    {"id": "flame-any", "type": "any", "of": ["flame-sensor", "vision-flame"], "severity": None},
+    {"id": "gas-elevated", "type": "threshold", "field": "gas", "op": ">", "value": 500, "severity": None},
+    {"id": "fire", "type": "all", "of": ["flame-any", "gas-elevated"],
+     "severity": "CRITICAL", "message": "Flame with elevated gas: probable fire", "escalate": True},
+]
+
+_OPS = {">": 1.0, "<": -1.0}   # compare as sign * (x - limit) > 0
+RATE_MIN_COVERAGE = 0.5        # fraction of a rate window the samples must span (no slope from a burst)
+
+
+class RuleEngine:
+    def __init__(self, rules=None):
+        self.rules = list(RULES if rules is None else rules)
+        self._index = {rule["id"]: i for i, rule in enumerate(self.rules)}
+        self._compile()
+        self._lock = threading.Lock()
+        self._active = {}   # rover_id -> {rule id: alert}
+        self.evaluations = 0
+
+    # ── Compilation ──
+    def _compile(self):
+        fields = []
+        families = {"threshold": [], "sustained": [], "rate": [], "tilt": [], "object": [], "combo": []}
+        for i, rule in enumerate(self.rules):
+            kind = rule["type"]
+            if kind in ("all", "any"):
+                missing = [ref for ref in rule["of"] if self._index.get(ref, len(self.rules)) >= i]
+                if missing:
+                    raise ValueError(f"Rule {rule['id']}: {missing} must be defined before it")
+                families["combo"].append(i)
+                continue
+            if kind not in families:
+                raise ValueError(f"Rule {rule['id']}: unknown type {kind!r}")
+            if kind in ("threshold", "sustained", "rate"):
+                if rule["op"] not in _OPS:
+                    raise ValueError(f"Rule {rule['id']}: unsupported op {rule['op']!r}")
+                if rule["field"] not in fields:
+                    fields.append(rule["field"])
+            families[kind].append(i)
+
+        self.fields = tuple(fields)
+        column = {f: c for c, f in enumerate(fields)}
+
+        def arrays(kind, span_key=None):
+            idx = np.array(families[kind], dtype=np.intp)
+            picked = [self.rules[i] for i in families[kind]]
+            cols = np.array([column[r["field"]] for r in picked], dtype=np.intp)
+            sign = np.array([_OPS[r["op"]] for r in picked])
+            limit = np.array([float(r["value"]) for r in picked])
+            span = np.array([float(r[span_key]) for r in picked]) if span_key else None
+            return idx, cols, sign, limit, span
+
+        self._threshold = arrays("threshold")
+        self._sustained = arrays("sustained", "for")
+        self._rate = arrays("rate", "window")
+        self._tilt = (np.array(families["tilt"], dtype=np.intp),
+                      np.array([float(self.rules[i]["value"]) for i in families["tilt"]]))
+        self._objects = families["object"]
+        self._combos = [(i, self.rules[i]["type"], [self._index[ref] for ref in self.rules[i]["of"]])
+                        for i in families["combo"]]
+        spans = np.concatenate([self._sustained[4], self._rate[4], [0.0]])
+        self.lookback = float(spans.max())
+
+    # ── Evaluation ──
+    def scan(self, records, objects=None, rows=1):
+        """
+        Evaluates every rule at each of the newest `rows` records of a window
+        (structured records, oldest first; earlier records are context for
+        sustained/rate rules). objects, if given, applies to the newest record.
+        Returns (fired, values): (rows, n_rules) boolean and float arrays.
+        """
+        n_rules = len(self.rules)
+        rows = min(rows, len(records))
+        fired = np.zeros((rows, n_rules), dtype=bool)
+        values = np.full((rows, n_rules), np.nan)
+        if not rows:
+            return fired, values
+
+        ts = records["ts"].astype(np.float64)
+        # Context older than lookback before the first evaluated row is never used
+        start = max(0, int(np.searchsorted(ts, ts[-rows] - self.lookback, side="left")) - 1)
+        records, ts = records[start:], ts[start:]
+        ts = ts - ts[-rows]   # relative times keep the rate sums well conditioned
+        r0 = len(ts) - rows
+        now = ts[r0:, None]
+        if self.fields:
+            x = np.column_stack([records[f].astype(np.float64) for f in self.fields])
+        else:
+            x = np.empty((len(ts), 0))
+
+        idx, cols, sign, limit, _ = self._threshold
+        if len(idx):
+            current = x[r0:, cols]
+            fired[:, idx] = sign * (current - limit) > 0
+            values[:, idx] = current
+
+        idx, cols, sign, limit, span = self._sustained
+        if len(idx):
+            positions = np.arange(len(ts))[:, None]
+            bad = ~(sign * (x[:, cols] - limit) > 0)
+            last_bad = np.maximum.accumulate(np.where(bad, positions, -1), axis=0)[r0:]
+            # Last sample at/before each window start; it must satisfy the rule too
+            first = np.searchsorted(ts, (now - span).ravel(), side="right").reshape(rows, -1) - 1
+            fired[:, idx] = (first >= 0) & (last_bad < first)
+            values[:, idx] = x[r0:, cols]
+
+        idx, cols, sign, limit, span = self._rate
+        if len(idx):
+            y = x[:, cols]
+            valid = ~np.isnan(y)
+            t = np.where(valid, ts[:, None], 0.0)
+            y = np.where(valid, y, 0.0)
+            # Prefix sums give every window's least-squares sums in O(1)
+            prefix = lambda a: np.concatenate([np.zeros((1, a.shape[1])), np.cumsum(a, axis=0)])
+            sums = [prefix(a) for a in (valid.astype(np.float64), t, y, t * t, t * y)]
+            lo = np.searchsorted(ts, (now - span).ravel(), side="left").reshape(rows, -1)
+            hi = np.arange(r0 + 1, len(ts) + 1)[:, None]
+            rule_cols = np.arange(len(idx))[None, :]
+            n, st, sy, stt, sty = (c[hi, rule_cols] - c[lo, rule_cols] for c in sums)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                slope = (n * sty - st * sy) / (n * stt - st * st)
+            # A burst of samples milliseconds apart gives a meaningless slope
+            covered = now - ts[np.minimum(lo, len(ts) - 1)]
+            slope[(n < 3) | (covered < RATE_MIN_COVERAGE * span)] = np.nan
+            fired[:, idx] = sign * (slope - limit) > 0
+            values[:, idx] = slope
+
+        idx, limit = self._tilt
+        if len(idx):
+            ax, ay, az = (records[k][r0:].astype(np.float64) for k in ("ax", "ay", "az"))
+            with np.errstate(invalid="ignore"):
+                tilt = np.degrees(np.arctan2(np.hypot(ax, ay), np.abs(az)))
+            tilt[(ax == 0) & (ay == 0) & (az == 0)] = np.nan   # no accelerometer data
+            fired[:, idx] = tilt[:, None] > limit
+            values[:, idx] = tilt[:, None]
+
+        for i in self._objects:
+            rule = self.rules[i]
+            confidences = [float(o.get("confidence", 0)) for o in objects or () if o.get("label") == rule["label"]]
+            if confidences:
+                values[-1, i] = max(confidences)
+                fired[-1, i] = values[-1, i] >= rule["value"]
+
+        for i, kind, refs in self._combos:
+            fired[:, i] = fired[:, refs].all(axis=1) if kind == "all" else fired[:, refs].any(axis=1)
+
+        return fired, values
+
+    def check(self, records, objects=None):
+        """Rule results for the newest record only: (fired, values) aligned with self.rules."""
+        fired, values = self.scan(records, objects, rows=1)
+        if not len(fired):
+            return np.zeros(len(self.rules), dtype=bool), np.full(len(self.rules), np.nan)
+        return fired[0], values[0]
+
+    def evaluate(self, rover_id, records, objects=None):
+        """
+        Checks the newest sample of a rover and updates its active alerts.
+        Returns (raised, cleared): alert dicts that started now and rule ids that stopped.
+        """
+        fired, values = self.check(records, objects)
+        ts = float(records["ts"][-1]) if len(records) else None
+        return self._transition(rover_id, fired, values, ts)
+
+    def evaluate_batch(self, rover_id, records, rows, current=True, objects=None):
+        """
+        Evaluates the newest `rows` records of a window in one pass (a batch
+        upload; older records are context). Returns (alerts, raised, cleared):
+        every alert that started somewhere inside the batch, stamped with its
+        sample's time, plus the active-alert transitions at the batch's last
+        sample. objects (the live camera detections) apply to that last sample,
+        as in evaluate(). With current=False (a backlog older than live data)
+        the active alerts are left alone, objects are ignored and
+        raised/cleared are empty.
+        """
+        rows = min(rows, len(records))
+        if not rows:
+            return [], [], []
+        # One extra row, when there is context, as the "before the batch" baseline
+        scanned = rows + 1 if len(records) > rows else rows
+        fired, values = self.scan(records, objects if current else None, rows=scanned)
+        before = fired[0] if scanned > rows else np.zeros(len(self.rules), dtype=bool)
+        fired, values = fired[-rows:], values[-rows:]
+        ts = records["ts"][-rows:]
+
+        emitting = np.array([rule.get("severity") is not None for rule in self.rules])
+        starts = fired & ~np.vstack([before, fired[:-1]]) & emitting
+        alerts = [self._alert(self.rules[i], values[row, i], rover_id, float(ts[row]))
+                  for row, i in np.argwhere(starts)]
+        if not current:
+            with self._lock:
+                self.evaluations += rows
+            return alerts, [], []
+        raised, cleared = self._transition(rover_id, fired[-1], values[-1], float(ts[-1]), count=rows)
+        return alerts, raised, cleared
+
+    def _transition(self, rover_id, fired, values, ts, count=1):
+        raised, cleared = [], []
+        with self._lock:
+            self.evaluations += count
+            active = self._active.setdefault(rover_id, {})
+            for i, rule in enumerate(self.rules):
+                if rule.get("severity") is None:
+                    continue
+                if fired[i] and rule["id"] not in active:
+                    alert = self._alert(rule, values[i], rover_id, ts)
+                    active[rule["id"]] = alert
+                    raised.append(alert)
+                elif not fired[i] and rule["id"] in active:
+                    del active[rule["id"]]
+                    cleared.append(rule["id"])
+        return raised, cleared
+
+    @staticmethod
+    def _alert(rule, value, rover_id, ts):
+        value = None if np.isnan(value) else round(float(value), 3)
+        try:
+            message = rule.get("message", rule["id"]).format(value=value if value is not None else float("nan"),
+                                                             limit=rule.get("value"))
+        except (ValueError, KeyError):
+            message = rule.get("message", rule["id"])
+        return {
+            "rule": rule["id"],
+            "severity": rule["severity"],
+            "message": message,
+            "value": value,
+            "limit": rule.get("value"),
+            "escalate": bool(rule.get("escalate")),
+            "rover": rover_id,
+            "ts": ts,
+        }
+
+    def active(self, rover_id=None):
+        """Active alerts, most severe first (all rovers when rover_id is None)."""
+        with self._lock:
+            if rover_id is not None:
+                alerts = list(self._active.get(rover_id, {}).values())
+            else:
+                alerts = [a for per_rover in self._active.values() for a in per_rover.values()]
+        return sorted(alerts, key=lambda a: -SEVERITIES.index(a["severity"]))
@@ -1,51 +1,341 @@
-import requests
-import time
-import random
+"""
+Project A.R.E.S. — Telemetry Simulation
+Stand-in rovers and cameras, for demos and for load testing (see bench_load.py).
+
+Usage:
+    python3 telemetry_simulation.py                          # one rover posting every 2 s
+    python3 telemetry_simulation.py --rovers 20 --rate 5     # 20 rovers posting at 5 Hz each
+    python3 telemetry_simulation.py --esp32 8081 --rovers 4  # ESP32 /data stand-in for the fleet poller
+    python3 telemetry_simulation.py --camera 8082 [--frames-dir DIR] [--fps 15] [--limit 300] [--size 640x480]
+
+The ESP32 stand-in answers GET /data (or /<rover>/data, one server for a whole
+fleet) with a raw sample in the firmware's field names, after an optional
+--delay to mimic WiFi latency. The camera stand-in serves an ESP32-CAM style
+multipart MJPEG /stream replaying the JPEGs in --frames-dir, or synthetic
+frames with a flame and a smoke patch; it also accepts (and discards) POSTs,
+so object_identifier.py can point its backend URL at it. The load generator
+and the stand-ins are seeded, so two runs with the same options send the same
+data.
+"""
+
+import argparse
+import glob
 import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
 
 # Configuration
 BACKEND_URL = "http://localhost:5000/api/telemetry"
+SEND_INTERVAL = 2          # seconds, single-rover demo mode
+CAMERA_BOUNDARY = "123456789000000000000987654321"   # what the ESP32-CAM firmware sends
 
-def generate_telemetry():
+
+def generate_telemetry(rng=random):
     return {
-        "temp": round(random.uniform(20.0, 85.0), 1),
-        "pressure": round(random.uniform(1000, 1020), 1),
-        "gas": int(random.uniform(100, 600)),
-        "radiation": int(random.uniform(10, 50)),
+        "temp": round(rng.uniform(20.0, 85.0), 1),
+        "pressure": round(rng.uniform(1000, 1020), 1),
+        "gas": int(rng.uniform(100, 600)),
+        "radiation": int(rng.uniform(10, 50)),
         "gasProfile": {
-            "ammonia": round(random.uniform(5, 20), 1),
-            "nox": round(random.uniform(10, 40), 1),
-            "methane": round(random.uniform(20, 60), 1),
-            "benzene": round(random.uniform(2, 10), 1),
-            "smoke": round(random.uniform(15, 40), 1),
-            "co2": round(random.uniform(400, 500), 1),
-            "co": round(random.uniform(5, 20), 1),
-            "alcohol": round(random.uniform(10, 30), 1),
-            "sulfur": round(random.uniform(1, 6), 1),
-            "hydrogen": round(random.uniform(2, 12), 1)
+            "ammonia": round(rng.uniform(5, 20), 1),
+            "nox": round(rng.uniform(10, 40), 1),
+            "methane": round(rng.uniform(20, 60), 1),
+            "benzene": round(rng.uniform(2, 10), 1),
+            "smoke": round(rng.uniform(15, 40), 1),
+            "co2": round(rng.uniform(400, 500), 1),
+            "co": round(rng.uniform(5, 20), 1),
+            "alcohol": round(rng.uniform(10, 30), 1),
+            "sulfur": round(rng.uniform(1, 6), 1),
+            "hydrogen": round(rng.uniform(2, 12), 1)
         },
-        "ax": int(random.uniform(-2000, 2000)), # Raw MPU6050 simulation
-        "ay": int(random.uniform(-2000, 2000)),
-        "az": int(random.uniform(14000, 18000)),
-        "gx": int(random.uniform(-500, 500)),
-        "gy": int(random.uniform(-500, 500)),
-        "gz": int(random.uniform(-500, 500)),
+        "ax": int(rng.uniform(-2000, 2000)), # Raw MPU6050 simulation
+        "ay": int(rng.uniform(-2000, 2000)),
+        "az": int(rng.uniform(14000, 18000)),
+        "gx": int(rng.uniform(-500, 500)),
+        "gy": int(rng.uniform(-500, 500)),
+        "gz": int(rng.uniform(-500, 500)),
         "active": True,
         "source": "simulation"
     }
 
-print(f"Simulating ESP32 Rover... Sending data to {BACKEND_URL}")
 
-while True:
-    data = generate_telemetry()
+def generate_esp32_sample(rng=random):
+    """One raw ESP32 /data reading (firmware field names, uncalibrated MPU6050 counts)."""
+    return {
+        "temp": round(rng.uniform(20.0, 85.0), 1),
+        "pressure": round(rng.uniform(1000, 1020), 1),
+        "air": int(rng.uniform(100, 600)),
+        "flame": int(rng.uniform(10, 50)),
+        "water": int(rng.uniform(0, 100)),
+        "ax": int(rng.uniform(-2000, 2000)),
+        "ay": int(rng.uniform(-2000, 2000)),
+        "az": int(rng.uniform(14000, 18000)),
+        "gx": int(rng.uniform(-500, 500)),
+        "gy": int(rng.uniform(-500, 500)),
+        "gz": int(rng.uniform(-500, 500)),
+        "lat": round(rng.uniform(12.90, 12.99), 6),
+        "lng": round(rng.uniform(77.50, 77.59), 6),
+    }
+
+
+# ── Load generator ──
+
+class RoverLoad:
+    """
+    N simulated rovers posting to the backend, each on its own thread and
+    keep-alive session, at a fixed rate (open loop).
+
+    Every request is scheduled in advance and its latency is measured from
+    the time it was due, not from when it was actually sent, so a backend
+    that stalls shows up in the latencies instead of silently lowering the
+    offered load. With batch > 1 each post carries that many buffered
+    samples to /api/telemetry/batch.
+    """
+
+    def __init__(self, base_url, rovers=1, rate=1.0, batch=1, seed=0, timeout=10):
+        self.base_url = base_url.rstrip("/")
+        self.rovers = rovers
+        self.rate = rate
+        self.batch = batch
+        self.seed = seed
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self.latencies = []      # seconds, one per successful request
+        self.samples = 0
+        self.errors = 0
+        self._stop = threading.Event()
+
+    def _post(self, session, rng, rover_id, t):
+        if self.batch <= 1:
+            body = dict(generate_telemetry(rng), rover=rover_id)
+            return session.post(f"{self.base_url}/api/telemetry", json=body, timeout=self.timeout)
+        period = 1.0 / self.rate
+        samples = [dict(generate_esp32_sample(rng), ts=round(t - (self.batch - 1 - i) * period, 3))
+                   for i in range(self.batch)]
+        return session.post(f"{self.base_url}/api/telemetry/batch", params={"rover": rover_id},
+                            json=samples, timeout=self.timeout)
+
+    def _rover(self, index, start, deadline):
+        rover_id = f"sim-{index + 1}"
+        rng = random.Random(self.seed * 1000 + index)
+        session = requests.Session()
+        interval = self.batch / self.rate
+        due = start + interval * rng.random()   # spread the rovers over the first interval
+        while due < deadline and not self._stop.is_set():
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            try:
+                ok = self._post(session, rng, rover_id, time.time()).status_code == 200
+            except requests.RequestException:
+                ok = False
+            latency = time.perf_counter() - due
+            with self._lock:
+                if ok:
+                    self.latencies.append(latency)
+                    self.samples += self.batch
+                else:
+                    self.errors += 1
+            due += interval
+
+    def run(self, duration):
+        """Sends for duration seconds; returns the wall time the run took."""
+        start = time.perf_counter()
+        threads = [threading.Thread(target=self._rover, args=(i, start, start + duration), daemon=True)
+                   for i in range(self.rovers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return time.perf_counter() - start
+
+    def stop(self):
+        self._stop.set()
+
+
+# ── ESP32 /data stand-in ──
+
+class _ESP32Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive, like the poller's sessions expect
+    delay = 0.0
+    requests_served = 0
+    _rngs = {}
+    _lock = threading.Lock()
+
+    def do_GET(self):
+        parts = [p for p in self.path.split("?")[0].split("/") if p]
+        if not parts or parts[-1] != "data":
+            self.send_error(404)
+            return
+        rover = parts[0] if len(parts) > 1 else "rover-1"
+        with self._lock:
+            rng = self._rngs.setdefault(rover, random.Random(rover))
+            sample = generate_esp32_sample(rng)
+            type(self).requests_served += 1
+        if self.delay:
+            time.sleep(self.delay)
+        body = json.dumps(sample).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve_esp32(port, delay=0.0, host="127.0.0.1"):
+    """Starts an ESP32 /data stand-in on a daemon thread; returns the server (handler class has the counters)."""
+    handler = type("ESP32Handler", (_ESP32Handler,), {"delay": delay, "_rngs": {}, "_lock": threading.Lock()})
+    httpd = ThreadingHTTPServer((host, port), handler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
+
+
+def rover_configs(url, rovers, interval=2.0, timeout=3):
+    """rovers.json entries polling one ESP32 stand-in as a fleet of rovers."""
+    url = url.rstrip("/")
+    return [{"id": f"sim-{i + 1}", "url": f"{url}/sim-{i + 1}/data", "interval": interval, "timeout": timeout}
+            for i in range(rovers)]
+
+
+# ── MJPEG camera stand-in ──
+
+def load_frames(frames_dir=None, count=60, size=(640, 480), quality=80):
+    """JPEG bytes to replay: every *.jpg in frames_dir (sorted), or synthetic hazard frames."""
+    if frames_dir:
+        paths = sorted(glob.glob(os.path.join(frames_dir, "*.jpg")) + glob.glob(os.path.join(frames_dir, "*.jpeg")))
+        if not paths:
+            raise ValueError(f"no .jpg frames in {frames_dir}")
+        frames = []
+        for path in paths:
+            with open(path, "rb") as f:
+                frames.append(f.read())
+        return frames
+    import cv2
+    from bench_hazard_masks import synthetic_frames
+    return [cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])[1].tobytes()
+            for frame in synthetic_frames(count, *size)]
+
+
+class _CameraHandler(BaseHTTPRequestHandler):
+    frames = []
+    fps = 15.0
+    limit = None          # frames per connection before the stream ends (None = loop forever)
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/stream", "/"):
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", f"multipart/x-mixed-replace;boundary={CAMERA_BOUNDARY}")
+        self.end_headers()
+        period = 1.0 / self.fps if self.fps else 0.0
+        due = time.perf_counter()
+        sent = 0
+        try:
+            while self.limit is None or sent < self.limit:
+                jpg = self.frames[sent % len(self.frames)]
+                self.wfile.write(f"\r\n--{CAMERA_BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                                 f"Content-Length: {len(jpg)}\r\n\r\n".encode() + jpg)
+                sent += 1
+                due += period
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def do_POST(self):
+        # Result sink: lets the detector run with no backend
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = b'{"status": "ok"}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve_camera(port, frames, fps=15.0, limit=None, host="127.0.0.1"):
+    """Starts an MJPEG camera stand-in on a daemon thread; returns the server."""
+    handler = type("CameraHandler", (_CameraHandler,), {"frames": list(frames), "fps": fps, "limit": limit})
+    httpd = ThreadingHTTPServer((host, port), handler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
+
+
+def send_forever():
+    """The original demo: one rover posting a random sample every SEND_INTERVAL seconds."""
+    print(f"Simulating ESP32 Rover... Sending data to {BACKEND_URL}")
+
+    while True:
+        data = generate_telemetry()
+        try:
+            response = requests.post(BACKEND_URL, json=data)
+            if response.status_code == 200:
+                print(f"Sent: {data}")
+            else:
+                print(f"Failed: {response.status_code}")
+        except Exception as e:
+            print(f"Connection Error: {e}")
+            print("Ensure the backend server is running!")
+
+        time.sleep(SEND_INTERVAL)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="A.R.E.S. rover and camera simulator")
+    parser.add_argument("--rovers", type=int, default=None, help="number of simulated rovers")
+    parser.add_argument("--rate", type=float, default=1.0, help="samples per second per rover")
+    parser.add_argument("--batch", type=int, default=1, help="samples per post (>1 uses /api/telemetry/batch)")
+    parser.add_argument("--url", default=BACKEND_URL.rsplit("/api/", 1)[0], help="backend base URL")
+    parser.add_argument("--esp32", type=int, metavar="PORT", help="serve ESP32 /data stand-ins on PORT")
+    parser.add_argument("--delay", type=float, default=0.0, help="ESP32 stand-in response delay (s)")
+    parser.add_argument("--camera", type=int, metavar="PORT", help="serve an MJPEG camera stand-in on PORT")
+    parser.add_argument("--frames-dir", help="JPEG frames to replay (default: synthetic)")
+    parser.add_argument("--fps", type=float, default=15.0, help="camera stand-in frame rate (0 = unthrottled)")
+    parser.add_argument("--size", default="640x480", help="synthetic frame size WxH")
+    parser.add_argument("--limit", type=int, default=None, help="frames per camera connection (default: endless)")
+    parser.add_argument("--host", default="127.0.0.1", help="bind address for the stand-in servers")
+    args = parser.parse_args()
+
+    if args.esp32 is None and args.camera is None:
+        if args.rovers is None:
+            send_forever()
+        load = RoverLoad(args.url, args.rovers, args.rate, args.batch)
+        print(f"[SIM] {args.rovers} rover(s) at {args.rate} Hz -> {args.url} (Ctrl+C to stop)")
+        load.run(float("inf"))
+        return
+
+    if args.esp32 is not None:
+        serve_esp32(args.esp32, args.delay, args.host)
+        print(f"[SIM] ESP32 /data stand-in on http://{args.host}:{args.esp32}/<rover>/data")
+        if args.rovers:
+            print(json.dumps(rover_configs(f"http://{args.host}:{args.esp32}", args.rovers), indent=2))
+    if args.camera is not None:
+        size = tuple(int(v) for v in args.size.lower().split("x"))
+        frames = load_frames(args.frames_dir, size=size)
+        serve_camera(args.camera, frames, args.fps, args.limit, args.host)
+        print(f"[SIM] MJPEG camera stand-in ({len(frames)} frames @ {args.fps} fps) "
+              f"on http://{args.host}:{args.camera}/stream")
+    while True:
+        time.sleep(3600)
+
+
+if __name__ == "__main__":
     try:
-        response = requests.post(BACKEND_URL, json=data)
-        if response.status_code == 200:
-            print(f"Sent: {data}")
-        else:
-            print(f"Failed: {response.status_code}")
-    except Exception as e:
-        print(f"Connection Error: {e}")
-        print("Ensure the backend server is running!")
-    
-    time.sleep(2)
+        main()
+    except KeyboardInterrupt:
+        print("\n[STOPPED] Simulation terminated.")
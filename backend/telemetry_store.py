@@ -0,0 +1,420 @@
+"""
+Project A.R.E.S. — Telemetry Log Store
+Append-only JSONL telemetry history with a sidecar offset index, so the
+dashboard can ask for "the last N samples" or "everything between T1 and T2"
+without reading the whole mission log on every poll.
+
+The history is split into segments: the active log (e.g. telemetry_history.jsonl)
+plus closed segments named telemetry_history.<rotation time>.jsonl[.gz].
+Queries span all segments transparently.
+
+Index file (<segment>.idx) starts with a 16-byte header identifying the
+segment it was built for:
+    8 bytes  INDEX_MAGIC
+    8 bytes  BLAKE2b digest of the segment's first line
+followed by one fixed-width record per JSONL line:
+    float64  epoch timestamp of the line (the previous line's if it has none)
+    uint64   byte offset of the line in the (decompressed) segment
+The first line does not change while a log is appended to, but does when the
+file is replaced (restored from a backup, rewritten by another tool), so a
+header mismatch, an offset past the end of the file or one that is not at a
+line start makes the index stale. A stale or missing index is rebuilt
+automatically, and lines appended to the active log by other writers are
+picked up on the next query.
+
+Rows are in file order. Lines normally arrive in time order, so a time window
+is a binary search over the ts column and one contiguous read; a segment that
+also holds late lines (a backlog uploaded after a dropout) keeps a ts sort
+order of its rows in memory and reads the matching lines in runs.
+"""
+
+import datetime
+import glob
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import threading
+
+import numpy as np
+
+INDEX_DTYPE = np.dtype([("ts", "<f8"), ("offset", "<u8")])
+INDEX_MAGIC = b"ARESIDX2"   # 2: real per-line times (1 stored a running max)
+INDEX_HEADER_SIZE = 16   # magic + first-line digest (one INDEX_DTYPE record wide)
+
+
+def to_epoch(value):
+    """Converts an ISO-8601 string or epoch number to epoch seconds (None passes through)."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.datetime.fromisoformat(value).timestamp()
+
+
+def _open_segment(path):
+    return gzip.open(path, "rb") if path.endswith(".gz") else open(path, "rb")
+
+
+class _Segment:
+    """One JSONL file plus its in-memory copy of the offset index."""
+
+    def __init__(self, path, last_ts=0.0):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.index = np.empty(1024, dtype=INDEX_DTYPE)
+        self.count = 0
+        self.indexed_bytes = 0  # segment bytes covered by the index
+        self.last_ts = last_ts  # time of the last indexed line
+        self.min_ts = np.inf
+        self.max_ts = -np.inf
+        self.in_order = True    # ts column non-decreasing in file order
+        self._order = np.empty(0, dtype=np.intp)  # ts sort order of the rows, once out of order
+        self.created = None
+        self._load_index()
+
+    def _grow(self, needed):
+        if needed <= len(self.index):
+            return
+        capacity = len(self.index)
+        while capacity < needed:
+            capacity *= 2
+        grown = np.empty(capacity, dtype=INDEX_DTYPE)
+        grown[:self.count] = self.index[:self.count]
+        self.index = grown
+
+    def push(self, ts, offset):
+        self._grow(self.count + 1)
+        ts = self.last_ts if ts is None else ts
+        if self.count and ts < self.last_ts:
+            self.in_order = False
+        self.index[self.count] = (ts, offset)
+        self.count += 1
+        self.last_ts = ts
+        self.min_ts = min(self.min_ts, ts)
+        self.max_ts = max(self.max_ts, ts)
+
+    @property
+    def compressed(self):
+        return self.path.endswith(".gz")
+
+    @property
+    def first_ts(self):
+        return float(self.index["ts"][0]) if self.count else None
+
+    def _size(self):
+        if not os.path.exists(self.path):
+            return 0
+        if self.compressed:
+            return None  # unknown without decompressing; trust the index
+        return os.path.getsize(self.path)
+
+    def _header(self):
+        """Index header for the segment as it is now, or None while it has no complete line."""
+        if not os.path.exists(self.path):
+            return None
+        with _open_segment(self.path) as f:
+            first = f.readline()
+        if not first.endswith(b"\n"):
+            return None
+        return INDEX_MAGIC + hashlib.blake2b(first, digest_size=8).digest()
+
+    def _index_matches(self, header, records, size):
+        """True if an index read from disk still describes this segment."""
+        if header != self._header() or not len(records):
+            return False
+        last = int(records["offset"][-1])
+        if size is None:
+            return True  # compressed: immutable once written, and seeking would decompress it
+        if last >= size:
+            return False
+        if last == 0:
+            return True
+        with open(self.path, "rb") as f:
+            f.seek(last - 1)
+            return f.read(1) == b"\n"   # the last indexed offset must start a line
+
+    def _load_index(self):
+        """Loads the sidecar index, discarding it if it no longer matches the segment."""
+        size = self._size()
+        records = np.empty(0, dtype=INDEX_DTYPE)
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "rb") as f:
+                header = f.read(INDEX_HEADER_SIZE)
+            records = np.fromfile(self.index_path, dtype=INDEX_DTYPE, offset=INDEX_HEADER_SIZE) \
+                if len(header) == INDEX_HEADER_SIZE else records
+            if not self._index_matches(header, records, size):
+                # Pre-header index, or the log was truncated or replaced: rebuild from scratch
+                records = np.empty(0, dtype=INDEX_DTYPE)
+                os.remove(self.index_path)
+
+        self.count = 0
+        self._grow(len(records))
+        self.index[:len(records)] = records
+        self.count = len(records)
+        if self.count:
+            ts = records["ts"]
+            self.min_ts, self.max_ts = float(ts.min()), float(ts.max())
+            self.in_order = bool(np.all(ts[1:] >= ts[:-1]))
+        if self.count and self.compressed:
+            self.last_ts = float(records["ts"][-1])
+            self.indexed_bytes = None  # closed and immutable; reads run to end of file
+            return
+        if self.count:
+            self.last_ts = float(records["ts"][-1])
+            # Resume scanning right after the last indexed line
+            with _open_segment(self.path) as f:
+                f.seek(int(records["offset"][-1]))
+                f.readline()
+                self.indexed_bytes = f.tell()
+        else:
+            self.indexed_bytes = 0
+        self.scan_tail()
+
+    def scan_tail(self):
+        """Indexes any complete lines appended to the segment since the last scan."""
+        size = self._size()
+        if self.indexed_bytes is None or not os.path.exists(self.path):
+            return
+        if size is not None and size <= self.indexed_bytes:
+            return
+        start = self.count
+        with _open_segment(self.path) as f:
+            f.seek(self.indexed_bytes)
+            offset = self.indexed_bytes
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # partial line still being written
+                try:
+                    ts = to_epoch(json.loads(line).get("timestamp"))
+                except (ValueError, AttributeError):
+                    ts = None
+                self.push(ts, offset)
+                offset += len(line)
+            self.indexed_bytes = offset
+        self.append_index_file(start)
+
+    def append_index_file(self, start):
+        if self.count <= start:
+            return
+        if start == 0:
+            # First lines of the segment: (re)create the index with its header
+            with open(self.index_path, "wb") as f:
+                f.write(self._header() or b"\0" * INDEX_HEADER_SIZE)
+                f.write(self.index[:self.count].tobytes())
+            return
+        with open(self.index_path, "ab") as f:
+            f.write(self.index[start:self.count].tobytes())
+
+    def _sorted_rows(self):
+        """Row numbers in ts order for an out-of-order segment, merging in rows added since last time."""
+        known = len(self._order)
+        if known != self.count:
+            rows = np.concatenate([self._order, np.arange(known, self.count)])
+            # Stable sort of a sorted run plus a short tail: close to linear
+            self._order = rows[np.argsort(self.index["ts"][rows], kind="stable")]
+        return self._order
+
+    def select(self, since, until, limit=None):
+        """
+        Returns (ts, rows) for since <= ts <= until in time order, keeping only
+        the newest `limit` if given. rows are index row numbers (file order).
+        """
+        ts = self.index["ts"][:self.count]
+        rows = None
+        if not self.in_order:
+            rows = self._sorted_rows()
+            ts = ts[rows]
+        i0 = int(np.searchsorted(ts, since, side="left")) if since is not None else 0
+        i1 = int(np.searchsorted(ts, until, side="right")) if until is not None else self.count
+        if limit is not None:
+            i0 = max(i0, i1 - limit)
+        return ts[i0:i1], np.arange(i0, i1) if rows is None else rows[i0:i1]
+
+    def read_rows(self, rows):
+        """
+        Reads and parses the given index rows, one contiguous read per run of
+        adjacent lines. Returns a list aligned with rows (None for a bad line).
+        """
+        parsed = [None] * len(rows)
+        if not len(rows):
+            return parsed
+        by_offset = np.argsort(rows, kind="stable")   # read front to back (cheap for gzip)
+        ordered = rows[by_offset]
+        breaks = np.flatnonzero(np.diff(ordered) != 1) + 1
+        with _open_segment(self.path) as f:
+            for a, b in zip(np.concatenate(([0], breaks)), np.concatenate((breaks, [len(ordered)]))):
+                first, last = int(ordered[a]), int(ordered[b - 1])
+                begin = int(self.index["offset"][first])
+                end = int(self.index["offset"][last + 1]) if last + 1 < self.count else self.indexed_bytes
+                f.seek(begin)
+                blob = f.read(end - begin) if end is not None else f.read()
+                for position, line in zip(by_offset[a:b], blob.splitlines()):
+                    try:
+                        parsed[position] = json.loads(line)
+                    except ValueError:
+                        continue
+        return parsed
+
+
+class TelemetryStore:
+    """Indexed, segmented JSONL telemetry log. Queries cost O(result size), not O(history size)."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        stem, ext = os.path.splitext(path)
+        self._segment_pattern = stem + ".*" + ext
+        with self._lock:
+            self._closed = [_Segment(p) for p in self._closed_segment_paths()]
+            last_ts = self._closed[-1].last_ts if self._closed else 0.0
+            self._active = _Segment(path, last_ts=last_ts)
+            self._active.created = self._active.first_ts
+
+    def _closed_segment_paths(self):
+        compressed = glob.glob(self._segment_pattern + ".gz")
+        # A plain file with a compressed twin is a leftover from an interrupted compress
+        plain = [p for p in glob.glob(self._segment_pattern) if p + ".gz" not in compressed]
+        # Segment names embed the rotation time, so name order is chronological
+        return sorted(plain + compressed, key=lambda p: p[:-3] if p.endswith(".gz") else p)
+
+    def _segments(self):
+        return self._closed + [self._active]
+
+    # ── Writes ──
+    def append(self, entries, fsync=False):
+        """Appends log entries to the active segment with a single write and updates the index."""
+        if not entries:
+            return
+        with self._lock:
+            segment = self._active
+            segment.scan_tail()
+            start = segment.count
+            offset = segment.indexed_bytes
+            chunks = []
+            for entry in entries:
+                line = (json.dumps(entry) + "\n").encode()
+                try:
+                    ts = to_epoch(entry.get("timestamp"))
+                except ValueError:
+                    ts = None
+                segment.push(ts, offset)
+                chunks.append(line)
+                offset += len(line)
+            with open(segment.path, "ab") as f:
+                f.write(b"".join(chunks))
+                if fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            if segment.created is None:
+                segment.created = datetime.datetime.now().timestamp()
+            segment.indexed_bytes = offset
+            segment.append_index_file(start)
+
+    def active_stats(self):
+        """Returns (bytes, created epoch or None) for the active segment."""
+        with self._lock:
+            return self._active.indexed_bytes, self._active.created
+
+    def rotate(self):
+        """
+        Closes the active segment by renaming it to a timestamped segment file.
+        Returns the closed segment path, or None if the active log was empty.
+        """
+        with self._lock:
+            self._active.scan_tail()
+            if self._active.count == 0:
+                return None
+            stem, ext = os.path.splitext(self.path)
+            stamp = datetime.datetime.now().strftime("%Y%m%dT%H%M%S%f")
+            closed_path = f"{stem}.{stamp}{ext}"
+            os.replace(self._active.index_path, closed_path + ".idx")
+            os.replace(self.path, closed_path)
+            closed = self._active
+            closed.path, closed.index_path = closed_path, closed_path + ".idx"
+            self._closed.append(closed)
+            self._active = _Segment(self.path, last_ts=closed.last_ts)
+            return closed_path
+
+    def compress(self, closed_path):
+        """Gzips a closed segment in place. The heavy lifting runs outside the store lock."""
+        gz_path = closed_path + ".gz"
+        with open(closed_path, "rb") as src, gzip.open(gz_path + ".tmp", "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(gz_path + ".tmp", gz_path)
+        with self._lock:
+            os.replace(closed_path + ".idx", gz_path + ".idx")
+            for segment in self._closed:
+                if segment.path == closed_path:
+                    segment.path, segment.index_path = gz_path, gz_path + ".idx"
+            os.remove(closed_path)
+        return gz_path
+
+    # ── Queries ──
+    def tail(self, n):
+        """Returns the last n entries across all segments, oldest first."""
+        return self.query(limit=n)
+
+    def query(self, since=None, until=None, limit=None):
+        """
+        Returns entries with since <= timestamp <= until (either bound optional),
+        oldest first. If limit is given, only the newest `limit` matches are returned.
+        """
+        since, until = to_epoch(since), to_epoch(until)
+        limit = max(0, limit) if limit is not None else None
+        with self._lock:
+            self._active.scan_tail()
+            segments, times, rows = [], [], []
+            for segment in self._segments():
+                if not segment.count:
+                    continue
+                if (since is not None and segment.max_ts < since) or (until is not None and segment.min_ts > until):
+                    continue
+                ts, selected = segment.select(since, until, limit)
+                segments.append(segment)
+                times.append(ts)
+                rows.append(selected)
+            if not segments:
+                return []
+            # Merge the segments' matches by time (ties keep segment order); a late
+            # backlog can put old lines in a newer segment
+            owner = np.concatenate([np.full(len(r), k) for k, r in enumerate(rows)])
+            rows = np.concatenate(rows)
+            order = np.argsort(np.concatenate(times), kind="stable")
+            if limit is not None:
+                order = order[max(0, len(order) - limit):]
+            entries = [None] * len(order)
+            for k, segment in enumerate(segments):
+                positions = np.flatnonzero(owner[order] == k)
+                if len(positions):
+                    for position, entry in zip(positions, segment.read_rows(rows[order[positions]])):
+                        entries[position] = entry
+            return [entry for entry in entries if entry is not None]
+
+    def iter_entries(self):
+        """Streams every entry, oldest segment first, without loading the history into memory."""
+        with self._lock:
+            self._active.scan_tail()
+            plan = [(segment.path, segment.indexed_bytes) for segment in self._segments()]
+        for path, length in plan:
+            if not os.path.exists(path) and os.path.exists(path + ".gz"):
+                path += ".gz"  # compressed since the snapshot was taken
+            with _open_segment(path) as f:
+                consumed = 0
+                for line in f:
+                    consumed += len(line)
+                    if length is not None and consumed > length:
+                        break  # written after the snapshot was taken
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+
+    def __len__(self):
+        with self._lock:
+            self._active.scan_tail()
+            return sum(segment.count for segment in self._segments())
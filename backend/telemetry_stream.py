@@ -0,0 +1,81 @@
+"""
+Project A.R.E.S. — Live Telemetry Broadcaster
+Fans each new telemetry snapshot out to any number of SSE subscribers.
+
+Every subscriber only ever holds a reference to the newest snapshot, so a slow
+client skips intermediate samples instead of queueing them (memory stays O(1)
+per client). Clients can restrict the fields they receive, and after the first
+full snapshot only changed fields are sent, plus the keys that disappeared.
+"""
+
+import json
+import threading
+
+_MISSING = object()
+
+
+class TelemetryBroadcaster:
+    """Single publisher, many subscribers, latest-value-wins."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._snapshot = None
+        self._version = 0
+        self.subscribers = 0
+
+    def publish(self, snapshot):
+        """Publishes a new snapshot. O(1) regardless of subscriber count."""
+        with self._cond:
+            self._snapshot = dict(snapshot)  # shallow copy; writers replace values, never mutate nested ones
+            self._version += 1
+            self._cond.notify_all()
+
+    def wait(self, last_version, timeout):
+        """
+        Blocks until a snapshot newer than last_version exists (or timeout).
+        Returns (version, snapshot); snapshot is None on timeout.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._version > last_version, timeout)
+            if self._version > last_version:
+                return self._version, self._snapshot
+            return last_version, None
+
+    def stream(self, fields=None, delta=True, keepalive=15.0):
+        """
+        SSE generator for one client. Messages are `data: {...}` lines carrying
+        {"type": "snapshot" | "delta", "seq": n, "skipped": k, "data": {...}}
+        where skipped counts samples dropped because the client fell behind.
+        A delta whose snapshot lost keys (e.g. no gasProfile without an air
+        reading) lists them in "removed"; clients delete those keys.
+        """
+        with self._cond:
+            self.subscribers += 1
+        try:
+            yield f"data: {json.dumps({'status': 'connected'})}\n\n"
+            version, sent = 0, None
+            while True:
+                new_version, snapshot = self.wait(version, keepalive)
+                if snapshot is None:
+                    yield ": keepalive\n\n"
+                    continue
+                skipped = new_version - version - 1 if version else 0
+                version = new_version
+                if fields:
+                    snapshot = {k: snapshot.get(k) for k in fields}
+
+                if sent is None or not delta:
+                    payload = {"type": "snapshot", "seq": version, "skipped": skipped, "data": snapshot}
+                else:
+                    changed = {k: v for k, v in snapshot.items() if sent.get(k, _MISSING) != v}
+                    removed = [k for k in sent if k not in snapshot]
+                    if not changed and not removed:
+                        continue
+                    payload = {"type": "delta", "seq": version, "skipped": skipped, "data": changed}
+                    if removed:
+                        payload["removed"] = removed
+                sent = snapshot
+                yield f"data: {json.dumps(payload)}\n\n"
+        finally:
+            with self._cond:
+                self.subscribers -= 1
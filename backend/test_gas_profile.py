@@ -0,0 +1,36 @@
+import numpy as np
+
+from gas_profile import ATMOSPHERIC_CO2, CLEAN_AIR_ADC, CO2_MAX_PPM, CURVE_MAX_PPM, GAS_CURVES, GasModel
+
+
+def test_clean_air_reads_atmospheric_co2_and_no_other_gas():
+    profile = GasModel().profile(CLEAN_AIR_ADC)
+    assert abs(profile["co2"] - ATMOSPHERIC_CO2) < 1.0
+    assert profile["co"] < 0.5
+    assert all(ppm < 0.5 for gas, ppm in profile.items() if gas != "co2")
+
+
+def test_calibrated_model_reads_clean_air_at_its_own_reading():
+    profile = GasModel.from_clean_air(450).profile(450)
+    assert abs(profile["co2"] - ATMOSPHERIC_CO2) < 1.0
+    assert profile["co"] < 0.5
+
+
+def test_readings_below_clean_air_never_drop_under_atmospheric():
+    co2 = GasModel().ppm(np.arange(0, CLEAN_AIR_ADC), "co2")
+    assert np.allclose(co2, ATMOSPHERIC_CO2, atol=1.0)
+
+
+def test_outputs_rise_with_the_reading_and_stay_in_the_curves_range():
+    model = GasModel()
+    columns = model.columns(np.arange(0, 4096))
+    for gas in GAS_CURVES:
+        assert np.all(np.diff(columns[gas]) >= -1e-3)
+    assert columns["co2"].max() <= CO2_MAX_PPM + 1
+    assert all(columns[gas].max() <= CURVE_MAX_PPM for gas in GAS_CURVES if gas != "co2")
+    # A moderate rise in the simulator's 100..600 range stays far from saturation
+    assert model.profile(400)["co"] < 50
+
+
+def test_nan_readings_stay_nan():
+    assert np.isnan(GasModel().ppm([np.nan], "co")[0])
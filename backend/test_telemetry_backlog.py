@@ -0,0 +1,46 @@
+import importlib
+import json
+import os
+import time
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def backend(tmp_path_factory):
+    """The Flask app on a scratch data directory with no rovers to poll."""
+    data_dir = tmp_path_factory.mktemp("ares-data")
+    rovers_path = data_dir / "rovers.json"
+    rovers_path.write_text(json.dumps([]))
+    os.environ["ARES_DATA_DIR"] = str(data_dir)
+    os.environ["ARES_ROVERS_CONFIG"] = str(rovers_path)
+    app = importlib.import_module("app")
+    yield app
+    app.log_writer.close()
+
+
+def test_late_backlog_is_stored_and_queried_by_its_own_time(backend):
+    client = backend.app.test_client()
+    now = time.time()
+    live = client.post("/api/telemetry", json={"temp": 30.0, "rover": "late-1"})
+    assert live.status_code == 200
+
+    # An hour-old backlog uploaded after the live sample
+    backlog = [{"ts": now - 3600 + i, "temp": 20.0 + i, "air": 300} for i in range(60)]
+    batch = client.post("/api/telemetry/batch", query_string={"rover": "late-1"}, json=backlog)
+    assert batch.status_code == 200
+    assert batch.get_json()["accepted"] == 60
+    backend.log_writer.close()   # flush the queued writes
+
+    logs = client.get("/api/logs", query_string={"since": now - 3601, "until": now - 3000, "limit": 100})
+    temps = [entry["temp"] for entry in logs.get_json()["logs"]]
+    assert temps == [20.0 + i for i in range(60)]
+
+    newest = client.get("/api/logs", query_string={"limit": 1}).get_json()["logs"]
+    assert newest[0]["temp"] == 30.0
+
+    aggregate = client.get("/api/telemetry/aggregate", query_string={
+        "field": "temp", "from": now - 3601, "to": now - 3001, "buckets": 10}).get_json()
+    assert aggregate["points"] == 10
+    assert sum(aggregate["count"]) == 60
+    assert aggregate["min"][0] == 20.0
@@ -0,0 +1,9 @@
+"""
+Project A.R.E.S. — Production Entry Point
+    cd backend && gunicorn -c gunicorn.conf.py wsgi:app
+
+gunicorn.conf.py runs a single gthread worker (thread budget in serving.py)
+and starts the background services once that worker is up.
+"""
+
+from app import app, start_background  # noqa: F401  (start_background is used by gunicorn.conf.py)
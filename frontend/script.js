@@ -262,8 +262,12 @@ async function triggerAIQuery(message) {
     consoleDiv.scrollTop = consoleDiv.scrollHeight;
 
     try {
-        const response = await fetch(`${API_URL}/analyze`);
-        const data = await response.json();
+        // Queue the analysis, then long-poll the shared job instead of holding a request open
+        let job = await (await fetch(`${API_URL}/analyze?async=1`)).json();
+        while (job.status === 'pending' || job.status === 'running') {
+            job = await (await fetch(`${API_URL}/analyze/jobs/${job.job}?wait=20`)).json();
+        }
+        const data = job.result ?? job;
         consoleDiv.innerHTML += `<p class="log-entry">> ${JSON.stringify(data)}</p>`;
     } catch (e) {
         consoleDiv.innerHTML += `<p class="log-entry error">> AI ENGINE OFFLINE — Connect backend for live analysis</p>`;
@@ -54,64 +54,86 @@ function App() {
 
   const clearAlerts = () => setAlerts([]);
 
-  const fetchTelemetry = async () => {
-    try {
-      const res = await fetch(`${API_URL}/status`);
-      const data = await res.json();
-
-      setSystemStatus(data.active ? 'ONLINE' : 'OFFLINE');
-      setTelemetry(data);
-      setObjects(data.objects || []);
-
-      // Consolidated gas Profile logic to avoid double-renders
-      const mappedGasProfile = data.gasProfile || {
-        ammonia: data.ammonia || (Math.random() * 20),
-        nitrogen: data.nitrogen || (Math.random() * 80),
-        oxygen: data.oxygen || (18 + Math.random() * 5),
-        benzene: data.benzene || (Math.random() * 5),
-        smoke: data.smoke || (Math.random() * 10),
-        co2: data.co2 || (300 + Math.random() * 100),
-        co: data.co || (Math.random() * 15),
-        alcohol: data.alcohol || (Math.random() * 5),
-        sulfur: data.sulfur || (Math.random() * 8),
-        methane: data.methane || (Math.random() * 10),
-        hydrogen: data.hydrogen || (Math.random() * 5),
-      };
-      setGasProfile(mappedGasProfile);
-
-      setHistory(prev => {
-        const newHistory = { ...prev };
-        ['temp', 'gas', 'radiation', 'pressure', 'flame', 'water'].forEach(key => {
-          const val = data[key];
-          if (val !== undefined) {
-            const historyKey = key === 'radiation' ? 'rad' : key;
-            newHistory[historyKey] = [...(prev[historyKey] || []), val].slice(-30);
-          }
-        });
-        return newHistory;
+  const applyTelemetry = (data) => {
+    setSystemStatus(data.active ? 'ONLINE' : 'OFFLINE');
+    setTelemetry(data);
+    setObjects(data.objects || []);
+
+    // Consolidated gas Profile logic to avoid double-renders
+    const mappedGasProfile = data.gasProfile || {
+      ammonia: data.ammonia || (Math.random() * 20),
+      nitrogen: data.nitrogen || (Math.random() * 80),
+      oxygen: data.oxygen || (18 + Math.random() * 5),
+      benzene: data.benzene || (Math.random() * 5),
+      smoke: data.smoke || (Math.random() * 10),
+      co2: data.co2 || (300 + Math.random() * 100),
+      co: data.co || (Math.random() * 15),
+      alcohol: data.alcohol || (Math.random() * 5),
+      sulfur: data.sulfur || (Math.random() * 8),
+      methane: data.methane || (Math.random() * 10),
+      hydrogen: data.hydrogen || (Math.random() * 5),
+    };
+    setGasProfile(mappedGasProfile);
+
+    setHistory(prev => {
+      const newHistory = { ...prev };
+      ['temp', 'gas', 'radiation', 'pressure', 'flame', 'water'].forEach(key => {
+        const val = data[key];
+        if (val !== undefined) {
+          const historyKey = key === 'radiation' ? 'rad' : key;
+          newHistory[historyKey] = [...(prev[historyKey] || []), val].slice(-30);
+        }
       });
+      return newHistory;
+    });
 
-      // Monitor Thresholds for Alerts (Only if system is ACTIVE)
-      if (data.active) {
-        if (data.temp > 45) addAlert('critical', `Critical Temperature: ${data.temp.toFixed(1)}°C`);
-        else if (data.temp > 40) addAlert('warning', `High Temperature: ${data.temp.toFixed(1)}°C`);
+    // Monitor Thresholds for Alerts (Only if system is ACTIVE)
+    if (data.active) {
+      if (data.temp > 45) addAlert('critical', `Critical Temperature: ${data.temp.toFixed(1)}°C`);
+      else if (data.temp > 40) addAlert('warning', `High Temperature: ${data.temp.toFixed(1)}°C`);
 
-        // Trigger fire hazard from both Hardware Sensor AND Vision AI
-        const hasVisionFlame = data.objects && data.objects.some(obj => obj.label === 'FLAME' && obj.confidence > 0.6);
-        if (data.flame === 0 || hasVisionFlame) addAlert('critical', "OBJECT HAZARD DETECTED!");
+      // Trigger fire hazard from both Hardware Sensor AND Vision AI
+      const hasVisionFlame = data.objects && data.objects.some(obj => obj.label === 'FLAME' && obj.confidence > 0.6);
+      if (data.flame === 0 || hasVisionFlame) addAlert('critical', "OBJECT HAZARD DETECTED!");
 
-        if (data.gas > 800) addAlert('warning', "High Gas Levels Detected");
-        if (data.water > 400) addAlert('warning', "High Water Level Detected");
-      }
+      if (data.gas > 800) addAlert('warning', "High Gas Levels Detected");
+      if (data.water > 400) addAlert('warning', "High Water Level Detected");
+    }
+  };
 
+  const fetchTelemetry = async () => {
+    try {
+      const res = await fetch(`${API_URL}/status`);
+      applyTelemetry(await res.json());
     } catch (e) {
       setSystemStatus('OFFLINE');
     }
   };
 
   useEffect(() => {
-    const interval = setInterval(fetchTelemetry, 2000);
-    return () => clearInterval(interval);
+    // Live push stream (snapshot, then deltas); fall back to 2s polling while it is down
+    let current = {};
+    let pollTimer = null;
+    const startPolling = () => { if (!pollTimer) pollTimer = setInterval(fetchTelemetry, 2000); };
+    const stopPolling = () => { clearInterval(pollTimer); pollTimer = null; };
+
+    const source = new EventSource(`${API_URL}/telemetry/stream`);
+    source.onopen = stopPolling;
+    source.onmessage = (event) => {
+      const msg = JSON.parse(event.data);
+      if (!msg.data) return;
+      current = msg.type === 'snapshot' ? msg.data : { ...current, ...msg.data };
+      (msg.removed || []).forEach(key => { delete current[key]; });
+      applyTelemetry(current);
+    };
+    source.onerror = () => {
+      setSystemStatus('OFFLINE');
+      startPolling();
+    };
+    return () => {
+      source.close();
+      stopPolling();
+    };
   }, []);
 
   return (
@@ -3,7 +3,8 @@ import React, { useState, useRef, useCallback } from 'react';
 import { Camera, CameraOff } from 'lucide-react';
 import './VideoFeed.css';
 
-const ESP32_CAM_STREAM_URL = "http://10.202.253.217:81/stream";
+// Shared preview re-served by the detector (the ESP32-CAM only handles one client)
+const PREVIEW_STREAM_URL = "http://localhost:5000/api/video/stream?width=640&quality=70&fps=10";
 
 const VideoFeed = ({ objects = [] }) => {
     const [camStatus, setCamStatus] = useState('connecting'); // 'connecting' | 'live' | 'error' | 'demo'
@@ -50,7 +51,7 @@ const VideoFeed = ({ objects = [] }) => {
                         <img
                             ref={imgRef}
                             key={streamKey}
-                            src={ESP32_CAM_STREAM_URL}
+                            src={PREVIEW_STREAM_URL}
                             alt="ESP32-CAM Live Feed"
                             onLoad={handleStreamLoad}
                             onError={handleStreamError}
@@ -9,4 +9,9 @@ fi
 source venv/bin/activate
 pip install -r requirements.txt
 echo "Launching Server..."
-python app.py
+if [ "$1" = "--prod" ]; then
+    # One gthread worker; thread budget from serving.py (ARES_STREAM_SLOTS / ARES_CHAT_SLOTS / ARES_API_THREADS)
+    exec gunicorn -c gunicorn.conf.py wsgi:app
+else
+    python app.py
+fi